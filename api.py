@@ -1,25 +1,95 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi.responses import Response
+import logging
 from typing import List
 from auth import get_current_user
-from github_operations import get_user_repositories, add_users_to_repositories
+from compression import record_compression
+from config import REPO_SEARCH_MAX_PER_PAGE
+from github_operations import add_users_to_repositories
+from repo_cache import repository_cache
+from jobs import get_job
 from models import RepoAccessRequest, RepoAccessResult
+from spec_profiler import profile_spec
+from spec_validator import SpecValidationError
+from spec_workers import run_spec_task
+from uploads import receive_spec
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("/api/repositories")
-async def get_repositories(request: Request):
+async def get_repositories(request: Request, refresh: bool = False):
     """Get user's repositories where they have admin access."""
     try:
         user = await get_current_user(request)
-        repositories = await get_user_repositories(user['access_token'])
+        repositories = await repository_cache.get(user['login'], user['access_token'], refresh=refresh)
         
-        # Convert Pydantic models to dict for JSON response
-        return [repo.dict() for repo in repositories]
+        # The cached listing is already serialized to JSON, and compressed once per encoding
+        encoding, body = await repositories.json_variants.select_async(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            return Response(content=body, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+        record_compression(encoding, len(repositories.json), len(body), precompressed=True)
+        return Response(content=body, media_type="application/json",
+                        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching repositories: {str(e)}")
+        logger.exception("Error fetching repositories")
         raise HTTPException(status_code=500, detail=f"Failed to fetch repositories: {str(e)}")
 
+@router.get("/api/repositories/search")
+async def search_repositories(request: Request, q: str = "", page: int = 1, per_page: int = 20, refresh: bool = False):
+    """Search user's admin repositories by name, full name and description, best matches first."""
+    try:
+        user = await get_current_user(request)
+        if page < 1 or not 0 <= per_page <= REPO_SEARCH_MAX_PER_PAGE:
+            raise HTTPException(status_code=400, detail=f"page must be at least 1 and per_page between 0 and {REPO_SEARCH_MAX_PER_PAGE}")
+        repositories = await repository_cache.get(user['login'], user['access_token'], refresh=refresh)
+        total, results = repositories.search_index.search(q, page=page, per_page=per_page)
+        return {
+            "query": q,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "results": [repo.dict() for repo in results]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error searching repositories")
+        raise HTTPException(status_code=500, detail=f"Failed to search repositories: {str(e)}")
+
+@router.get("/api/jobs/{job_id}")
+async def get_job_status(request: Request, job_id: str):
+    """Get the status, progress events and result of a provisioning job."""
+    user = await get_current_user(request)
+    job = get_job(job_id, user['login'])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.post("/api/specs/profile")
+async def profile_openapi_spec(request: Request):
+    """Validate a spec (form field openapi_spec) and report its size, complexity and estimated provisioning cost,
+    without submitting it."""
+    await get_current_user(request)
+    try:
+        _, spec, spec_data = await receive_spec(request)
+    except SpecValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "issues": e.issues})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with spec:
+        try:
+            profile = await run_spec_task(profile_spec, spec_data, spec.size, size=spec.size)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return profile.dict()
+
 @router.post("/api/add-repo-access")
 async def add_repo_access(request: Request):
     """Add users to repositories with maintain permissions."""
@@ -47,5 +117,5 @@ async def add_repo_access(request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error adding repo access: {str(e)}")
+        logger.exception("Error adding repo access")
         raise HTTPException(status_code=500, detail=f"Failed to add repository access: {str(e)}") 
\ No newline at end of file
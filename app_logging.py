@@ -0,0 +1,121 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional
+from config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_DEBUG_SAMPLE_RATE
+from tracing import current_span_name, current_trace_id
+
+# Login of the user the current request or job acts for
+_current_user: ContextVar[Optional[str]] = ContextVar("current_user", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from extra=
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+logging_stats: Dict[str, int] = {"queued": 0, "dropped": 0, "sampled_out": 0}
+
+# Libraries whose own per-request lines would repeat ours; they still log warnings
+QUIET_LOGGERS = ("asyncio", "httpx", "httpcore", "multipart")
+
+_listener: Optional[QueueListener] = None
+
+def set_log_user(login: Optional[str]):
+    """Attach a user to every record logged from here on in the current request."""
+    _current_user.set(login)
+
+@contextmanager
+def log_user(login: Optional[str]) -> Iterator[None]:
+    """Attach a user to every record logged from the enclosed work, e.g. a job run by a shared worker."""
+    token = _current_user.set(login)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the request context and any extra= fields."""
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class _AsyncQueueHandler(QueueHandler):
+    """Hands records to the writer thread without ever blocking the caller.
+
+    Only the cheap parts happen here: sampling, capturing the request context
+    (which lives in the caller's contextvars) and rendering the message and
+    traceback. JSON encoding and the write happen on the listener thread.
+    """
+
+    def __init__(self, records: "queue.Queue[logging.LogRecord]", debug_sample_rate: float):
+        super().__init__(records)
+        self.debug_sample_rate = debug_sample_rate
+
+    def emit(self, record: logging.LogRecord):
+        if record.levelno <= logging.DEBUG and random.random() >= self.debug_sample_rate:
+            logging_stats["sampled_out"] += 1
+            return
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Fields passed explicitly in extra= win over the context
+        if getattr(record, "request_id", None) is None:
+            record.request_id = current_trace_id()
+        if getattr(record, "user", None) is None:
+            record.user = _current_user.get()
+        if getattr(record, "step", None) is None:
+            record.step = current_span_name()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            logging_stats["queued"] += 1
+        except queue.Full:
+            logging_stats["dropped"] += 1
+
+def configure_logging(level: str = LOG_LEVEL):
+    """Send every log record through a bounded queue to a thread writing JSON lines to stdout."""
+    global _listener
+    if _listener is not None:
+        return
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    _listener = QueueListener(records, output, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_AsyncQueueHandler(records, LOG_DEBUG_SAMPLE_RATE))
+    root.setLevel(level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+def stop_logging():
+    """Write out the records still queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
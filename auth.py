@@ -9,15 +9,29 @@ from config import (
     GITHUB_TOKEN_URL, 
     GITHUB_USER_URL, 
     RAILWAY_PUBLIC_URL,
-    sessions
+    INTERNAL_API_TOKEN,
+    SESSION_ABSOLUTE_TTL
 )
+from rate_limits import rate_limit_tracker
+from session_store import session_store
+from app_logging import set_log_user
+from tracing import span
 
 async def get_current_user(request: Request):
     """Get the current user from the session."""
-    session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    user = await session_store.get(request.cookies.get("session_id"))
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    set_log_user(user['login'])
+    return user
+
+def require_internal_access(request: Request):
+    """Allow /internal endpoints only with the INTERNAL_API_TOKEN bearer token."""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    authorization = request.headers.get("Authorization", "")
+    if not secrets.compare_digest(authorization, f"Bearer {INTERNAL_API_TOKEN}"):
         raise HTTPException(status_code=401, detail="Not authenticated")
-    return sessions[session_id]
 
 async def github_auth():
     """Redirect to GitHub OAuth page."""
@@ -33,15 +47,17 @@ async def github_callback(code: str, state: str):
     """Handle GitHub OAuth callback."""
     async with httpx.AsyncClient() as client:
         # Exchange code for access token
-        token_response = await client.post(
-            GITHUB_TOKEN_URL,
-            data={
-                "client_id": GITHUB_CLIENT_ID,
-                "client_secret": GITHUB_CLIENT_SECRET,
-                "code": code,
-            },
-            headers={"Accept": "application/json"},
-        )
+        with span("exchange_code", "oauth") as exchange:
+            token_response = await client.post(
+                GITHUB_TOKEN_URL,
+                data={
+                    "client_id": GITHUB_CLIENT_ID,
+                    "client_secret": GITHUB_CLIENT_SECRET,
+                    "code": code,
+                },
+                headers={"Accept": "application/json"},
+            )
+            exchange.status = str(token_response.status_code)
         token_data = token_response.json()
         access_token = token_data.get("access_token")
 
@@ -49,26 +65,28 @@ async def github_callback(code: str, state: str):
             raise HTTPException(status_code=400, detail="Failed to get access token")
 
         # Get user info using the token in the Authorization header
-        user_response = await client.get(
-            GITHUB_USER_URL,
-            headers={"Authorization": f"token {access_token}"},
-        )
+        with span("get_oauth_user", "oauth") as get_user:
+            user_response = await client.get(
+                GITHUB_USER_URL,
+                headers={"Authorization": f"token {access_token}"},
+            )
+            get_user.status = str(user_response.status_code)
+        rate_limit_tracker.record(access_token, user_response.headers)
+        if user_response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to get user info")
         user_data = user_response.json()
-        
-        # Store raw access token in user data (without 'token ' prefix)
-        user_data['access_token'] = access_token
 
-        # Create session
-        session_id = secrets.token_urlsafe(32)
-        sessions[session_id] = user_data
+        # Create session, keeping only what requests need from the user payload
+        session_id = session_store.create(user_data, access_token)
 
         # Redirect to home page with session cookie
         response = RedirectResponse(url="/")
-        response.set_cookie(key="session_id", value=session_id, httponly=True)
+        response.set_cookie(key="session_id", value=session_id, httponly=True, max_age=int(SESSION_ABSOLUTE_TTL))
         return response
 
-async def logout():
+async def logout(request: Request):
     """Logout the user."""
+    session_store.delete(request.cookies.get("session_id"))
     response = RedirectResponse(url="/")
     response.delete_cookie("session_id")
     return response 
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""Compare the REST and GraphQL repository listing backends for one token.
+
+Usage:
+    GITHUB_TOKEN=<token> python benchmark_listing.py [runs]
+"""
+import asyncio
+import os
+import sys
+import time
+from github_client import GitHubClient, close_http_client
+from repo_cache import fetch_repositories
+
+async def benchmark(access_token: str, runs: int):
+    for backend in ["rest", "graphql"]:
+        timings = []
+        payload_bytes = 0
+        for _ in range(runs):
+            g = GitHubClient(access_token)
+            started = time.monotonic()
+            entry = await fetch_repositories(g, backend=backend)
+            timings.append(time.monotonic() - started)
+            payload_bytes = g.bytes_received
+        timings.sort()
+        print(
+            f"{backend:8} repos={len(entry.repositories):5} pages={len(entry.pages):3} "
+            f"bytes={payload_bytes:10} "
+            f"median={timings[len(timings) // 2]:.3f}s best={timings[0]:.3f}s"
+        )
+    await close_http_client()
+
+if __name__ == "__main__":
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        sys.exit("Set GITHUB_TOKEN to a token that can list repositories")
+    asyncio.run(benchmark(token, int(sys.argv[1]) if len(sys.argv) > 1 else 3))
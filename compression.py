@@ -0,0 +1,224 @@
+import asyncio
+import zlib
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import (
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_MEDIA_TYPES,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY
+)
+
+# brotli is optional; without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = [encoding for encoding in COMPRESSION_ENCODINGS if encoding == "gzip" or (encoding == "br" and brotli is not None)]
+
+# Totals per encoding; "precompressed" counts responses served from a stored variant
+compression_stats: Dict[str, Dict[str, int]] = {
+    encoding: {"responses": 0, "precompressed": 0, "bytes_in": 0, "bytes_out": 0}
+    for encoding in ("br", "gzip")
+}
+
+def record_compression(encoding: str, bytes_in: int, bytes_out: int, precompressed: bool = False):
+    stats = compression_stats[encoding]
+    stats["responses"] += 1
+    stats["precompressed"] += int(precompressed)
+    stats["bytes_in"] += bytes_in
+    stats["bytes_out"] += bytes_out
+
+def compression_snapshot() -> Dict[str, Dict[str, int]]:
+    """compression_stats with the bytes saved per encoding."""
+    return {
+        encoding: {**stats, "bytes_saved": stats["bytes_in"] - stats["bytes_out"]}
+        for encoding, stats in compression_stats.items()
+    }
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The preferred enabled encoding the client accepts, or None."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def is_compressible(media_type: Optional[str]) -> bool:
+    return bool(media_type) and media_type.split(";")[0].strip().lower() in COMPRESSION_MEDIA_TYPES
+
+def compress(content: bytes, encoding: str, best: bool = False) -> bytes:
+    """Compress content whole; best trades CPU for size, for variants made once and stored."""
+    if encoding == "br":
+        return brotli.compress(content, quality=11 if best else COMPRESSION_BROTLI_QUALITY)
+    compressor = zlib.compressobj(9 if best else COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(content) + compressor.flush()
+
+class StreamCompressor:
+    """Compresses a body chunk by chunk, flushing each chunk so the client sees it at once."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class CompressedVariants:
+    """Compressed copies of one payload, each made on first use and then kept.
+
+    For content served many times unchanged, like static assets and cached
+    listings, so hot responses are never recompressed. best compresses at
+    maximum settings, which only pays off for content made once at startup
+    and kept for the life of the process, like static assets.
+    """
+
+    def __init__(self, content: bytes, best: bool = False):
+        self.content = content
+        self.best = best
+        self._variants: Dict[str, Optional[bytes]] = {}
+
+    def prepare(self):
+        """Make every enabled variant now rather than on first request."""
+        for encoding in ENCODINGS:
+            self.get(encoding)
+
+    def get(self, encoding: str) -> Optional[bytes]:
+        """The content in encoding, or None if compressing doesn't make it smaller."""
+        if encoding not in self._variants:
+            compressed = compress(self.content, encoding, best=self.best)
+            self._variants[encoding] = compressed if len(compressed) < len(self.content) else None
+        return self._variants[encoding]
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """(encoding, body) to send for a request's Accept-Encoding; encoding is None for the content as is."""
+        encoding = negotiate(accept_encoding) if len(self.content) >= COMPRESSION_MIN_SIZE else None
+        compressed = self.get(encoding) if encoding else None
+        if compressed is None:
+            return None, self.content
+        return encoding, compressed
+
+    async def select_async(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """select, making a missing variant in a thread so large payloads don't stall the event loop."""
+        encoding = negotiate(accept_encoding) if len(self.content) >= COMPRESSION_MIN_SIZE else None
+        if encoding is not None and encoding not in self._variants:
+            # zlib and brotli release the GIL while compressing
+            await asyncio.to_thread(self.get, encoding)
+        return self.select(accept_encoding)
+
+class CompressionMiddleware:
+    """Compress responses whose media type is in COMPRESSION_MEDIA_TYPES.
+
+    Whole bodies under COMPRESSION_MIN_SIZE, and responses that already have a
+    Content-Encoding (e.g. stored variants) or ask for no-transform, pass
+    through. Streamed bodies are compressed chunk by chunk. Strong ETags
+    are weakened, since the compressed bytes differ from what they name.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding is not None:
+                await self.app(scope, receive, _CompressingSend(encoding, send))
+                return
+        await self.app(scope, receive, send)
+
+class _CompressingSend:
+    def __init__(self, encoding: str, send: Send):
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.start["headers"])
+        return (
+            self.start["status"] not in (204, 206, 304)
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and is_compressible(headers.get("content-type"))
+            and (more_body or len(body) >= COMPRESSION_MIN_SIZE)
+        )
+
+    def _set_headers(self, content_length: Optional[int]):
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None and self.start is not None:
+            # First body message: decide for the whole response
+            if not self._should_compress(body, more_body):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            if not more_body:
+                compressed = compress(body, self.encoding)
+                if len(compressed) >= len(body):
+                    self.passthrough = True
+                    await self.send(self.start)
+                    await self.send(message)
+                    return
+                self._set_headers(len(compressed))
+                record_compression(self.encoding, len(body), len(compressed))
+                await self.send(self.start)
+                await self.send({**message, "body": compressed})
+                return
+            self.compressor = StreamCompressor(self.encoding)
+            self._set_headers(None)
+            await self.send(self.start)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        self.bytes_in += len(body)
+        self.bytes_out += len(chunk)
+        if not more_body:
+            record_compression(self.encoding, self.bytes_in, self.bytes_out)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -12,12 +12,116 @@ GITHUB_TOKEN_URL = "https://github.com/login/oauth/access_token"
 GITHUB_USER_URL = "https://api.github.com/user"
 RAILWAY_PUBLIC_URL = f"https://{os.getenv('RAILWAY_PUBLIC_DOMAIN')}"
 
+# GitHub API client configuration
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_HTTP_TIMEOUT = float(os.getenv("GITHUB_HTTP_TIMEOUT", "30"))
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "100"))
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# Concurrent GitHub API fan-out (e.g. granting collaborator access)
+GITHUB_FANOUT_CONCURRENCY = int(os.getenv("GITHUB_FANOUT_CONCURRENCY", "8"))
+GITHUB_FANOUT_MAX_RETRIES = int(os.getenv("GITHUB_FANOUT_MAX_RETRIES", "3"))
+# Longest rate limit pause (seconds) worth waiting out instead of failing
+GITHUB_MAX_RATE_LIMIT_WAIT = float(os.getenv("GITHUB_MAX_RATE_LIMIT_WAIT", "60"))
+
+# Rate limit budget tracking per token
+RATE_LIMIT_TRACKER_MAX_TOKENS = int(os.getenv("RATE_LIMIT_TRACKER_MAX_TOKENS", "1000"))
+RATE_LIMIT_BURN_WINDOW = float(os.getenv("RATE_LIMIT_BURN_WINDOW", "300"))
+# Upper bound of GitHub requests one provisioning run makes, reserved before it starts
+PROVISIONING_REQUEST_BUDGET = int(os.getenv("PROVISIONING_REQUEST_BUDGET", "30"))
+
+# Bearer token for /internal endpoints; they are disabled while unset
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
 # GitHub Template Configuration
 TEMPLATE_OWNER = "cdonel707"
 TEMPLATE_REPO = "sdk-starter"
 
+# How provisioning writes the config repo: "git-data" pushes every change as a
+# single commit, "contents" makes one Contents API commit per file
+PROVISIONING_COMMIT_MODE = os.getenv("PROVISIONING_COMMIT_MODE", "git-data")
+
+# Readiness polling while GitHub finishes copying the template (seconds)
+READINESS_DEADLINE = float(os.getenv("READINESS_DEADLINE", "30"))
+READINESS_INITIAL_DELAY = float(os.getenv("READINESS_INITIAL_DELAY", "0.1"))
+READINESS_MAX_DELAY = float(os.getenv("READINESS_MAX_DELAY", "2"))
+
+# Per-user repository listing cache
+REPO_CACHE_TTL = float(os.getenv("REPO_CACHE_TTL", "60"))
+REPO_CACHE_MAX_ENTRIES = int(os.getenv("REPO_CACHE_MAX_ENTRIES", "256"))
+# Backend that lists repositories: "rest" (/user/repos) or "graphql" (trimmed GraphQL nodes)
+REPO_LISTING_BACKEND = os.getenv("REPO_LISTING_BACKEND", "rest")
+# Listing pages fetched at once after the first page reveals the page count
+REPO_LISTING_CONCURRENCY = int(os.getenv("REPO_LISTING_CONCURRENCY", "8"))
+# Largest page size for repository search results
+REPO_SEARCH_MAX_PER_PAGE = 100
+
+# Background provisioning jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "500"))
+# Where job state and progress are kept: "file" saves them in JOB_STORE_DIR, where every
+# server process sharing the directory can read them; "memory" keeps them in the
+# process that ran /submit (single worker only)
+JOB_BACKEND = os.getenv("JOB_BACKEND", "file")
+JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", "job_records")
+# How often a progress stream rechecks a file-backed job for changes (seconds)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+
 # Directories
 UPLOADS_DIR = "uploads"
 
-# Session management
-sessions = {} 
\ No newline at end of file
+# Spec uploads: the size cap, how much of an upload stays in memory before
+# spilling to a file in UPLOADS_DIR, and the read size when hashing a spool (bytes)
+MAX_SPEC_SIZE = int(os.getenv("MAX_SPEC_SIZE", str(25 * 1024 * 1024)))
+UPLOAD_SPOOL_MEMORY = int(os.getenv("UPLOAD_SPOOL_MEMORY", str(1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Parsed specs kept by content hash, so re-uploads skip parsing
+SPEC_PARSE_CACHE_SIZE = int(os.getenv("SPEC_PARSE_CACHE_SIZE", "32"))
+
+# Specs estimated to take at least this long to generate are flagged for the large queue (seconds)
+LARGE_SPEC_GENERATION_SECONDS = float(os.getenv("LARGE_SPEC_GENERATION_SECONDS", "300"))
+
+# Process pool for CPU-heavy spec work; 0 workers keeps everything inline
+SPEC_WORKERS = int(os.getenv("SPEC_WORKERS", "2"))
+# Longest a single spec task may run before it is interrupted (seconds)
+SPEC_TASK_TIMEOUT = float(os.getenv("SPEC_TASK_TIMEOUT", "20"))
+# Specs smaller than this (bytes) are processed inline, without the pool
+SPEC_OFFLOAD_THRESHOLD = int(os.getenv("SPEC_OFFLOAD_THRESHOLD", str(256 * 1024)))
+
+# Session management: "memory" keeps sessions in this process (single worker only),
+# "cookie" keeps them encrypted in the cookie so any worker or replica can read them
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+# Comma-separated secrets for cookie sessions; the first encrypts, all decrypt
+SESSION_SECRET_KEYS = [key.strip() for key in os.getenv("SESSION_SECRET_KEYS", "").split(",") if key.strip()]
+# Session limits (seconds)
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", str(8 * 60 * 60)))
+SESSION_ABSOLUTE_TTL = float(os.getenv("SESSION_ABSOLUTE_TTL", str(7 * 24 * 60 * 60)))
+# How often a session's token is rechecked with GitHub
+SESSION_REVALIDATE_INTERVAL = float(os.getenv("SESSION_REVALIDATE_INTERVAL", "300")) 
+# Response compression: encodings in order of preference ("br" needs the optional
+# brotli package); leave empty to turn compression off
+COMPRESSION_ENCODINGS = [encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if encoding.strip()]
+# Smaller responses (bytes) are sent as they are
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Media types worth compressing; event streams are left out so progress isn't buffered
+COMPRESSION_MEDIA_TYPES = [media_type.strip() for media_type in os.getenv(
+    "COMPRESSION_MEDIA_TYPES",
+    "text/html,text/css,text/plain,application/javascript,application/json,application/x-ndjson,image/svg+xml"
+).split(",") if media_type.strip()]
+# Levels for responses compressed per request; stored variants use the maximum
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Tracing: completed traces kept in memory for /internal/traces, and an
+# optional file each one is appended to as a JSON line
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+
+# Structured logging: JSON lines on stdout, written by a background thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Records waiting for the writer; more are dropped (and counted) rather than blocking requests
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of DEBUG records kept when LOG_LEVEL=DEBUG
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
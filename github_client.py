@@ -0,0 +1,377 @@
+import base64
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
+import httpx
+from config import (
+    GITHUB_API_URL,
+    GITHUB_HTTP_TIMEOUT,
+    GITHUB_MAX_CONNECTIONS,
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS
+)
+from metrics import github_request_duration
+from rate_limits import rate_limit_tracker, Reservation, TokenBudget
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Shared connection pool for every GitHub API call made by the app
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared, pooled HTTP client for the GitHub API."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            timeout=GITHUB_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=GITHUB_MAX_CONNECTIONS,
+                max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            headers={
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28"
+            }
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client and release its connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+class GitHubAPIError(Exception):
+    """Error returned by the GitHub API, mirroring PyGithub's GithubException."""
+
+    def __init__(self, status: int, data: Any, headers: Optional[httpx.Headers] = None):
+        self.status = status
+        self.data = data if isinstance(data, dict) else {"message": str(data)}
+        self.headers = headers if headers is not None else httpx.Headers()
+        super().__init__(f"{status} {self.data}")
+
+    @property
+    def is_rate_limited(self) -> bool:
+        """Whether GitHub rejected the request for a primary or secondary rate limit."""
+        if self.status == 429:
+            return True
+        if self.status != 403:
+            return False
+        return (
+            "Retry-After" in self.headers
+            or self.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in str(self.data.get("message", "")).lower()
+        )
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """Seconds GitHub asked us to wait before retrying, if it said."""
+        if "Retry-After" in self.headers:
+            try:
+                return max(float(self.headers["Retry-After"]), 0.0)
+            except ValueError:
+                return None
+        if self.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in self.headers:
+            return max(int(self.headers["X-RateLimit-Reset"]) - time.time(), 0.0)
+        return None
+
+def decode_content(contents: dict) -> bytes:
+    """Decode the base64 payload of a contents API response."""
+    return base64.b64decode(contents.get("content", ""))
+
+def _encode_content(content: Union[str, bytes]) -> str:
+    """Base64-encode file content for the contents API."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return base64.b64encode(content).decode("ascii")
+
+# Bytes of a file read per base64 chunk; a multiple of 3 so chunks encode independently
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+def _base64_content_body(fields: dict, content: Union[str, bytes, BinaryIO]) -> dict:
+    """Request arguments for a JSON body of fields plus base64 "content".
+
+    File content is streamed from the file in chunks with an exact
+    Content-Length, so large files are never held in memory as a whole.
+    """
+    if isinstance(content, (str, bytes)):
+        return {"json": {**fields, "content": _encode_content(content)}}
+
+    prefix = (json.dumps(fields)[:-1] + (", " if fields else "") + '"content": "').encode("utf-8")
+    suffix = b'"}'
+    size = content.seek(0, os.SEEK_END)
+
+    async def body():
+        yield prefix
+        content.seek(0)
+        while chunk := content.read(BASE64_CHUNK_SIZE):
+            yield base64.b64encode(chunk)
+        yield suffix
+
+    return {
+        "content": body(),
+        "headers": {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(prefix) + 4 * ((size + 2) // 3) + len(suffix))
+        }
+    }
+
+class GitHubClient:
+    """Async GitHub REST API client for a single access token."""
+
+    def __init__(self, access_token: str, reservation: Optional[Reservation] = None):
+        self.access_token = access_token
+        self.headers = {"Authorization": f"token {access_token}"}
+        # Rate limit budget set aside for this client's requests, if any
+        self.reservation = reservation
+        # ETags of polled resources, keyed by path
+        self.etags: Dict[str, str] = {}
+        # Response body bytes received, for comparing API payload sizes
+        self.bytes_received = 0
+
+    async def request(self, method: str, path: str, operation: str = "request", **kwargs) -> httpx.Response:
+        """Send a request to the GitHub API and raise GitHubAPIError on failure.
+
+        operation names the call in the github_request_duration_seconds metric
+        and in its trace span.
+        """
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        started = time.perf_counter()
+        with span(operation, "github", method=method) as call:
+            try:
+                response = await get_http_client().request(method, path, headers=headers, **kwargs)
+            except httpx.HTTPError:
+                github_request_duration.observe(time.perf_counter() - started, operation, "error")
+                raise
+            call.status = str(response.status_code)
+        logger.debug("GitHub request", extra={
+            "operation": operation, "method": method, "status": response.status_code,
+            "duration": time.perf_counter() - started
+        })
+        github_request_duration.observe(time.perf_counter() - started, operation, str(response.status_code))
+        rate_limit_tracker.record(self.access_token, response.headers)
+        if self.reservation is not None:
+            self.reservation.consume()
+        self.bytes_received += len(response.content)
+        if response.status_code >= 400:
+            try:
+                data = response.json()
+            except ValueError:
+                data = response.text
+            raise GitHubAPIError(response.status_code, data, response.headers)
+        return response
+
+    @property
+    def budget(self) -> TokenBudget:
+        """This token's shared core rate limit budget."""
+        return rate_limit_tracker.budget(self.access_token)
+
+    async def conditional_get(self, path: str, operation: str = "conditional_get") -> Tuple[int, Optional[Any]]:
+        """GET a resource with If-None-Match, for polling without spending rate limit.
+
+        Returns (status, data). A 304 means the resource is unchanged since the
+        last poll and data is None; 404 and 409 are returned instead of raised
+        so callers can keep polling resources that do not exist yet.
+        """
+        headers = {}
+        if path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        try:
+            response = await self.request("GET", path, headers=headers, operation=operation)
+        except GitHubAPIError as e:
+            if e.status in (404, 409):
+                self.etags.pop(path, None)
+                return e.status, None
+            raise
+        if response.status_code == 304:
+            return 304, None
+        if "ETag" in response.headers:
+            self.etags[path] = response.headers["ETag"]
+        return response.status_code, response.json()
+
+    async def paginate(self, path: str, params: Optional[dict] = None, operation: str = "paginate") -> AsyncIterator[dict]:
+        """Yield every item of a paginated list endpoint."""
+        params = {"per_page": 100, **(params or {})}
+        url = path
+        while url:
+            response = await self.request("GET", url, params=params, operation=operation)
+            for item in response.json():
+                yield item
+            # The next link already carries the query string
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+    async def graphql(self, query: str, variables: Optional[dict] = None) -> dict:
+        """Run a GraphQL query and return its data, raising GitHubAPIError on errors."""
+        response = await self.request(
+            "POST",
+            "/graphql",
+            json={"query": query, "variables": variables or {}},
+            operation="graphql"
+        )
+        body = response.json()
+        if body.get("errors"):
+            messages = "; ".join(error.get("message", "") for error in body["errors"])
+            raise GitHubAPIError(response.status_code, {"message": messages, "errors": body["errors"]}, response.headers)
+        return body["data"]
+
+    async def get_user(self) -> dict:
+        """Get the authenticated user."""
+        response = await self.request("GET", "/user", operation="get_user")
+        return response.json()
+
+    async def get_repo(self, full_name: str) -> dict:
+        """Get a repository by its full name."""
+        response = await self.request("GET", f"/repos/{full_name}", operation="get_repo")
+        return response.json()
+
+    async def create_repo_from_template(self, template_full_name: str, owner: str, name: str,
+                                       description: str, private: bool = True) -> dict:
+        """Create a new repository from a template repository."""
+        response = await self.request(
+            "POST",
+            f"/repos/{template_full_name}/generate",
+            json={
+                "owner": owner,
+                "name": name,
+                "description": description,
+                "private": private
+            },
+            operation="create_repo_from_template"
+        )
+        return response.json()
+
+    async def create_repo(self, name: str, description: str, private: bool = True,
+                          auto_init: bool = False) -> dict:
+        """Create a repository for the authenticated user."""
+        response = await self.request(
+            "POST",
+            "/user/repos",
+            json={
+                "name": name,
+                "description": description,
+                "private": private,
+                "auto_init": auto_init
+            },
+            operation="create_repo"
+        )
+        return response.json()
+
+    async def get_contents(self, full_name: str, path: str) -> Union[dict, List[dict]]:
+        """Get a file (dict) or directory listing (list) from a repository."""
+        response = await self.request("GET", f"/repos/{full_name}/contents/{path}", operation="get_contents")
+        return response.json()
+
+    async def create_file(self, full_name: str, path: str, message: str,
+                          content: Union[str, bytes, BinaryIO]) -> dict:
+        """Create a new file in a repository."""
+        response = await self.request(
+            "PUT",
+            f"/repos/{full_name}/contents/{path}",
+            **_base64_content_body({"message": message}, content),
+            operation="create_file"
+        )
+        return response.json()
+
+    async def update_file(self, full_name: str, path: str, message: str,
+                          content: Union[str, bytes], sha: str) -> dict:
+        """Update an existing file in a repository."""
+        response = await self.request(
+            "PUT",
+            f"/repos/{full_name}/contents/{path}",
+            json={"message": message, "content": _encode_content(content), "sha": sha},
+            operation="update_file"
+        )
+        return response.json()
+
+    async def delete_file(self, full_name: str, path: str, message: str, sha: str) -> dict:
+        """Delete a file from a repository."""
+        response = await self.request(
+            "DELETE",
+            f"/repos/{full_name}/contents/{path}",
+            json={"message": message, "sha": sha},
+            operation="delete_file"
+        )
+        return response.json()
+
+    async def get_repos(self) -> AsyncIterator[dict]:
+        """Yield every repository the authenticated user can access."""
+        async for repo in self.paginate("/user/repos", operation="get_repos"):
+            yield repo
+
+    async def add_to_collaborators(self, full_name: str, username: str,
+                                   permission: str = "push") -> Optional[dict]:
+        """Invite a user to a repository with the given permission."""
+        response = await self.request(
+            "PUT",
+            f"/repos/{full_name}/collaborators/{username}",
+            json={"permission": permission},
+            operation="add_to_collaborators"
+        )
+        # 201 returns the invitation, 204 means the user already has access
+        return response.json() if response.status_code == 201 else None
+
+    async def get_ref(self, full_name: str, ref: str) -> dict:
+        """Get a git reference such as heads/main."""
+        response = await self.request("GET", f"/repos/{full_name}/git/ref/{ref}", operation="get_ref")
+        return response.json()
+
+    async def update_ref(self, full_name: str, ref: str, sha: str, force: bool = False) -> dict:
+        """Point a git reference at a new commit."""
+        response = await self.request(
+            "PATCH",
+            f"/repos/{full_name}/git/refs/{ref}",
+            json={"sha": sha, "force": force},
+            operation="update_ref"
+        )
+        return response.json()
+
+    async def get_git_commit(self, full_name: str, sha: str) -> dict:
+        """Get a git commit object."""
+        response = await self.request("GET", f"/repos/{full_name}/git/commits/{sha}", operation="get_git_commit")
+        return response.json()
+
+    async def create_git_commit(self, full_name: str, message: str, tree: str,
+                                parents: List[str]) -> dict:
+        """Create a git commit object."""
+        response = await self.request(
+            "POST",
+            f"/repos/{full_name}/git/commits",
+            json={"message": message, "tree": tree, "parents": parents},
+            operation="create_git_commit"
+        )
+        return response.json()
+
+    async def get_tree(self, full_name: str, sha: str, recursive: bool = False) -> dict:
+        """Get a git tree object."""
+        params = {"recursive": "1"} if recursive else None
+        response = await self.request("GET", f"/repos/{full_name}/git/trees/{sha}", params=params, operation="get_tree")
+        return response.json()
+
+    async def create_tree(self, full_name: str, tree: List[dict],
+                          base_tree: Optional[str] = None) -> dict:
+        """Create a git tree, optionally on top of an existing one."""
+        payload: Dict[str, Any] = {"tree": tree}
+        if base_tree:
+            payload["base_tree"] = base_tree
+        response = await self.request("POST", f"/repos/{full_name}/git/trees", json=payload, operation="create_tree")
+        return response.json()
+
+    async def create_blob(self, full_name: str, content: Union[str, bytes, BinaryIO]) -> dict:
+        """Create a git blob."""
+        response = await self.request(
+            "POST",
+            f"/repos/{full_name}/git/blobs",
+            **_base64_content_body({"encoding": "base64"}, content),
+            operation="create_blob"
+        )
+        return response.json()
+
+    async def get_blob(self, full_name: str, sha: str) -> dict:
+        """Get a git blob; its content is base64-encoded like the contents API."""
+        response = await self.request("GET", f"/repos/{full_name}/git/blobs/{sha}", operation="get_blob")
+        return response.json()
@@ -1,235 +1,400 @@
 import json
+import logging
 import random
 import asyncio
-from typing import List, Tuple
+import posixpath
+import yaml
+from functools import partial
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
 from fastapi import HTTPException
-from github import Github
-from github.GithubException import GithubException
-from config import TEMPLATE_OWNER, TEMPLATE_REPO
+from config import (
+    TEMPLATE_OWNER,
+    TEMPLATE_REPO,
+    PROVISIONING_COMMIT_MODE,
+    PROVISIONING_REQUEST_BUDGET,
+    GITHUB_MAX_RATE_LIMIT_WAIT
+)
+from github_client import GitHubClient, GitHubAPIError, decode_content
 from models import RepositoryInfo, RepoAccessResult
+from pipeline import Step, run_steps
+from scheduler import RateLimitedScheduler
+from rate_limits import rate_limit_tracker, RateLimitExceeded
+from readiness import wait_until_ready, ReadinessTimeout
+from spec_diff import diff_specs, groups_to_regenerate
+from spec_workers import run_spec_task
+from utils import get_file_extension, parse_spec
+
+DEFAULT_SPEC_PATHS = ["fern/openapi.yaml", "fern/openapi.yml"]
+
+# Where the spec is kept as uploaded when a minimized copy is committed to fern/
+ORIGINAL_SPEC_DIR = "original-spec"
+
+logger = logging.getLogger(__name__)
+
+def render_generators_yml(current_content: str, spec_file_name: str, login: str, company_name: str) -> str:
+    """Point the template generators.yml at the new spec and SDK repositories."""
+    # Replace the commented repository lines with uncommented versions using the company name,
+    # update the OpenAPI spec filename, and update package names
+    return current_content.replace(
+        '    - openapi: openapi.yaml',
+        f'    - openapi: {spec_file_name}'
+    ).replace(
+        '          # github:\n          #   repository: fern-demo/starter-python-sdk',
+        f'        github:\n          repository: {login}/{company_name}-python-sdk'
+    ).replace(
+        '          # github:\n          #   repository: fern-demo/starter-typescript-sdk',
+        f'        github:\n          repository: {login}/{company_name}-typescript-sdk'
+    ).replace(
+        'package-name: startersdk',
+        f'package-name: {company_name.lower()}-sdk'
+    ).replace(
+        'pypi-package-name: startersdk',
+        f'pypi-package-name: {company_name.lower()}-sdk'
+    ).replace(
+        'npm-package-name: startersdk',
+        f'npm-package-name: {company_name.lower()}-sdk'
+    )
+
+def render_fern_config(current_content: str, company_name: str) -> Tuple[str, str]:
+    """Set a unique organization name in fern.config.json, returning (content, org_name)."""
+    config_content = json.loads(current_content)
+    
+    # Update the organization name - remove spaces and special characters, convert to lowercase
+    # and add random 6 digits at the end
+    base_name = ''.join(c.lower() for c in company_name if c.isalnum())
+    random_digits = str(random.randint(100000, 999999))
+    org_name = f"{base_name}{random_digits}"
+    config_content['organization'] = org_name
+    
+    # Convert back to JSON string with proper formatting
+    return json.dumps(config_content, indent=2), org_name
+
+def _branch_ref(new_repo: dict) -> str:
+    """Git reference of the repository's default branch."""
+    return f"heads/{new_repo.get('default_branch') or 'main'}"
+
+async def wait_for_template_copy(g: GitHubClient, new_repo: dict) -> Tuple[dict, float]:
+    """Wait until GitHub has copied the template into the new repository.
+
+    Returns the default branch reference and the seconds spent waiting.
+    """
+    ref_path = f"/repos/{new_repo['full_name']}/git/ref/{_branch_ref(new_repo)}"
+
+    async def probe():
+        # 404 means no branch yet, 409 means the repository is still empty
+        status, ref = await g.conditional_get(ref_path, operation="poll_template_copy")
+        return ref
 
-async def create_repo_from_template(access_token: str, company_name: str, spec_file_name: str, spec_content: str) -> tuple[str, Github, str, str]:
-    """Create a new repository from the template and delete existing spec."""
     try:
-        g = Github(access_token)
-        auth_user = g.get_user()
-        print(f"Authenticated as user: {auth_user.login}")
-        
-        # Get the template repository
-        template_repo = g.get_repo(f"{TEMPLATE_OWNER}/{TEMPLATE_REPO}")
-        print(f"Template repo: {template_repo.full_name}, Is template: {template_repo.is_template}")
-        
-        # Create a new repository from the template
-        repo_name = f"{company_name}-config"
-        repo_description = f"SDK configuration for {company_name}"
+        return await wait_until_ready(probe, f"template copy in {new_repo['full_name']}")
+    except ReadinessTimeout as e:
+        raise HTTPException(status_code=500, detail=f"Template contents not available: {str(e)}")
+
+async def write_config_with_contents_api(g: GitHubClient, new_repo: dict, login: str, company_name: str,
+                                         spec_file_name: str, spec_content: BinaryIO,
+                                         original_spec: Optional[BinaryIO] = None) -> float:
+    """Write the spec and config files with one Contents API commit per change.
+
+    Returns the seconds spent waiting for GitHub to catch up.
+    """
+    full_name = new_repo['full_name']
+    _, waited = await wait_for_template_copy(g, new_repo)
+
+    # Try to delete the existing OpenAPI spec file (trying both .yaml and .yml extensions)
+    deleted = False
+    for file_path in DEFAULT_SPEC_PATHS:
+        contents_path = f"/repos/{full_name}/contents/{file_path}"
+        try:
+            status, contents = await g.conditional_get(contents_path, operation="get_contents")
+            if contents is None:
+                logger.debug("Spec file not found", extra={"repo": full_name, "path": file_path})
+                continue
+
+            # Handle if contents is a list (directory)
+            if isinstance(contents, list):
+                logger.warning("Spec path is a directory", extra={"repo": full_name, "path": file_path, "items": len(contents)})
+                continue
+                
+            logger.debug("Deleting default spec file", extra={"repo": full_name, "path": file_path, "sha": contents['sha']})
+            await g.delete_file(
+                full_name,
+                path=contents['path'],
+                message="Remove default OpenAPI spec",
+                sha=contents['sha']
+            )
+
+            async def file_gone():
+                # 304 and 200 both mean the file is still being served
+                status, _ = await g.conditional_get(contents_path, operation="poll_file_deleted")
+                return True if status == 404 else None
+
+            # Wait and verify deletion
+            try:
+                _, deletion_wait = await wait_until_ready(file_gone, f"deletion of {file_path}")
+                waited += deletion_wait
+                logger.debug("Verified deletion", extra={"repo": full_name, "path": file_path, "duration": deletion_wait})
+                deleted = True
+                break  # Exit loop after successful deletion and verification
+            except ReadinessTimeout as e:
+                waited += e.waited
+                logger.warning("Deletion could not be verified", extra={"repo": full_name, "path": file_path, "duration": e.waited})
+        except GitHubAPIError as e:
+            logger.error("GitHub error deleting spec file", extra={"repo": full_name, "path": file_path, "status": e.status, "data": e.data})
+            raise
+
+    if not deleted:
+        logger.warning("Could not find original spec file to delete", extra={"repo": full_name})
+
+    # Create the new spec file
+    try:
+        await g.create_file(
+            new_repo['full_name'],
+            path=f"fern/{spec_file_name}",
+            message="Add OpenAPI specification",
+            content=spec_content,
+        )
+        logger.info("Created spec file", extra={"repo": full_name, "path": f"fern/{spec_file_name}"})
+        if original_spec is not None:
+            await g.create_file(
+                new_repo['full_name'],
+                path=f"{ORIGINAL_SPEC_DIR}/{spec_file_name}",
+                message="Add the OpenAPI specification as uploaded",
+                content=original_spec,
+            )
+    except GitHubAPIError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create spec file: {str(e)}")
+
+    # Update generators.yml with correct repository names and spec file
+    try:
+        generators_yml = await g.get_contents(new_repo['full_name'], "fern/generators.yml")
+        updated_content = render_generators_yml(
+            decode_content(generators_yml).decode('utf-8'), spec_file_name, login, company_name
+        )
         
+        await g.update_file(
+            new_repo['full_name'],
+            path="fern/generators.yml",
+            message="Update SDK repository names and spec filename",
+            content=updated_content,
+            sha=generators_yml['sha']
+        )
+        logger.info("Updated generators.yml", extra={"repo": full_name})
+
+        # Update fern.config.json with the company name
+        try:
+            fern_config = await g.get_contents(new_repo['full_name'], "fern/fern.config.json")
+            updated_config, org_name = render_fern_config(
+                decode_content(fern_config).decode('utf-8'), company_name
+            )
+            
+            await g.update_file(
+                new_repo['full_name'],
+                path="fern/fern.config.json",
+                message="Update organization name in fern.config.json",
+                content=updated_config,
+                sha=fern_config['sha']
+            )
+            logger.info("Updated fern.config.json", extra={"repo": full_name, "organization": org_name})
+        except GitHubAPIError as e:
+            logger.warning("Failed to update fern.config.json", extra={"repo": full_name, "error": str(e)})
+            # Don't raise an exception here as the main functionality succeeded
+
+    except GitHubAPIError as e:
+        logger.warning("Failed to update generators.yml", extra={"repo": full_name, "error": str(e)})
+        # Don't raise an exception here as the main functionality succeeded
+
+    return waited
+
+async def write_config_with_git_data_api(g: GitHubClient, new_repo: dict, login: str, company_name: str,
+                                         spec_file_name: str, spec_content: BinaryIO,
+                                         original_spec: Optional[BinaryIO] = None) -> float:
+    """Write the spec and config files as a single commit through the Git Data API.
+
+    Returns the seconds spent waiting for GitHub to catch up.
+    """
+    full_name = new_repo['full_name']
+    branch_ref = _branch_ref(new_repo)
+
+    # The template copy is populated asynchronously, so wait for the branch to exist
+    ref, waited = await wait_for_template_copy(g, new_repo)
+
+    try:
+        head_sha = ref['object']['sha']
+        head_commit = await g.get_git_commit(full_name, head_sha)
+        base_tree = await g.get_tree(full_name, head_commit['tree']['sha'], recursive=True)
+        blob_shas = {entry['path']: entry['sha'] for entry in base_tree['tree'] if entry['type'] == 'blob'}
+
+        # Read the config files from the same snapshot the new commit is based on, while
+        # uploading the spec as a blob since it can be too large to inline in the tree
+        spec_uploads = [g.create_blob(full_name, spec_content)]
+        if original_spec is not None:
+            spec_uploads.append(g.create_blob(full_name, original_spec))
+        generators_yml, fern_config, spec_blob, *original_blob = await asyncio.gather(
+            g.get_blob(full_name, blob_shas["fern/generators.yml"]),
+            g.get_blob(full_name, blob_shas["fern/fern.config.json"]),
+            *spec_uploads
+        )
+        updated_generators = render_generators_yml(
+            decode_content(generators_yml).decode('utf-8'), spec_file_name, login, company_name
+        )
+        updated_config, org_name = render_fern_config(
+            decode_content(fern_config).decode('utf-8'), company_name
+        )
+
+        tree = [
+            {"path": f"fern/{spec_file_name}", "mode": "100644", "type": "blob", "sha": spec_blob['sha']},
+            {"path": "fern/generators.yml", "mode": "100644", "type": "blob", "content": updated_generators},
+            {"path": "fern/fern.config.json", "mode": "100644", "type": "blob", "content": updated_config},
+        ]
+        for blob in original_blob:
+            tree.append({"path": f"{ORIGINAL_SPEC_DIR}/{spec_file_name}", "mode": "100644", "type": "blob", "sha": blob['sha']})
+        # A null sha removes the default spec, unless the upload replaces that same path
+        for file_path in DEFAULT_SPEC_PATHS:
+            if file_path in blob_shas and file_path != f"fern/{spec_file_name}":
+                tree.append({"path": file_path, "mode": "100644", "type": "blob", "sha": None})
+
+        new_tree = await g.create_tree(full_name, tree, base_tree=head_commit['tree']['sha'])
+        commit = await g.create_git_commit(
+            full_name,
+            message="Add OpenAPI specification and configure SDK generators",
+            tree=new_tree['sha'],
+            parents=[head_sha]
+        )
+        await g.update_ref(full_name, branch_ref, commit['sha'])
+        logger.info("Committed configuration", extra={
+            "repo": full_name, "path": f"fern/{spec_file_name}", "organization": org_name, "commit": commit['sha']
+        })
+    except KeyError as e:
+        raise HTTPException(status_code=500, detail=f"Template is missing {str(e)}")
+    except GitHubAPIError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to commit configuration: {str(e)}")
+
+    return waited
+
+async def create_sdk_repo(g: GitHubClient, company_name: str, language: str) -> dict:
+    """Create an empty SDK repository for one language."""
+    repo_name = f"{company_name}-{language.lower()}-sdk"
+    repo = await g.create_repo(
+        name=repo_name,
+        description=f"{language} SDK for {company_name} API",
+        private=True,
+        auto_init=True  # Initialize with README
+    )
+    logger.info("Created SDK repository", extra={"repo": repo["full_name"], "language": language})
+    return repo
+
+async def create_repo_from_template(access_token: str, company_name: str, spec_file_name: str, spec_content: BinaryIO,
+                                    progress: Optional[Callable[[str, str], None]] = None,
+                                    original_spec: Optional[BinaryIO] = None) -> tuple[str, GitHubClient, str, str]:
+    """Create a new repository from the template and replace the default spec.
+
+    If given, progress is called with (step, message) as each provisioning step completes.
+    When spec_content is a minimized spec, pass the upload as original_spec to
+    keep it in the repository under ORIGINAL_SPEC_DIR.
+    """
+    # Fail before creating anything if the token cannot afford the whole run
+    try:
+        reservation = rate_limit_tracker.reserve(access_token, PROVISIONING_REQUEST_BUDGET)
+    except RateLimitExceeded as e:
+        raise ValueError(str(e))
+    g = GitHubClient(access_token, reservation=reservation)
+    repo_name = f"{company_name}-config"
+    repo_description = f"SDK configuration for {company_name}"
+
+    def report(step: str, message: str):
+        if progress is not None:
+            progress(step, message)
+
+    async def get_auth_user() -> dict:
+        auth_user = await g.get_user()
+        logger.debug("Authenticated", extra={"login": auth_user['login']})
+        return auth_user
+
+    async def get_template_repo() -> dict:
+        template_repo = await g.get_repo(f"{TEMPLATE_OWNER}/{TEMPLATE_REPO}")
+        logger.debug("Found template repository", extra={"repo": template_repo['full_name'], "is_template": template_repo.get('is_template')})
+        return template_repo
+
+    async def create_config_repo(auth_user: dict, template_repo: dict) -> dict:
         try:
             # Create repository from template using the correct method
-            new_repo = auth_user.create_repo_from_template(
+            new_repo = await g.create_repo_from_template(
+                template_full_name=template_repo['full_name'],
+                owner=auth_user['login'],
                 name=repo_name,
                 description=repo_description,
-                private=True,
-                repo=template_repo
+                private=True
             )
+            report("template_created", f"Created {new_repo['full_name']} from the template")
+            return new_repo
+        except GitHubAPIError as e:
+            logger.error("Failed to create config repository", extra={"repo": repo_name, "status": e.status, "data": e.data})
+            raise
 
-            async def verify_file_deleted(repo, file_path: str, max_retries: int = 3) -> bool:
-                """Verify a file is deleted with retries."""
-                for i in range(max_retries):
-                    try:
-                        repo.get_contents(file_path)
-                        if i < max_retries - 1:  # Don't sleep on last attempt
-                            await asyncio.sleep(1)  # Wait a second before retrying
-                        continue  # File still exists
-                    except GithubException as e:
-                        if e.status == 404:  # File is gone
-                            return True
-                        raise  # Other error
-                return False  # File still exists after all retries
-
-            # Try to delete the existing OpenAPI spec file (trying both .yaml and .yml extensions)
-            deleted = False
-            max_retries = 3
-            
-            async def find_spec_file(repo, file_path: str) -> tuple[bool, any]:
-                """Try to find a file with retries."""
-                for attempt in range(max_retries):
-                    try:
-                        print(f"Attempt {attempt + 1}/{max_retries} to find {file_path}")
-                        contents = repo.get_contents(file_path)
-                        return True, contents
-                    except GithubException as e:
-                        if e.status != 404:  # Only retry on 404
-                            raise
-                        if attempt < max_retries - 1:
-                            print(f"File not found, waiting before retry...")
-                            await asyncio.sleep(2)  # Wait 2 seconds between attempts
-                return False, None
-
-            for file_path in ["fern/openapi.yaml", "fern/openapi.yml"]:
-                try:
-                    found, contents = await find_spec_file(new_repo, file_path)
-                    if not found:
-                        print(f"File {file_path} not found after {max_retries} attempts")
-                        continue
-
-                    # Handle if contents is a list (directory)
-                    if isinstance(contents, list):
-                        print(f"Warning: {file_path} is a directory containing {len(contents)} items")
-                        continue
-                        
-                    print(f"Found file {file_path} with SHA: {contents.sha}")
-                    
-                    print(f"Attempting to delete {file_path}")
-                    new_repo.delete_file(
-                        path=contents.path,
-                        message="Remove default OpenAPI spec",
-                        sha=contents.sha
-                    )
-                    print(f"Delete API call completed for {file_path}")
-                    
-                    # Wait and verify deletion
-                    if await verify_file_deleted(new_repo, file_path):
-                        print(f"Verified deletion of {file_path}")
-                        deleted = True
-                        break  # Exit loop after successful deletion and verification
-                    else:
-                        print(f"Warning: {file_path} deletion could not be verified")
-                except GithubException as e:
-                    if e.status != 404:  # Only raise if error is not "file not found"
-                        print(f"GitHub error for {file_path}: Status {e.status}, Data: {e.data}")
-                        raise
-                    print(f"Unexpected error for {file_path}")
-
-            if not deleted:
-                print("Warning: Could not find original spec file to delete")
-
-            # Add a longer delay before creating the new file
-            await asyncio.sleep(5)  # Wait 5 seconds before creating new file
-
-            # Create the new spec file
-            try:
-                new_repo.create_file(
-                    path=f"fern/{spec_file_name}",
-                    message="Add OpenAPI specification",
-                    content=spec_content,
-                )
-                print(f"Created new spec file: fern/{spec_file_name}")
-            except GithubException as e:
-                raise HTTPException(status_code=500, detail=f"Failed to create spec file: {str(e)}")
-
-            # Update generators.yml with correct repository names and spec file
-            try:
-                generators_yml = new_repo.get_contents("fern/generators.yml")
-                current_content = generators_yml.decoded_content.decode('utf-8')
-                
-                # Replace the commented repository lines with uncommented versions using the company name,
-                # update the OpenAPI spec filename, and update package names
-                updated_content = current_content.replace(
-                    '    - openapi: openapi.yaml',
-                    f'    - openapi: {spec_file_name}'
-                ).replace(
-                    '          # github:\n          #   repository: fern-demo/starter-python-sdk',
-                    f'        github:\n          repository: {auth_user.login}/{company_name}-python-sdk'
-                ).replace(
-                    '          # github:\n          #   repository: fern-demo/starter-typescript-sdk',
-                    f'        github:\n          repository: {auth_user.login}/{company_name}-typescript-sdk'
-                ).replace(
-                    'package-name: startersdk',
-                    f'package-name: {company_name.lower()}-sdk'
-                ).replace(
-                    'pypi-package-name: startersdk',
-                    f'pypi-package-name: {company_name.lower()}-sdk'
-                ).replace(
-                    'npm-package-name: startersdk',
-                    f'npm-package-name: {company_name.lower()}-sdk'
-                )
-                
-                new_repo.update_file(
-                    path="fern/generators.yml",
-                    message="Update SDK repository names and spec filename",
-                    content=updated_content,
-                    sha=generators_yml.sha
-                )
-                print("Updated generators.yml with SDK repository names and spec filename")
-
-                # Update fern.config.json with the company name
-                try:
-                    fern_config = new_repo.get_contents("fern/fern.config.json")
-                    config_content = json.loads(fern_config.decoded_content.decode('utf-8'))
-                    
-                    # Update the organization name - remove spaces and special characters, convert to lowercase
-                    # and add random 6 digits at the end
-                    base_name = ''.join(c.lower() for c in company_name if c.isalnum())
-                    random_digits = str(random.randint(100000, 999999))
-                    org_name = f"{base_name}{random_digits}"
-                    config_content['organization'] = org_name
-                    
-                    # Convert back to JSON string with proper formatting
-                    updated_config = json.dumps(config_content, indent=2)
-                    
-                    new_repo.update_file(
-                        path="fern/fern.config.json",
-                        message="Update organization name in fern.config.json",
-                        content=updated_config,
-                        sha=fern_config.sha
-                    )
-                    print(f"Updated fern.config.json with organization name: {org_name}")
-                except GithubException as e:
-                    print(f"Warning: Failed to update fern.config.json: {str(e)}")
-                    # Don't raise an exception here as the main functionality succeeded
+    async def write_config_files(new_repo: dict, auth_user: dict):
+        if PROVISIONING_COMMIT_MODE == "contents":
+            readiness_wait = await write_config_with_contents_api(
+                g, new_repo, auth_user['login'], company_name, spec_file_name, spec_content, original_spec
+            )
+        else:
+            readiness_wait = await write_config_with_git_data_api(
+                g, new_repo, auth_user['login'], company_name, spec_file_name, spec_content, original_spec
+            )
+        logger.info("Waited for repository to be ready", extra={"repo": new_repo['full_name'], "duration": readiness_wait})
+        report("spec_committed", f"Committed fern/{spec_file_name}")
+        report("generators_updated", "Updated generators.yml and fern.config.json")
 
-            except GithubException as e:
-                print(f"Warning: Failed to update generators.yml: {str(e)}")
-                # Don't raise an exception here as the main functionality succeeded
+    async def create_python_sdk_repo(new_repo: dict) -> dict:
+        python_repo = await create_sdk_repo(g, company_name, "Python")
+        report("python_sdk_repo_created", f"Created {python_repo['full_name']}")
+        return python_repo
 
-            # Create SDK repositories and install Fern API app
-            try:
-                # Create Python SDK repository
-                python_repo_name = f"{company_name}-python-sdk"
-                print(f"Creating Python SDK repository: {python_repo_name}")
-                python_repo = auth_user.create_repo(
-                    name=python_repo_name,
-                    description=f"Python SDK for {company_name} API",
-                    private=True,
-                    auto_init=True  # Initialize with README
-                )
-                print(f"Created Python SDK repository: {python_repo_name}")
-
-                # Create TypeScript SDK repository
-                typescript_repo_name = f"{company_name}-typescript-sdk"
-                print(f"Creating TypeScript SDK repository: {typescript_repo_name}")
-                typescript_repo = auth_user.create_repo(
-                    name=typescript_repo_name,
-                    description=f"TypeScript SDK for {company_name} API",
-                    private=True,
-                    auto_init=True  # Initialize with README
-                )
-                print(f"Created TypeScript SDK repository: {typescript_repo_name}")
-
-                # Install Fern API app in all repositories
-                fern_app_url = "https://github.com/apps/fern-api/installations/new"
-                repos_to_install = [
-                    new_repo.full_name,  # Config repo
-                    f"{auth_user.login}/{python_repo_name}",  # Python SDK repo
-                    f"{auth_user.login}/{typescript_repo_name}"  # TypeScript SDK repo
-                ]
-                
-                installation_url = f"{fern_app_url}?repository_ids={','.join([str(repo.id) for repo in [new_repo, python_repo, typescript_repo]])}"
-                print(f"Installing Fern API app in repositories...")
-                
-                # Return the installation URL to the user
-                return new_repo.html_url, g, new_repo.full_name, installation_url
+    async def create_typescript_sdk_repo(new_repo: dict) -> dict:
+        typescript_repo = await create_sdk_repo(g, company_name, "TypeScript")
+        report("typescript_sdk_repo_created", f"Created {typescript_repo['full_name']}")
+        return typescript_repo
 
-            except GithubException as e:
-                print(f"Warning: Failed to create SDK repositories: {str(e)}")
-                # Don't raise an exception as the main config repo was created successfully
-                return new_repo.html_url, g, new_repo.full_name, None
-            
-        except GithubException as e:
-            print(f"Detailed GitHub error: Status {e.status}, Data: {e.data}")
-            raise
+    # The config files and both SDK repositories only need the config repository
+    # to exist, so they are created concurrently
+    with reservation:
+        results, errors = await run_steps([
+            Step("auth_user", get_auth_user),
+            Step("template_repo", get_template_repo),
+            Step("config_repo", create_config_repo, depends_on=["auth_user", "template_repo"]),
+            Step("config_files", write_config_files, depends_on=["config_repo", "auth_user"]),
+            Step("python_sdk_repo", create_python_sdk_repo, depends_on=["config_repo"]),
+            Step("typescript_sdk_repo", create_typescript_sdk_repo, depends_on=["config_repo"]),
+        ])
+
+    try:
+        # The config repository and its files are required, in dependency order
+        for step_name in ["auth_user", "template_repo", "config_repo", "config_files"]:
+            if step_name in errors:
+                raise errors[step_name]
+        new_repo = results["config_repo"]
+
+        sdk_errors = [errors[name] for name in ["python_sdk_repo", "typescript_sdk_repo"] if name in errors]
+        if sdk_errors:
+            logger.warning("Failed to create SDK repositories", extra={"errors": [str(e) for e in sdk_errors]})
+            report("sdk_repos_failed", "Could not create the SDK repositories")
+            # Don't raise an exception as the main config repo was created successfully
+            return new_repo['html_url'], g, new_repo['full_name'], None
+
+        # Install Fern API app in all repositories
+        fern_app_url = "https://github.com/apps/fern-api/installations/new"
+        repos_to_install = [
+            new_repo,  # Config repo
+            results["python_sdk_repo"],  # Python SDK repo
+            results["typescript_sdk_repo"]  # TypeScript SDK repo
+        ]
+        
+        installation_url = f"{fern_app_url}?repository_ids={','.join([str(repo['id']) for repo in repos_to_install])}"
+        report("installation_url_ready", "Fern API app installation link is ready")
+        
+        # Return the installation URL to the user
+        return new_repo['html_url'], g, new_repo['full_name'], installation_url
             
-    except GithubException as e:
+    except GitHubAPIError as e:
         if e.status == 422:  # Repository already exists
             raise ValueError(f"A repository named '{repo_name}' already exists.")
         elif e.status == 403:  # Permission denied
@@ -240,60 +405,190 @@ async def create_repo_from_template(access_token: str, company_name: str, spec_f
     except Exception as e:
         raise ValueError(f"Failed to create repository: {str(e)}")
 
-async def get_user_repositories(access_token: str) -> List[RepositoryInfo]:
-    """Get user's repositories where they have admin access."""
+def committed_spec_path(generators_yml: str) -> Optional[str]:
+    """Repository path of the spec generators.yml points at, if it names one."""
+    config = yaml.safe_load(generators_yml) or {}
+    specs = (config.get("api") or {}).get("specs") if isinstance(config.get("api"), dict) else None
+    if isinstance(specs, list):
+        for spec in specs:
+            if isinstance(spec, dict) and isinstance(spec.get("openapi"), str):
+                return posixpath.normpath(posixpath.join("fern", spec["openapi"]))
+    return None
+
+async def update_config_repo(access_token: str, company_name: str, spec_file_name: str, spec_content: BinaryIO,
+                             spec_data: dict, spec_sha: str, progress: Optional[Callable[[str, str], None]] = None,
+                             original_spec: Optional[BinaryIO] = None) -> Dict[str, Any]:
+    """Replace the spec in an existing config repository, if it changed.
+
+    spec_sha is the git blob SHA of the upload, compared with the committed
+    upload (under ORIGINAL_SPEC_DIR when a minimized copy was committed, else
+    the spec generators.yml points at). When they match nothing is written.
+    Otherwise the old spec is diffed against spec_data and only the spec
+    (and original_spec, when spec_content is minimized) is committed, in one
+    Git Data API commit whatever PROVISIONING_COMMIT_MODE is.
+
+    Returns the repository, whether it was unchanged, the structural diff and
+    the generators.yml groups whose SDKs need regenerating.
+    """
     try:
-        g = Github(access_token)
-        auth_user = g.get_user()
-        
-        repositories = []
-        for repo in auth_user.get_repos():
-            try:
-                # Check if user has admin permissions
-                if repo.permissions and repo.permissions.admin:
-                    repositories.append(RepositoryInfo(
-                        id=repo.id,
-                        name=repo.name,
-                        full_name=repo.full_name,
-                        description=repo.description,
-                        private=repo.private,
-                        permissions={
-                            'admin': repo.permissions.admin,
-                            'maintain': repo.permissions.maintain if hasattr(repo.permissions, 'maintain') else False,
-                            'push': repo.permissions.push,
-                            'pull': repo.permissions.pull
-                        }
-                    ))
-            except Exception as repo_error:
-                print(f"Error processing repo {repo.name}: {str(repo_error)}")
-                continue
-        
-        return repositories
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch repositories: {str(e)}")
+        reservation = rate_limit_tracker.reserve(access_token, PROVISIONING_REQUEST_BUDGET)
+    except RateLimitExceeded as e:
+        raise ValueError(str(e))
+    g = GitHubClient(access_token, reservation=reservation)
+
+    def report(step: str, message: str):
+        if progress is not None:
+            progress(step, message)
+
+    try:
+        with reservation:
+            auth_user = await g.get_user()
+            repo = await g.get_repo(f"{auth_user['login']}/{company_name}-config")
+            full_name = repo['full_name']
+            branch_ref = _branch_ref(repo)
+
+            ref = await g.get_ref(full_name, branch_ref)
+            head_sha = ref['object']['sha']
+            head_commit = await g.get_git_commit(full_name, head_sha)
+            base_tree = await g.get_tree(full_name, head_commit['tree']['sha'], recursive=True)
+            blob_shas = {entry['path']: entry['sha'] for entry in base_tree['tree'] if entry['type'] == 'blob'}
+
+            generators_yml = decode_content(await g.get_blob(full_name, blob_shas["fern/generators.yml"])).decode('utf-8')
+            spec_path = committed_spec_path(generators_yml) or f"fern/{spec_file_name}"
+            if get_file_extension(spec_path) != get_file_extension(spec_file_name):
+                raise ValueError(f"{full_name} keeps its spec as {spec_path}; upload a "
+                                 f"{get_file_extension(spec_path)[1:].upper()} file to update it.")
+            original_path = f"{ORIGINAL_SPEC_DIR}/{posixpath.basename(spec_path)}"
+            committed_path = original_path if original_path in blob_shas else spec_path
+
+            result = {
+                "company_name": company_name,
+                "repo_url": repo['html_url'],
+                "repo_full_name": full_name,
+                "spec_path": spec_path,
+                "unchanged": blob_shas.get(committed_path) == spec_sha,
+                "diff": None,
+                "regenerate_groups": [],
+                "commit_sha": None
+            }
+            if result["unchanged"]:
+                report("spec_unchanged", f"{committed_path} already matches the upload; nothing to commit")
+                return result
+
+            old_spec, old_size = {}, 0
+            if committed_path in blob_shas:
+                old_blob = await g.get_blob(full_name, blob_shas[committed_path])
+                old_content = decode_content(old_blob)
+                old_size = len(old_content)
+                try:
+                    old_spec = await run_spec_task(
+                        parse_spec, old_content, get_file_extension(committed_path), size=old_size
+                    )
+                except ValueError as e:
+                    logger.warning("Could not parse the committed spec", extra={"repo": full_name, "path": committed_path, "error": str(e)})
+            diff = await run_spec_task(diff_specs, old_spec, spec_data, size=old_size)
+            result["diff"] = diff
+            result["regenerate_groups"] = groups_to_regenerate(generators_yml, old_spec, spec_data, diff)
+            report("spec_diffed", f"{sum(len(names) for names in diff['operations'].values())} operations and "
+                                  f"{sum(len(names) for names in diff['schemas'].values())} schemas changed")
+
+            spec_uploads = [g.create_blob(full_name, spec_content)]
+            if original_spec is not None:
+                spec_uploads.append(g.create_blob(full_name, original_spec))
+            spec_blob, *original_blob = await asyncio.gather(*spec_uploads)
+            tree = [{"path": spec_path, "mode": "100644", "type": "blob", "sha": spec_blob['sha']}]
+            if original_blob or original_path in blob_shas:
+                # Keep the copy as uploaded in step with the spec, or later updates would compare against it
+                original_sha = original_blob[0]['sha'] if original_blob else spec_blob['sha']
+                tree.append({"path": original_path, "mode": "100644", "type": "blob", "sha": original_sha})
+            new_tree = await g.create_tree(full_name, tree, base_tree=head_commit['tree']['sha'])
+            commit = await g.create_git_commit(
+                full_name,
+                message="Update OpenAPI specification",
+                tree=new_tree['sha'],
+                parents=[head_sha]
+            )
+            await g.update_ref(full_name, branch_ref, commit['sha'])
+            result["commit_sha"] = commit['sha']
+            logger.info("Committed spec update", extra={"repo": full_name, "path": spec_path, "commit": commit['sha']})
+            report("spec_committed", f"Committed {spec_path}")
+            return result
+    except KeyError as e:
+        raise ValueError(f"Config repository is missing {str(e)}")
+    except GitHubAPIError as e:
+        if e.status == 404:
+            raise ValueError(f"No repository named '{company_name}-config' was found to update.")
+        elif e.status == 422:  # The branch moved since it was read
+            raise ValueError(f"'{company_name}-config' changed while updating it. Please try again.")
+        raise ValueError(f"GitHub API error ({e.status}): {e.data.get('message', str(e))}")
+
+def to_repository_info(repo: dict) -> Optional[RepositoryInfo]:
+    """Convert a REST repository to RepositoryInfo, or None if the user is not an admin."""
+    permissions = repo.get('permissions') or {}
+    # Check if user has admin permissions
+    if not permissions.get('admin'):
+        return None
+    return RepositoryInfo(
+        id=repo['id'],
+        name=repo['name'],
+        full_name=repo['full_name'],
+        description=repo.get('description'),
+        private=repo['private'],
+        permissions={
+            'admin': permissions.get('admin', False),
+            'maintain': permissions.get('maintain', False),
+            'push': permissions.get('push', False),
+            'pull': permissions.get('pull', False)
+        }
+    )
+
+def graphql_to_repository_info(node: dict) -> Optional[RepositoryInfo]:
+    """Convert a GraphQL repository node to RepositoryInfo, or None if the viewer is not an admin."""
+    if node.get('viewerPermission') != 'ADMIN':
+        return None
+    # An admin can do everything lower permission levels allow
+    return RepositoryInfo(
+        id=node['databaseId'],
+        name=node['name'],
+        full_name=node['nameWithOwner'],
+        description=node.get('description'),
+        private=node['isPrivate'],
+        permissions={'admin': True, 'maintain': True, 'push': True, 'pull': True}
+    )
 
 async def add_users_to_repositories(access_token: str, repositories: List[str], usernames: List[str]) -> List[RepoAccessResult]:
     """Add users to repositories with maintain permissions."""
-    g = Github(access_token)
-    results = []
+    pairs = [(repo_name, username) for repo_name in repositories for username in usernames]
     
-    for repo_name in repositories:
-        repo = g.get_repo(repo_name)
-        for username in usernames:
-            try:
-                repo.add_to_collaborators(username, permission='maintain')
-                results.append(RepoAccessResult(
-                    repository=repo_name,
-                    username=username,
-                    success=True,
-                    message='Successfully added as maintainer'
-                ))
-            except Exception as e:
-                results.append(RepoAccessResult(
-                    repository=repo_name,
-                    username=username,
-                    success=False,
-                    message=str(e)
-                ))
+    # Fail every pair up front rather than running the token dry halfway through
+    try:
+        reservation = rate_limit_tracker.reserve(access_token, len(pairs), max_wait=GITHUB_MAX_RATE_LIMIT_WAIT)
+    except RateLimitExceeded as e:
+        outcomes = [e] * len(pairs)
+    else:
+        with reservation:
+            g = GitHubClient(access_token, reservation=reservation)
+            scheduler = RateLimitedScheduler(g)
+            outcomes = await scheduler.run([
+                partial(g.add_to_collaborators, repo_name, username, permission='maintain')
+                for repo_name, username in pairs
+            ])
+    
+    results = []
+    for (repo_name, username), outcome in zip(pairs, outcomes):
+        if isinstance(outcome, Exception):
+            results.append(RepoAccessResult(
+                repository=repo_name,
+                username=username,
+                success=False,
+                message=str(outcome)
+            ))
+        else:
+            results.append(RepoAccessResult(
+                repository=repo_name,
+                username=username,
+                success=True,
+                message='Successfully added as maintainer'
+            ))
     
-    return results 
\ No newline at end of file
+    return results
\ No newline at end of file
@@ -0,0 +1,59 @@
+from typing import Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app_logging import logging_stats
+from auth import require_internal_access
+from compression import compression_snapshot
+from metrics import render_metrics
+from rate_limits import rate_limit_tracker
+from readiness import readiness_stats
+from repo_cache import listing_stats, repository_cache
+from spec_workers import offload_stats
+from tracing import recent_traces
+from utils import parse_cache_snapshot
+
+router = APIRouter(prefix="/internal", dependencies=[Depends(require_internal_access)])
+
+# Prometheus scrapes /metrics by default; it takes the same bearer token
+metrics_router = APIRouter(dependencies=[Depends(require_internal_access)])
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Route latency, in-flight requests and GitHub call latency in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@router.get("/rate-limits")
+async def get_rate_limits():
+    """Rate limit budget, burn rate and projected exhaustion of every tracked token."""
+    return {"tokens": rate_limit_tracker.snapshot()}
+
+@router.get("/readiness")
+async def get_readiness_stats():
+    """Waits for GitHub to finish copying templates and deleting files: count, polls, timeouts and time spent."""
+    waits = readiness_stats["waits"]
+    return {**readiness_stats, "average_seconds": readiness_stats["total_seconds"] / waits if waits else 0.0}
+
+@router.get("/repositories")
+async def get_repository_listing_stats():
+    """Repository listing cache hits, revalidations and misses, and fetch cost per listing backend."""
+    return {"cache": repository_cache.snapshot(), "backends": listing_stats}
+
+@router.get("/specs")
+async def get_spec_stats():
+    """Parse cache hits and misses for uploaded specs, and spec tasks run inline or in the worker pool."""
+    return {"parse_cache": parse_cache_snapshot(), "workers": offload_stats}
+
+@router.get("/compression")
+async def get_compression_stats():
+    """Responses compressed and bytes saved per encoding, including stored variants served."""
+    return {"encodings": compression_snapshot()}
+
+@router.get("/traces")
+async def get_traces(limit: int = 50, trace_id: Optional[str] = None):
+    """Recently completed request and job traces, newest first, with their spans."""
+    return {"traces": recent_traces(limit=max(limit, 0), trace_id=trace_id)}
+
+@router.get("/logging")
+async def get_logging_stats():
+    """Log records queued for the writer, dropped because the queue was full, and debug records sampled out."""
+    return logging_stats
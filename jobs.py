@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import secrets
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from config import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RETENTION, JOB_BACKEND, JOB_STORE_DIR, JOB_POLL_INTERVAL
+from app_logging import log_user
+from tracing import current_trace_id, new_trace_id, start_trace
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, str], None]
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+# Job IDs are secrets.token_urlsafe values; anything else can't name a stored job
+JOB_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+class JobRecord:
+    """A job's state as saved in the job store, readable from any server process."""
+
+    def __init__(self, data: dict):
+        self.id: str = data["id"]
+        self.owner: str = data["owner"]
+        self.trace_id: str = data["trace_id"]
+        self.title: str = data["title"]
+        self.status: str = data["status"]
+        self.events: List[dict] = data["events"]
+        self.result: Any = data["result"]
+        self.error: Optional[str] = data["error"]
+        self.created_at: float = data["created_at"]
+        self.finished_at: Optional[float] = data["finished_at"]
+        # Incremented on every save, so readers can tell when the job changed
+        self.version: int = data["version"]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "trace_id": self.trace_id,
+            "title": self.title,
+            "status": self.status,
+            "events": self.events,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+    def to_record(self) -> dict:
+        return {**self.to_dict(), "owner": self.owner, "version": self.version}
+
+class Job(JobRecord):
+    """A queued provisioning run, saved to the job store whenever it changes."""
+
+    def __init__(self, owner: str, title: str, run: Callable[[ProgressCallback], Awaitable[Any]],
+                 store: "JobStore"):
+        super().__init__({
+            "id": secrets.token_urlsafe(16),
+            "owner": owner,
+            # The submitting request's trace ID, so the job's trace can be found from it
+            "trace_id": current_trace_id() or new_trace_id(),
+            "title": title,
+            "status": "queued",
+            "events": [],
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "finished_at": None,
+            "version": 0
+        })
+        self._run = run
+        self._store = store
+
+    def save(self):
+        self.version += 1
+        self._store.save(self.to_record())
+
+    def report(self, step: str, message: str):
+        """Record a progress event and wake up anyone streaming this job."""
+        self.events.append({"step": step, "message": message, "time": time.time()})
+        self.save()
+
+    async def execute(self):
+        """Run the job, recording its result or error."""
+        self.status = "running"
+        self.save()
+        with start_trace(f"job {self.title}", self.trace_id) as trace, log_user(self.owner):
+            try:
+                self.result = await self._run(self.report)
+                self.status = "succeeded"
+            except ValueError as e:
+                self.error = str(e)
+                self.status = "failed"
+            except Exception as e:
+                logger.exception("Job failed unexpectedly", extra={"job_id": self.id})
+                self.error = f"An unexpected error occurred: {str(e)}"
+                self.status = "failed"
+            if self.status == "failed":
+                trace.status = "error"
+            self.finished_at = time.time()
+            logger.info("Job finished", extra={
+                "job_id": self.id, "title": self.title, "status": self.status, "error": self.error,
+                "duration": self.finished_at - trace.started_at
+            })
+        self.save()
+
+class MemoryJobStore:
+    """Job records kept in this process, oldest first so finished ones can be evicted in order.
+
+    Only the process that ran /submit can show the job, so this only works
+    with a single server process.
+    """
+
+    def __init__(self, retention: int = JOB_RETENTION):
+        self.retention = retention
+        self._records: "OrderedDict[str, dict]" = OrderedDict()
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    def save(self, record: dict):
+        self._records[record["id"]] = record
+        changed = self._changed.pop(record["id"], None)
+        if changed is not None:
+            changed.set()
+        if record["status"] in FINISHED_STATUSES:
+            self._evict_finished()
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs once more than retention are kept."""
+        excess = len(self._records) - self.retention
+        finished = [job_id for job_id, record in self._records.items() if record["status"] in FINISHED_STATUSES]
+        for job_id in finished[:max(excess, 0)]:
+            del self._records[job_id]
+
+    def load(self, job_id: str) -> Optional[dict]:
+        return self._records.get(job_id)
+
+    async def wait_for_change(self, job_id: str, version: int, timeout: float) -> bool:
+        """Wait until the job is saved past version; False on timeout."""
+        record = self._records.get(job_id)
+        if record is None or record["version"] != version:
+            return True
+        changed = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+class FileJobStore:
+    """Job records as JSON files in a directory, readable by every process that shares it.
+
+    The worker running a job rewrites its file (atomically, via rename) on
+    every change, so /jobs/{job_id} and its progress stream work on any
+    server worker, and on replicas that mount the same directory. Readers
+    in other processes notice changes by polling.
+    """
+
+    def __init__(self, directory: str = JOB_STORE_DIR, retention: int = JOB_RETENTION,
+                 poll_interval: float = JOB_POLL_INTERVAL):
+        self.directory = directory
+        self.retention = retention
+        self.poll_interval = poll_interval
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def save(self, record: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix=".job-")
+        try:
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(record, file)
+            os.replace(temporary, self._path(record["id"]))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        if record["status"] in FINISHED_STATUSES:
+            self._evict_finished()
+
+    def _evict_finished(self):
+        """Delete the oldest finished jobs once more than retention are kept."""
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        except FileNotFoundError:
+            return
+        excess = len(names) - self.retention
+        if excess <= 0:
+            return
+        paths = sorted((os.path.join(self.directory, name) for name in names), key=_modified_time)
+        for path in paths:
+            if excess <= 0:
+                break
+            record = _read_record(path)
+            if record is not None and record["status"] in FINISHED_STATUSES:
+                _remove(path)
+                excess -= 1
+
+    def load(self, job_id: str) -> Optional[dict]:
+        if not JOB_ID.match(job_id):
+            return None
+        return _read_record(self._path(job_id))
+
+    async def wait_for_change(self, job_id: str, version: int, timeout: float) -> bool:
+        """Wait until the job is saved past version, polling its file; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            record = self.load(job_id)
+            if record is None or record["version"] != version:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+def _modified_time(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0
+
+def _read_record(path: str) -> Optional[dict]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+JobStore = Union[MemoryJobStore, FileJobStore]
+
+def create_job_store(backend: str = JOB_BACKEND):
+    """Build the job store for a backend: "memory" or "file"."""
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "file":
+        return FileJobStore()
+    raise ValueError(f"Unknown job backend: {backend}")
+
+job_store = create_job_store()
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+
+async def _worker():
+    """Run queued jobs one at a time."""
+    while True:
+        job = await _queue.get()
+        try:
+            await job.execute()
+        finally:
+            _queue.task_done()
+
+def start_workers(count: int = JOB_WORKERS):
+    """Start the in-process worker pool."""
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+    while len(_workers) < count:
+        _workers.append(asyncio.ensure_future(_worker()))
+
+async def stop_workers():
+    """Cancel the worker pool; queued and running jobs are abandoned."""
+    global _queue
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+
+def submit_job(owner: str, title: str, run: Callable[[ProgressCallback], Awaitable[Any]]) -> Job:
+    """Queue a job for this process's worker pool, save it to the job store and return it immediately."""
+    if not _workers:
+        start_workers()
+    job = Job(owner, title, run, job_store)
+    try:
+        _queue.put_nowait(job)
+    except asyncio.QueueFull:
+        raise ValueError("Too many SDK setups are in progress. Please try again in a few minutes.")
+    job.save()
+    return job
+
+def get_job(job_id: str, owner: str) -> Optional[JobRecord]:
+    """Get a job's saved state by ID if it belongs to the given user, whichever process runs it."""
+    record = job_store.load(job_id)
+    if record is None or record["owner"] != owner:
+        return None
+    return JobRecord(record)
+
+async def wait_for_job_change(job: JobRecord, timeout: float) -> bool:
+    """Wait until a job changes from the given state; False on timeout."""
+    return await job_store.wait_for_change(job.id, job.version, timeout)
@@ -4,8 +4,20 @@ import os
 
 # Import modularized components
 from config import UPLOADS_DIR
+from app_logging import configure_logging, stop_logging
+from compression import CompressionMiddleware
+from metrics import MetricsMiddleware
+from tracing import TracingMiddleware
+from github_client import close_http_client
+from jobs import start_workers, stop_workers
+from spec_workers import shutdown_executor
 from routes import router as web_router
 from api import router as api_router
+from internal import router as internal_router, metrics_router
+from static_assets import router as static_router
+
+# Log JSON lines from a background thread, so handlers never wait on stdout
+configure_logging()
 
 # Initialize FastAPI app
 app = FastAPI()  # Trigger Railway redeploy with complete templates
@@ -19,9 +31,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress HTML and JSON responses the handlers haven't already compressed
+app.add_middleware(CompressionMiddleware)
+
+# Trace each request; its trace ID is passed on to any job it queues
+app.add_middleware(TracingMiddleware)
+
+# Outermost, so route latency includes compression
+app.add_middleware(MetricsMiddleware)
+
 # Create uploads directory if it doesn't exist
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
+# Start the provisioning job workers
+@app.on_event("startup")
+async def startup_job_workers():
+    start_workers()
+
+# Stop the job workers, the spec worker pool and pooled GitHub API connections on shutdown,
+# then write out the log records still queued
+@app.on_event("shutdown")
+async def shutdown_background_work():
+    await stop_workers()
+    shutdown_executor()
+    await close_http_client()
+    stop_logging()
+
 # Include routers
 app.include_router(web_router)
-app.include_router(api_router) 
\ No newline at end of file
+app.include_router(api_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
+app.include_router(static_router) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class RepositoryInfo(BaseModel):
     id: int
@@ -19,6 +19,25 @@ class RepoAccessResult(BaseModel):
     success: bool
     message: str
 
+class SpecProfile(BaseModel):
+    openapi: str
+    operations: int
+    paths: int
+    schemas: int
+    components: int
+    refs: int
+    max_ref_depth: int
+    recursive_schemas: List[str]
+    largest_fanout_schema: Optional[str]
+    largest_fanout_refs: int
+    total_bytes: int
+    section_bytes: Dict[str, int]
+    estimated_generation_seconds: float
+    estimated_github_api_calls: int
+    estimated_github_upload_bytes: int
+    sdk_languages: int
+    queue: str
+
 class UserSession(BaseModel):
     login: str
     avatar_url: str
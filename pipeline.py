@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+class StepSkipped(Exception):
+    """Raised for a step that did not run because a dependency failed."""
+
+class Step:
+    """A named unit of work that runs once all of its dependencies have succeeded.
+
+    The results of the dependencies are passed to `run` as positional
+    arguments, in the order they are listed in `depends_on`.
+    """
+
+    def __init__(self, name: str, run: Callable[..., Awaitable[Any]], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+
+async def run_steps(steps: List[Step]) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+    """Run steps concurrently, each as soon as its dependencies have finished.
+
+    Steps must be listed after the steps they depend on. A failing step does
+    not cancel the others; steps depending on it fail with StepSkipped.
+    Returns (results, errors), both keyed by step name.
+    """
+    results: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_step(step: Step):
+        dependencies = [tasks[name] for name in step.depends_on]
+        if dependencies:
+            await asyncio.wait(dependencies)
+        failed = [name for name in step.depends_on if name in errors]
+        try:
+            with span(step.name, "step") as step_span:
+                if failed:
+                    step_span.status = "skipped"
+                    raise StepSkipped(f"{step.name} skipped because {', '.join(failed)} failed")
+                results[step.name] = await step.run(*[results[name] for name in step.depends_on])
+        except Exception as e:
+            errors[step.name] = e
+        logger.debug("Step finished", extra={"step": step.name, "status": step_span.status, "duration": step_span.duration})
+
+    for step in steps:
+        unknown = [name for name in step.depends_on if name not in tasks]
+        if unknown:
+            raise ValueError(f"Step {step.name} depends on unknown or later steps: {', '.join(unknown)}")
+        tasks[step.name] = asyncio.ensure_future(run_step(step))
+
+    await asyncio.gather(*tasks.values())
+    return results, errors
@@ -0,0 +1,162 @@
+import hashlib
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional, Tuple
+import httpx
+from config import RATE_LIMIT_TRACKER_MAX_TOKENS, RATE_LIMIT_BURN_WINDOW
+
+class RateLimitExceeded(Exception):
+    """Raised when a token lacks the rate limit budget for the work it is about to do."""
+
+def token_fingerprint(access_token: str) -> str:
+    """Short, non-reversible identifier for a token, safe to log and display."""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:12]
+
+class Reservation:
+    """Budget set aside for a batch of requests, released as they are made."""
+
+    def __init__(self, budget: "TokenBudget", count: int):
+        self.budget = budget
+        self.count = count
+        self.used = 0
+
+    @property
+    def outstanding(self) -> int:
+        return max(self.count - self.used, 0)
+
+    def consume(self, count: int = 1):
+        """Record requests made against this reservation."""
+        self.used += count
+
+    def release(self):
+        """Return whatever is left of the reservation."""
+        self.budget.reservations.discard(self)
+
+    def __enter__(self) -> "Reservation":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class TokenBudget:
+    """Rate limit budget of one token for one GitHub resource (core, graphql, ...)."""
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        self.limit = 0
+        self.remaining = 0
+        self.reset = 0
+        self.updated_at = 0.0
+        self.reservations = set()
+        # (wall time, remaining, reset) samples for the burn rate
+        self._samples: deque = deque()
+
+    def record(self, limit: int, remaining: int, reset: int):
+        now = time.time()
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.updated_at = now
+        self._samples.append((now, remaining, reset))
+        while self._samples and self._samples[0][0] < now - RATE_LIMIT_BURN_WINDOW:
+            self._samples.popleft()
+
+    def available(self, excluding: Optional[Reservation] = None) -> int:
+        """Remaining budget not set aside for other reservations."""
+        if self.reset and self.reset <= time.time():
+            # The window has reset since the last response
+            return self.limit
+        reserved = sum(r.outstanding for r in self.reservations if r is not excluding)
+        return max(self.remaining - reserved, 0)
+
+    def burn_rate(self) -> float:
+        """Requests per second consumed over the recent window."""
+        if len(self._samples) < 2:
+            return 0.0
+        consumed = 0
+        for (_, previous_remaining, previous_reset), (_, remaining, reset) in zip(self._samples, list(self._samples)[1:]):
+            if reset == previous_reset:
+                consumed += max(previous_remaining - remaining, 0)
+        elapsed = self._samples[-1][0] - self._samples[0][0]
+        return consumed / elapsed if elapsed > 0 else 0.0
+
+    def projected_exhaustion(self) -> Optional[float]:
+        """Wall time the budget runs out at the current burn rate, or None if not before the reset."""
+        rate = self.burn_rate()
+        if rate <= 0:
+            return None
+        exhausted_at = time.time() + self.available() / rate
+        return exhausted_at if exhausted_at < self.reset else None
+
+    def seconds_until_reset(self) -> float:
+        return max(self.reset - time.time(), 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "resource": self.resource,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reserved": sum(r.outstanding for r in self.reservations),
+            "available": self.available(),
+            "reset": self.reset,
+            "burn_rate_per_minute": round(self.burn_rate() * 60, 2),
+            "projected_exhaustion": self.projected_exhaustion(),
+            "updated_at": self.updated_at
+        }
+
+class RateLimitTracker:
+    """Rate limit budgets per token, updated from the headers of every GitHub response."""
+
+    def __init__(self, max_tokens: int = RATE_LIMIT_TRACKER_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self._budgets: "OrderedDict[Tuple[str, str], TokenBudget]" = OrderedDict()
+
+    def record(self, access_token: str, headers: httpx.Headers):
+        """Record the X-RateLimit-* headers of a response made with a token."""
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        try:
+            limit = int(headers.get("X-RateLimit-Limit", 0))
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = int(headers.get("X-RateLimit-Reset", 0))
+        except ValueError:
+            return
+        budget = self.budget(access_token, headers.get("X-RateLimit-Resource", "core"))
+        budget.record(limit, remaining, reset)
+
+    def budget(self, access_token: str, resource: str = "core") -> TokenBudget:
+        """Get (or start tracking) a token's budget for a resource."""
+        key = (token_fingerprint(access_token), resource)
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = TokenBudget(resource)
+        self._budgets.move_to_end(key)
+        while len(self._budgets) > self.max_tokens:
+            self._budgets.popitem(last=False)
+        return budget
+
+    def reserve(self, access_token: str, count: int, max_wait: float = 0.0, resource: str = "core") -> Reservation:
+        """Set aside budget for count requests, or raise RateLimitExceeded.
+
+        Tokens that have not made a request yet have unknown budget and always
+        succeed. If the budget is short but resets within max_wait seconds the
+        reservation is granted, and callers should pause until the reset.
+        """
+        budget = self.budget(access_token, resource)
+        if budget.updated_at and budget.available() < count and budget.seconds_until_reset() > max_wait:
+            raise RateLimitExceeded(
+                f"Not enough GitHub API rate limit left: {count} requests needed, "
+                f"{budget.available()} available until the limit resets in {int(budget.seconds_until_reset() // 60) + 1} minutes"
+            )
+        reservation = Reservation(budget, count)
+        budget.reservations.add(reservation)
+        return reservation
+
+    def snapshot(self) -> List[dict]:
+        """Current budgets, most recently used first, keyed by token fingerprint."""
+        return [
+            {"token": fingerprint, **budget.to_dict()}
+            for (fingerprint, _), budget in reversed(self._budgets.items())
+        ]
+
+rate_limit_tracker = RateLimitTracker()
@@ -0,0 +1,68 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from config import READINESS_DEADLINE, READINESS_INITIAL_DELAY, READINESS_MAX_DELAY
+from tracing import span
+
+# Totals across all readiness waits, to see how much time polling costs
+readiness_stats = {
+    "waits": 0,
+    "polls": 0,
+    "timeouts": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0
+}
+
+class ReadinessTimeout(Exception):
+    """Raised when a resource does not become ready before the deadline."""
+
+    def __init__(self, description: str, waited: float, polls: int):
+        self.description = description
+        self.waited = waited
+        self.polls = polls
+        super().__init__(f"Timed out after {waited:.2f}s ({polls} polls) waiting for {description}")
+
+def _record_wait(waited: float, polls: int, timed_out: bool = False):
+    """Add a finished wait to the readiness totals."""
+    readiness_stats["waits"] += 1
+    readiness_stats["polls"] += polls
+    readiness_stats["total_seconds"] += waited
+    readiness_stats["max_seconds"] = max(readiness_stats["max_seconds"], waited)
+    if timed_out:
+        readiness_stats["timeouts"] += 1
+
+async def wait_until_ready(
+    probe: Callable[[], Awaitable[Optional[Any]]],
+    description: str,
+    deadline: float = READINESS_DEADLINE,
+    initial_delay: float = READINESS_INITIAL_DELAY,
+    max_delay: float = READINESS_MAX_DELAY
+) -> Tuple[Any, float]:
+    """Poll until probe returns a value other than None, returning (value, seconds waited).
+
+    The first poll happens immediately. Later polls back off exponentially with
+    jitter, capped at max_delay, until the overall deadline is reached.
+    """
+    started = time.monotonic()
+    delay = initial_delay
+    polls = 0
+    with span("wait_until_ready", "wait", description=description) as wait:
+        while True:
+            polls += 1
+            wait.attempts = polls
+            result = await probe()
+            waited = time.monotonic() - started
+            if result is not None:
+                _record_wait(waited, polls)
+                return result, waited
+
+            remaining = deadline - waited
+            if remaining <= 0:
+                _record_wait(waited, polls, timed_out=True)
+                wait.status = "timeout"
+                raise ReadinessTimeout(description, waited, polls)
+
+            # Full jitter on the upper half keeps concurrent runs from polling in lockstep
+            await asyncio.sleep(min(random.uniform(delay / 2, delay), remaining))
+            delay = min(delay * 2, max_delay)
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+from config import REPO_CACHE_TTL, REPO_CACHE_MAX_ENTRIES, REPO_LISTING_BACKEND, REPO_LISTING_CONCURRENCY
+from github_client import GitHubClient
+from github_operations import to_repository_info, graphql_to_repository_info
+from compression import CompressedVariants
+from models import RepositoryInfo
+from search_index import RepositorySearchIndex
+
+logger = logging.getLogger(__name__)
+
+FIRST_PAGE_URL = "/user/repos?per_page=100"
+
+# Only the fields RepositoryInfo needs, 100 repositories per query
+REPOSITORIES_QUERY = """
+query($cursor: String) {
+  viewer {
+    repositories(
+      first: 100
+      after: $cursor
+      affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]
+      ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes { databaseId name nameWithOwner description isPrivate viewerPermission }
+    }
+  }
+}
+"""
+
+# Fetch totals per listing backend, to compare payload size and latency
+listing_stats: Dict[str, Dict[str, float]] = {
+    backend: {"fetches": 0, "pages": 0, "bytes": 0, "seconds": 0.0}
+    for backend in ("rest", "graphql")
+}
+
+class CachedRepositoryList:
+    """A user's admin repositories, kept per listing page with the page's ETag."""
+
+    def __init__(self, pages: List[dict]):
+        self.pages = sorted(pages, key=lambda page: page["number"])
+        self.repositories: List[RepositoryInfo] = [repo for page in self.pages for repo in page["repositories"]]
+        # Serialized once so cache hits skip building the response
+        self.json = json.dumps([repo.dict() for repo in self.repositories]).encode("utf-8")
+        self.json_variants = CompressedVariants(self.json)
+        self._search_index: Optional[RepositorySearchIndex] = None
+        self.validated_at = time.monotonic()
+
+    @property
+    def search_index(self) -> RepositorySearchIndex:
+        if self._search_index is None:
+            self._search_index = RepositorySearchIndex(self.repositories)
+        return self._search_index
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.monotonic() - self.validated_at < ttl
+
+async def fetch_rest_page(g: GitHubClient, number: int, cached: Optional[dict] = None) -> dict:
+    """Fetch one page of the REST listing, revalidating a cached copy with If-None-Match.
+
+    Unchanged pages come back as 304s, which GitHub does not count against the
+    rate limit, and are reused without parsing.
+    """
+    url = FIRST_PAGE_URL if number == 1 else f"{FIRST_PAGE_URL}&page={number}"
+    headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+    response = await g.request("GET", url, headers=headers, operation="list_repos")
+    if response.status_code == 304:
+        # The page itself is unchanged, but repositories may have been added after it
+        last = _last_page(response, cached["last"])
+        return cached if last == cached["last"] else {**cached, "last": last}
+
+    repositories = []
+    for repo in response.json():
+        try:
+            repository = to_repository_info(repo)
+        except Exception as repo_error:
+            logger.warning("Error processing repo", extra={"repo": repo.get('name'), "error": str(repo_error)})
+            continue
+        if repository is not None:
+            repositories.append(repository)
+
+    return {
+        "number": number,
+        "etag": response.headers.get("ETag"),
+        "last": _last_page(response, number),
+        "repositories": repositories
+    }
+
+def _last_page(response: httpx.Response, default: int) -> int:
+    """Number of the listing's last page, from the Link header if the response has one."""
+    last_url = response.links.get("last", {}).get("url")
+    return int(httpx.URL(last_url).params.get("page", default)) if last_url else default
+
+async def iter_rest_pages(g: GitHubClient, previous: Optional[CachedRepositoryList] = None) -> AsyncIterator[dict]:
+    """Yield REST listing pages as they arrive.
+
+    The first page's Link header says how many pages there are, so the rest
+    are fetched concurrently and yielded in completion order.
+    """
+    cached_pages = {page["number"]: page for page in previous.pages} if previous else {}
+    first_page = await fetch_rest_page(g, 1, cached_pages.get(1))
+    yield first_page
+
+    semaphore = asyncio.Semaphore(REPO_LISTING_CONCURRENCY)
+
+    async def fetch(number: int) -> dict:
+        async with semaphore:
+            return await fetch_rest_page(g, number, cached_pages.get(number))
+
+    tasks = [asyncio.ensure_future(fetch(number)) for number in range(2, first_page["last"] + 1)]
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            yield await next_page
+    finally:
+        # Stop outstanding fetches if the consumer goes away or a page fails
+        for task in tasks:
+            task.cancel()
+
+async def iter_graphql_pages(g: GitHubClient, previous: Optional[CachedRepositoryList] = None) -> AsyncIterator[dict]:
+    """Yield GraphQL listing pages, fetching only the fields RepositoryInfo needs.
+
+    GraphQL has no conditional requests and no permission filter, so every page
+    is refetched and non-admin repositories are dropped here; the nodes are a
+    small fraction of the size of full REST repository objects. Pages follow
+    cursors, so they are fetched one after another.
+    """
+    cursor = None
+    number = 1
+    while True:
+        data = await g.graphql(REPOSITORIES_QUERY, {"cursor": cursor})
+        connection = data["viewer"]["repositories"]
+        repositories = []
+        for node in connection["nodes"]:
+            repository = graphql_to_repository_info(node)
+            if repository is not None:
+                repositories.append(repository)
+        yield {"number": number, "etag": None, "repositories": repositories}
+        if not connection["pageInfo"]["hasNextPage"]:
+            return
+        cursor = connection["pageInfo"]["endCursor"]
+        number += 1
+
+PAGE_ITERATORS = {
+    "rest": iter_rest_pages,
+    "graphql": iter_graphql_pages
+}
+
+async def iter_repository_pages(g: GitHubClient, previous: Optional[CachedRepositoryList] = None,
+                                backend: str = REPO_LISTING_BACKEND) -> AsyncIterator[dict]:
+    """Yield listing pages from the given backend and record the fetch's cost."""
+    if backend not in PAGE_ITERATORS:
+        raise ValueError(f"Unknown repository listing backend: {backend}")
+    started = time.monotonic()
+    bytes_before = g.bytes_received
+    pages = 0
+    async for page in PAGE_ITERATORS[backend](g, previous):
+        pages += 1
+        yield page
+    stats = listing_stats[backend]
+    stats["fetches"] += 1
+    stats["pages"] += pages
+    stats["bytes"] += g.bytes_received - bytes_before
+    stats["seconds"] += time.monotonic() - started
+
+async def fetch_repositories(g: GitHubClient, previous: Optional[CachedRepositoryList] = None,
+                             backend: str = REPO_LISTING_BACKEND) -> CachedRepositoryList:
+    """Fetch a complete repository listing with the given backend."""
+    return CachedRepositoryList([page async for page in iter_repository_pages(g, previous, backend)])
+
+class RepositoryCache:
+    """Per-user cache of repository listings with a TTL and LRU eviction."""
+
+    def __init__(self, ttl: float = REPO_CACHE_TTL, max_entries: int = REPO_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedRepositoryList]" = OrderedDict()
+        # One refresh at a time per user, so concurrent page loads share it
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Users with a refresh in flight; invalidate marks theirs stale (False) so it is not stored.
+        # Only running refreshes have an entry, so this stays as small as the number of them.
+        self._refreshing: Dict[str, bool] = {}
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "revalidations": self.revalidations,
+                "misses": self.misses}
+
+    def _fresh_entry(self, login: str, refresh: bool) -> Optional[CachedRepositoryList]:
+        entry = self._entries.get(login)
+        if entry is None or refresh or not entry.is_fresh(self.ttl):
+            return None
+        self._entries.move_to_end(login)
+        self.hits += 1
+        return entry
+
+    def _store(self, login: str, entry: CachedRepositoryList) -> CachedRepositoryList:
+        previous = self._entries.get(login)
+        if previous is not None and [id(page) for page in previous.pages] == [id(page) for page in entry.pages]:
+            # Every page revalidated as unchanged, so keep the serialized JSON and search index
+            previous.validated_at = entry.validated_at
+            entry = previous
+        self._entries[login] = entry
+        self._entries.move_to_end(login)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._locks.pop(evicted, None)
+        return entry
+
+    async def get(self, login: str, access_token: str, refresh: bool = False) -> CachedRepositoryList:
+        """Get a user's repositories, revalidating with GitHub once the TTL has passed."""
+        entry = self._fresh_entry(login, refresh)
+        if entry is not None:
+            return entry
+
+        lock = self._locks.setdefault(login, asyncio.Lock())
+        async with lock:
+            # Another request may have refreshed the entry while we waited
+            entry = self._fresh_entry(login, refresh)
+            if entry is not None:
+                return entry
+
+            previous = self._entries.get(login)
+            if previous is None:
+                self.misses += 1
+            else:
+                self.revalidations += 1
+            self._refreshing[login] = True
+            try:
+                entry = await fetch_repositories(GitHubClient(access_token), previous=previous)
+            finally:
+                current = self._refreshing.pop(login)
+            if not current:
+                # Invalidated while this refresh was running: the listing may predate the change
+                return entry
+            return self._store(login, entry)
+
+    def invalidate(self, login: str):
+        """Drop a user's cached listing, e.g. after creating repositories.
+
+        A refresh already in flight fetched its pages before the change, so
+        its result is returned to its caller but not cached.
+        """
+        if login in self._refreshing:
+            self._refreshing[login] = False
+        self._entries.pop(login, None)
+        lock = self._locks.get(login)
+        if lock is not None and not lock.locked():
+            del self._locks[login]
+
+repository_cache = RepositoryCache()
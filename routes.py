@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Form, UploadFile, File, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from auth import get_current_user, github_auth, github_callback, logout
-from github_operations import create_repo_from_template
-from utils import validate_openapi, get_file_extension
-from templates import get_login_template, get_main_template, get_success_template
+from github_operations import create_repo_from_template, update_config_repo
+from jobs import submit_job, get_job, wait_for_job_change
+from repo_cache import repository_cache
+from uploads import receive_spec, form_flag
+from spec_bundler import bundle_spec
+from spec_workers import run_spec_task
+from static_assets import conditional_response
+from utils import get_file_extension
+from templates import get_login_template, get_main_template, get_success_template, get_update_template, get_progress_template
+import html
+import io
 import os
+import hashlib
+import json
 import shutil
 import subprocess
 
 router = APIRouter()
 
+def page_response(request: Request, page: str) -> Response:
+    """An HTML page the browser must revalidate, answered with 304 when it has not changed."""
+    content = page.encode("utf-8")
+    etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    return conditional_response(request, content, "text/html; charset=utf-8", etag, "private, no-cache")
+
 @router.get("/auth/github")
 async def auth_github():
     """Redirect to GitHub OAuth page."""
@@ -21,9 +37,9 @@ async def auth_callback(code: str, state: str):
     return await github_callback(code, state)
 
 @router.get("/logout")
-async def logout_user():
+async def logout_user(request: Request):
     """Logout the user."""
-    return await logout()
+    return await logout(request)
 
 @router.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -33,52 +49,98 @@ async def read_root(request: Request):
         avatar_url = user.get('avatar_url', f'https://github.com/identicons/{user["login"]}')
         user_login = user['login']
         
-        # Return the main template with the full HTML
-        return HTMLResponse(get_main_template(user_login, avatar_url))
+        # Return the main template; its CSS and JS are cached separately, so a
+        # repeat visit usually only revalidates this small page
+        page = get_main_template(user_login, avatar_url)
         
     except HTTPException:
-        return HTMLResponse(get_login_template())
+        page = get_login_template()
+    return page_response(request, page)
 
 @router.post("/submit")
-async def handle_submission(
-    request: Request,
-    company_name: str = Form(...),
-    openapi_spec: UploadFile = File(...)
-):
-    """Handle form submission."""
+async def handle_submission(request: Request):
+    """Queue a provisioning job for the submitted spec and show its progress page.
+
+    The form has company_name, the openapi_spec file and the minimize_spec,
+    strip_examples and update_existing checkboxes. It is parsed as it streams
+    in, after authentication, so oversized uploads are cut off early.
+    """
     try:
         # Check authentication
         user = await get_current_user(request)
         
-        # Get file extension
-        file_extension = get_file_extension(openapi_spec.filename)
-        if file_extension not in ['.json', '.yaml', '.yml']:
-            raise ValueError("Unsupported file type. Please upload a JSON or YAML file.")
-
-        # Read and validate the file
-        content = await openapi_spec.read()
-        spec_data = validate_openapi(content, file_extension)
-
-        # Create repository from template and get Github instance
-        repo_url, g, repo_full_name, installation_url = await create_repo_from_template(
-            user['access_token'], 
-            company_name,
-            openapi_spec.filename,
-            content.decode('utf-8')
-        )
-        
-        return HTMLResponse(get_success_template(
-            company_name, 
-            repo_url, 
-            user['login'], 
-            installation_url
-        ))
+        # Stream the file into a size-limited spool, then validate it from the spool
+        fields, spec, spec_data = await receive_spec(request)
+        company_name = fields.get("company_name", "").strip()
+        if not company_name:
+            spec.close()
+            raise ValueError("Please enter a company name.")
+        minimize_spec = form_flag(fields, "minimize_spec")
+        strip_examples = form_flag(fields, "strip_examples")
+        update_existing = form_flag(fields, "update_existing")
+
+        access_token = user['access_token']
+        login = user['login']
+
+        async def provision(progress):
+            # Create repository from template and SDK repositories; the job owns the spool
+            with spec:
+                bundle_stats = None
+                spec_content, original_spec = spec.open(), None
+                if minimize_spec:
+                    bundled, bundle_stats = await run_spec_task(
+                        bundle_spec, spec_data, get_file_extension(spec.filename), spec.size, strip_examples,
+                        size=spec.size
+                    )
+                    if bundled is None:
+                        progress("spec_not_minimized", "Minimizing would not make the spec smaller; "
+                                                       "committing it as uploaded")
+                    else:
+                        progress("spec_minimized", f"Minimized the spec from {bundle_stats['original_bytes']} "
+                                                   f"to {bundle_stats['bundled_bytes']} bytes")
+                        spec_content, original_spec = io.BytesIO(bundled), spec.open()
+                if update_existing:
+                    update = await update_config_repo(
+                        access_token,
+                        company_name,
+                        spec.filename,
+                        spec_content,
+                        spec_data,
+                        spec.git_blob_sha(),
+                        progress=progress,
+                        original_spec=original_spec
+                    )
+                    return {**update, "update": True, "bundle": bundle_stats}
+                repo_url, g, repo_full_name, installation_url = await create_repo_from_template(
+                    access_token,
+                    company_name,
+                    spec.filename,
+                    spec_content,
+                    progress=progress,
+                    original_spec=original_spec
+                )
+            # The new repositories should show up in the repository picker
+            repository_cache.invalidate(login)
+            return {
+                "company_name": company_name,
+                "repo_url": repo_url,
+                "repo_full_name": repo_full_name,
+                "installation_url": installation_url,
+                "bundle": bundle_stats
+            }
+
+        try:
+            job = submit_job(login, company_name, provision)
+        except BaseException:
+            spec.close()
+            raise
+        return HTMLResponse(get_progress_template(job.id, company_name), status_code=202)
         
     except ValueError as e:
         return HTMLResponse(f"""
             <div class="container">
                 <h1>Error</h1>
-                <p class="error">{str(e)}</p>
+                <p class="error">{html.escape(str(e))}</p>
                 <a href="/">Try again</a>
             </div>
         """)
@@ -86,11 +148,71 @@ async def handle_submission(
         return HTMLResponse(f"""
             <div class="container">
                 <h1>Error</h1>
-                <p class="error">An unexpected error occurred: {str(e)}</p>
+                <p class="error">An unexpected error occurred: {html.escape(str(e))}</p>
                 <a href="/">Try again</a>
             </div>
         """)
 
+@router.get("/jobs/{job_id}", response_class=HTMLResponse)
+async def show_job(request: Request, job_id: str):
+    """Show a provisioning job: progress while running, then its result."""
+    user = await get_current_user(request)
+    job = get_job(job_id, user['login'])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not job.finished:
+        return HTMLResponse(get_progress_template(job.id, job.title))
+    if job.status == "failed":
+        return HTMLResponse(f"""
+            <div class="container">
+                <h1>Error</h1>
+                <p class="error">{html.escape(job.error)}</p>
+                <a href="/">Try again</a>
+            </div>
+        """)
+    if job.result.get('update'):
+        return HTMLResponse(get_update_template(job.result))
+    return HTMLResponse(get_success_template(
+        job.result['company_name'],
+        job.result['repo_url'],
+        user['login'],
+        job.result['installation_url']
+    ))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(request: Request, job_id: str):
+    """Stream a provisioning job's progress as Server-Sent Events."""
+    user = await get_current_user(request)
+    job = get_job(job_id, user['login'])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        current, sent = job, 0
+        while True:
+            for event in current.events[sent:]:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            sent = len(current.events)
+            if current.finished:
+                yield f"event: done\ndata: {json.dumps({'status': current.status})}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            if not await wait_for_job_change(current, timeout=15):
+                # Keep proxies from closing an idle stream
+                yield ": keepalive\n\n"
+            # The job may be running in another server process, so reread its saved state
+            current = get_job(job_id, user['login'])
+            if current is None:
+                return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/setup-fern")
 async def setup_fern(request: Request, data: dict):
     """Setup Fern CLI and initiate authentication."""
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List
+from config import GITHUB_FANOUT_CONCURRENCY, GITHUB_FANOUT_MAX_RETRIES, GITHUB_MAX_RATE_LIMIT_WAIT
+from github_client import GitHubClient, GitHubAPIError
+from rate_limits import RateLimitExceeded
+from tracing import Span, span
+
+# Wait used for secondary rate limits that come without a Retry-After header
+SECONDARY_RATE_LIMIT_BACKOFF = 2.0
+
+# Keep roughly this many requests of budget per concurrent call in flight
+BUDGET_PER_CONCURRENT_CALL = 10
+
+class RateLimitedScheduler:
+    """Runs many GitHub API calls for one token with bounded, rate-limit-aware concurrency.
+
+    Concurrency shrinks as the token's shared budget runs low, every call
+    pauses while the token is out of budget, and calls rejected by a primary
+    or secondary rate limit are retried after Retry-After. Budget reserved by
+    other work on the same token is left alone; budget reserved by the
+    client's own reservation is spent.
+    """
+
+    def __init__(self, client: GitHubClient, max_concurrency: int = GITHUB_FANOUT_CONCURRENCY,
+                 max_retries: int = GITHUB_FANOUT_MAX_RETRIES):
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self._active = 0
+        self._condition = asyncio.Condition()
+        # Monotonic time before which no new call may start
+        self._resume_at = 0.0
+
+    def _allowed_concurrency(self) -> int:
+        """Concurrency the remaining rate limit budget can sustain."""
+        budget = self.client.budget
+        if not budget.updated_at:
+            return self.max_concurrency
+        available = budget.available(excluding=self.client.reservation)
+        return max(1, min(self.max_concurrency, available // BUDGET_PER_CONCURRENT_CALL))
+
+    def _pause_seconds(self) -> float:
+        """Seconds to wait before starting another call."""
+        pause = self._resume_at - time.monotonic()
+        budget = self.client.budget
+        if budget.updated_at and budget.available(excluding=self.client.reservation) == 0:
+            pause = max(pause, budget.seconds_until_reset())
+        if pause > GITHUB_MAX_RATE_LIMIT_WAIT:
+            raise RateLimitExceeded(f"GitHub API rate limit exhausted, resets in {int(pause)}s")
+        return pause
+
+    async def _acquire(self):
+        while True:
+            pause = self._pause_seconds()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            async with self._condition:
+                if self._active < self._allowed_concurrency():
+                    self._active += 1
+                    return
+                await self._condition.wait()
+
+    async def _release(self):
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _backoff(self, error: GitHubAPIError, attempt: int):
+        """Hold back every call until a rate limit has passed."""
+        delay = error.retry_after
+        if delay is None:
+            delay = SECONDARY_RATE_LIMIT_BACKOFF * (2 ** attempt)
+        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    async def _run_one(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        with span(getattr(getattr(call, "func", call), "__name__", "call"), "scheduled") as scheduled:
+            outcome = await self._attempt(call, scheduled)
+            if isinstance(outcome, Exception):
+                scheduled.status = "error"
+                scheduled.attributes["error"] = type(outcome).__name__
+            return outcome
+
+    async def _attempt(self, call: Callable[[], Awaitable[Any]], scheduled: Span) -> Any:
+        for attempt in range(self.max_retries + 1):
+            scheduled.attempts = attempt + 1
+            try:
+                await self._acquire()
+            except RateLimitExceeded as e:
+                return e
+            try:
+                return await call()
+            except GitHubAPIError as e:
+                if not e.is_rate_limited or attempt == self.max_retries:
+                    return e
+                self._backoff(e, attempt)
+            except Exception as e:
+                return e
+            finally:
+                await self._release()
+
+    async def run(self, calls: List[Callable[[], Awaitable[Any]]]) -> List[Any]:
+        """Run calls concurrently, returning each result or exception in input order."""
+        return await asyncio.gather(*[self._run_one(call) for call in calls])
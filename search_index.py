@@ -0,0 +1,87 @@
+import re
+from typing import Dict, List, Set, Tuple
+from models import RepositoryInfo
+
+# Token prefixes indexed, by length; shorter queries are scanned, longer ones use trigrams
+MIN_PREFIX_LENGTH = 3
+MAX_PREFIX_LENGTH = 16
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class RepositorySearchIndex:
+    """In-memory prefix and trigram index over repository names and descriptions.
+
+    Queries of three characters or more are answered by intersecting
+    trigram postings, so they only score the candidate repositories. Shorter
+    ones have no trigrams and match anywhere in a name or description, so
+    they are checked against every repository.
+    """
+
+    def __init__(self, repositories: List[RepositoryInfo]):
+        self.repositories = repositories
+        self._names: List[str] = []
+        self._full_names: List[str] = []
+        self._descriptions: List[str] = []
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+
+        for position, repo in enumerate(repositories):
+            name = repo.name.lower()
+            full_name = repo.full_name.lower()
+            description = (repo.description or "").lower()
+            self._names.append(name)
+            self._full_names.append(full_name)
+            self._descriptions.append(description)
+
+            # Prefixes of the whole name and of every word, so "sdk" finds "acme-python-sdk"
+            for token in {name, full_name, *TOKEN_PATTERN.findall(f"{full_name} {description}")}:
+                for length in range(MIN_PREFIX_LENGTH, min(len(token), MAX_PREFIX_LENGTH) + 1):
+                    self._prefixes.setdefault(token[:length], set()).add(position)
+            for trigram in _trigrams(name) | _trigrams(full_name) | _trigrams(description):
+                self._trigrams.setdefault(trigram, set()).add(position)
+
+    def _candidates(self, query: str) -> Set[int]:
+        """Positions that may match the query; always a superset of the real matches."""
+        if len(query) < MIN_PREFIX_LENGTH:
+            return set(range(len(self.repositories)))
+        postings = [self._trigrams.get(trigram, set()) for trigram in _trigrams(query)]
+        candidates = set.intersection(*sorted(postings, key=len))
+        # Prefixes match across separators the trigrams of a single field cannot
+        return candidates | self._prefixes.get(query[:MAX_PREFIX_LENGTH], set())
+
+    def _score(self, position: int, query: str) -> int:
+        """Rank a repository for a query; 0 means no match."""
+        name = self._names[position]
+        if name == query:
+            return 100
+        if name.startswith(query):
+            return 80
+        if any(token.startswith(query) for token in TOKEN_PATTERN.findall(name)):
+            return 60
+        if query in name:
+            return 40
+        if query in self._full_names[position]:
+            return 30
+        if query in self._descriptions[position]:
+            return 10
+        return 0
+
+    def search(self, query: str, page: int = 1, per_page: int = 20) -> Tuple[int, List[RepositoryInfo]]:
+        """Return (total matches, repositories on the requested page), best matches first."""
+        query = query.strip().lower()
+        if not query:
+            matches = list(range(len(self.repositories)))
+        else:
+            scored = []
+            for position in self._candidates(query):
+                score = self._score(position, query)
+                if score:
+                    scored.append((-score, self._names[position], position))
+            scored.sort()
+            matches = [position for _, _, position in scored]
+
+        start = (max(page, 1) - 1) * per_page
+        return len(matches), [self.repositories[position] for position in matches[start:start + per_page]]
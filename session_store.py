@@ -0,0 +1,218 @@
+import hashlib
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from jose import jwe
+from jose.exceptions import JOSEError
+from config import (
+    SESSION_BACKEND,
+    SESSION_SECRET_KEYS,
+    SESSION_MAX_ENTRIES,
+    SESSION_IDLE_TTL,
+    SESSION_ABSOLUTE_TTL,
+    SESSION_REVALIDATE_INTERVAL
+)
+from github_client import GitHubClient, GitHubAPIError
+from rate_limits import token_fingerprint
+
+class Session:
+    """The little a request needs to know about a logged-in user."""
+
+    __slots__ = ("user", "created_at", "last_seen")
+
+    def __init__(self, login: str, avatar_url: Optional[str], access_token: str):
+        # Same keys callers already read from the session user
+        self.user = {"login": login, "avatar_url": avatar_url, "access_token": access_token}
+        self.created_at = self.last_seen = time.monotonic()
+
+    def is_expired(self, now: float, idle_ttl: float, absolute_ttl: float) -> bool:
+        return now - self.last_seen >= idle_ttl or now - self.created_at >= absolute_ttl
+
+class TokenValidationCache:
+    """Remembers whether GitHub accepted a token, so it is rechecked at most once per interval.
+
+    Entries are keyed by token fingerprint and bounded with LRU eviction.
+    """
+
+    def __init__(self, revalidate_interval: float = SESSION_REVALIDATE_INTERVAL,
+                 max_entries: int = SESSION_MAX_ENTRIES):
+        self.revalidate_interval = revalidate_interval
+        self.max_entries = max_entries
+        # fingerprint -> (checked at, valid)
+        self._results: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+        self.revalidations = 0
+
+    def _store(self, fingerprint: str, checked_at: float, valid: bool):
+        self._results[fingerprint] = (checked_at, valid)
+        self._results.move_to_end(fingerprint)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def is_valid(self, access_token: str) -> bool:
+        """Whether the token still works, asking GitHub only if it wasn't checked recently."""
+        fingerprint = token_fingerprint(access_token)
+        now = time.monotonic()
+        cached = self._results.get(fingerprint)
+        if cached is not None and now - cached[0] < self.revalidate_interval:
+            return cached[1]
+        # Claim the check before awaiting so concurrent requests don't repeat it
+        self._store(fingerprint, now, True if cached is None else cached[1])
+        self.revalidations += 1
+        try:
+            await GitHubClient(access_token).get_user()
+            valid = True
+        except GitHubAPIError as e:
+            # Only a rejected token ends the session; GitHub outages don't log users out
+            valid = e.status != 401
+        except Exception:
+            valid = True
+        self._store(fingerprint, now, valid)
+        return valid
+
+    def forget(self, access_token: str):
+        self._results.pop(token_fingerprint(access_token), None)
+
+class SessionStore:
+    """Sessions by id with idle and absolute TTLs and LRU eviction past a size cap.
+
+    Tokens are checked against GitHub at most once per revalidate interval,
+    so ordinary requests never wait on GitHub to authenticate. State lives in
+    this process, so it only works with a single worker.
+    """
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES, idle_ttl: float = SESSION_IDLE_TTL,
+                 absolute_ttl: float = SESSION_ABSOLUTE_TTL, validation: Optional[TokenValidationCache] = None):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.absolute_ttl = absolute_ttl
+        self.validation = validation or TokenValidationCache()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, user_data: dict, access_token: str) -> str:
+        """Start a session for a GitHub /user payload and return its id."""
+        session_id = secrets.token_urlsafe(32)
+        self._sessions[session_id] = Session(user_data["login"], user_data.get("avatar_url"), access_token)
+        self._prune()
+        return session_id
+
+    def _prune(self):
+        """Drop idle sessions from the least recently used end, then enforce the size cap."""
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if not session.is_expired(now, self.idle_ttl, self.absolute_ttl) and len(self._sessions) <= self.max_entries:
+                break
+            del self._sessions[session_id]
+            self.evictions += 1
+
+    def _get(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if session.is_expired(now, self.idle_ttl, self.absolute_ttl):
+            self.delete(session_id)
+            return None
+        session.last_seen = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def get(self, session_id: Optional[str]) -> Optional[dict]:
+        """Get the user of a live session with a valid token, or None."""
+        session = self._get(session_id) if session_id else None
+        if session is None:
+            return None
+        if not await self.validation.is_valid(session.user["access_token"]):
+            self.delete(session_id)
+            return None
+        return session.user
+
+    def delete(self, session_id: Optional[str]):
+        """End a session, e.g. on logout."""
+        session = self._sessions.pop(session_id, None) if session_id else None
+        if session is not None:
+            self.validation.forget(session.user["access_token"])
+            self.evictions += 1
+
+class CookieSessionStore:
+    """Sessions kept entirely in the cookie, encrypted and authenticated with JWE (dir + A256GCM).
+
+    Any process holding the keys can read a session, so the app can run
+    several workers and replicas, and sessions survive restarts and deploys.
+    The first key in SESSION_SECRET_KEYS encrypts new cookies; the others are still accepted,
+    which lets keys be rotated without logging everyone out. Sessions expire
+    after the absolute TTL. Logging out only deletes the cookie, since there
+    is no server-side state to drop.
+    """
+
+    def __init__(self, secret_keys: List[str], absolute_ttl: float = SESSION_ABSOLUTE_TTL,
+                 validation: Optional[TokenValidationCache] = None):
+        if not secret_keys:
+            raise ValueError("SESSION_SECRET_KEYS must be set to use cookie sessions")
+        # 256-bit keys derived from the configured secrets, by key id
+        self._keys = OrderedDict()
+        for secret in secret_keys:
+            key = hashlib.sha256(secret.encode("utf-8")).digest()
+            self._keys[hashlib.sha256(key).hexdigest()[:8]] = key
+        self._current_kid = next(iter(self._keys))
+        self.absolute_ttl = absolute_ttl
+        self.validation = validation or TokenValidationCache()
+
+    def create(self, user_data: dict, access_token: str) -> str:
+        """Encrypt a session for a GitHub /user payload into a cookie value."""
+        issued_at = int(time.time())
+        claims = {
+            "login": user_data["login"],
+            "avatar_url": user_data.get("avatar_url"),
+            "access_token": access_token,
+            "iat": issued_at,
+            "exp": issued_at + int(self.absolute_ttl)
+        }
+        token = jwe.encrypt(json.dumps(claims), self._keys[self._current_kid], kid=self._current_kid)
+        return token.decode("ascii")
+
+    def _decrypt(self, cookie: str) -> Optional[dict]:
+        try:
+            kid = jwe.get_unverified_header(cookie).get("kid")
+            key = self._keys.get(kid)
+            if key is None:
+                # Issued with a key that has since been retired
+                return None
+            return json.loads(jwe.decrypt(cookie, key))
+        except (JOSEError, ValueError, AttributeError):
+            return None
+
+    async def get(self, cookie: Optional[str]) -> Optional[dict]:
+        """Get the user of an unexpired session with a valid token, or None."""
+        claims = self._decrypt(cookie) if cookie else None
+        if claims is None or claims.get("exp", 0) <= time.time():
+            return None
+        if not await self.validation.is_valid(claims["access_token"]):
+            return None
+        return {
+            "login": claims["login"],
+            "avatar_url": claims.get("avatar_url"),
+            "access_token": claims["access_token"]
+        }
+
+    def delete(self, cookie: Optional[str]):
+        """Forget the cached token check; the cookie itself is cleared by the caller."""
+        claims = self._decrypt(cookie) if cookie else None
+        if claims is not None:
+            self.validation.forget(claims["access_token"])
+
+def create_session_store(backend: str = SESSION_BACKEND):
+    """Build the session store for a backend: "memory" or "cookie"."""
+    if backend == "memory":
+        return SessionStore()
+    if backend == "cookie":
+        return CookieSessionStore(SESSION_SECRET_KEYS)
+    raise ValueError(f"Unknown session backend: {backend}")
+
+session_store = create_session_store()
@@ -0,0 +1,134 @@
+import json
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+import yaml
+from spec_profiler import profile_spec
+from spec_refs import RefIndex, escape_pointer_token
+
+# Component sections whose unreferenced entries are dropped. Security schemes
+# are referenced by name from security requirements, so they are always kept.
+PRUNED_SECTIONS = (
+    "schemas", "responses", "parameters", "examples", "requestBodies",
+    "headers", "links", "callbacks", "pathItems"
+)
+
+# Keys whose values are maps of user-chosen names, where "example" or
+# "examples" is a name (e.g. a property called "example") rather than an example
+NAME_MAPS = {
+    "properties", "patternProperties", "$defs", "definitions", "mapping", "variables",
+    "headers", "links", "callbacks", "encoding", "content", "responses", "paths", "webhooks",
+    "securitySchemes", *PRUNED_SECTIONS
+}
+
+# Keys whose values are literal data, not spec structure
+LITERAL_VALUES = {"default", "enum", "const", "example", "examples"}
+
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+def reachable_components(refs: RefIndex) -> Set[str]:
+    """Components referenced, directly or through other components, from outside components."""
+    reached: Set[str] = set()
+    pending = list(refs.edges.get(None, ()))
+    while pending:
+        component = pending.pop()
+        if component in reached:
+            continue
+        reached.add(component)
+        pending.extend(refs.edges.get(component, ()))
+    return reached
+
+def _strip_examples(node: Any, parent_key: str = "") -> Tuple[Any, int]:
+    """Copy of node without example/examples fields, and how many were removed.
+
+    The parsed spec may be shared through the parse cache, so it is never modified.
+    """
+    stripped = 0
+    if isinstance(node, dict):
+        names_map = parent_key in NAME_MAPS or parent_key.startswith("x-")
+        copy = {}
+        for key, value in node.items():
+            if not names_map and key in ("example", "examples"):
+                stripped += 1
+                continue
+            if (not names_map and key in LITERAL_VALUES) or str(key).startswith("x-"):
+                copy[key] = value
+                continue
+            copy[key], count = _strip_examples(value, "" if names_map else str(key))
+            stripped += count
+        return copy, stripped
+    if isinstance(node, list):
+        copy = []
+        for item in node:
+            item, count = _strip_examples(item, "")
+            copy.append(item)
+            stripped += count
+        return copy, stripped
+    return node, 0
+
+def serialize_spec(spec: dict, file_extension: str) -> bytes:
+    """Write a spec in the format of its original file."""
+    if file_extension == ".json":
+        return json.dumps(spec, indent=2, ensure_ascii=False).encode("utf-8")
+    return yaml.dump(spec, Dumper=YAML_DUMPER, sort_keys=False, allow_unicode=True).encode("utf-8")
+
+def bundle_spec(spec: dict, file_extension: str, original_bytes: int,
+                strip_examples: bool = False) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    """Minimize a validated spec for committing.
+
+    Follows every local $ref (and discriminator mapping) from the paths,
+    webhooks and other top-level content, drops components nothing reaches,
+    and optionally strips examples. Refs stay refs; external refs were already
+    rejected by validation, so the result is self-contained.
+
+    Returns the minimized spec serialized like the original, and stats on
+    what was removed and how much generation time it should save. Re-serializing
+    can make a spec with little to remove larger than the upload; then the
+    spec is None, "minimized" is False and nothing counts as saved.
+    """
+    started = time.monotonic()
+    refs = RefIndex(spec)
+    reached = reachable_components(refs)
+
+    bundled = dict(spec)
+    removed: Dict[str, int] = {}
+    components = spec.get("components")
+    if isinstance(components, dict):
+        kept_components = {}
+        for section, entries in components.items():
+            if section in PRUNED_SECTIONS and isinstance(entries, dict):
+                kept = {
+                    name: entry for name, entry in entries.items()
+                    if f"#/components/{section}/{escape_pointer_token(name)}" in reached
+                }
+                if len(kept) < len(entries):
+                    removed[section] = len(entries) - len(kept)
+                if kept:
+                    kept_components[section] = kept
+            else:
+                kept_components[section] = entries
+        if kept_components:
+            bundled["components"] = kept_components
+        else:
+            bundled.pop("components")
+
+    examples_removed = 0
+    if strip_examples:
+        # Also drops components.examples, which only examples could refer to
+        bundled, examples_removed = _strip_examples(bundled)
+
+    content = serialize_spec(bundled, file_extension)
+    minimized = len(content) < original_bytes
+    seconds_saved = 0.0
+    if minimized:
+        before = profile_spec(spec, original_bytes)
+        after = profile_spec(bundled, len(content))
+        seconds_saved = round(before.estimated_generation_seconds - after.estimated_generation_seconds, 1)
+    return content if minimized else None, {
+        "minimized": minimized,
+        "original_bytes": original_bytes,
+        "bundled_bytes": len(content),
+        "removed_components": removed if minimized else {},
+        "examples_removed": examples_removed if minimized else 0,
+        "estimated_seconds_saved": seconds_saved,
+        "bundle_seconds": round(time.monotonic() - started, 3)
+    }
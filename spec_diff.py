@@ -0,0 +1,101 @@
+import hashlib
+import json
+from typing import Any, Dict, List
+import yaml
+from spec_validator import HTTP_METHODS
+
+def _canonical(node: Any) -> Any:
+    """node with every mapping key as a string, so keys sort even when YAML mixes 200: and default:."""
+    if isinstance(node, dict):
+        return {str(key): _canonical(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_canonical(item) for item in node]
+    return node
+
+def _fingerprint(node: Any) -> str:
+    """Hash of a node's content, independent of key order and formatting."""
+    canonical = json.dumps(_canonical(node), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _operations(spec: dict) -> Dict[str, Any]:
+    """Operations by "METHOD /path", including the parameters of their path item."""
+    operations = {}
+    paths = spec.get("paths")
+    if not isinstance(paths, dict):
+        return operations
+    for path, path_item in paths.items():
+        if not isinstance(path_item, dict):
+            continue
+        for method in HTTP_METHODS:
+            if method in path_item:
+                operations[f"{method.upper()} {path}"] = {
+                    "path_parameters": path_item.get("parameters"),
+                    "operation": path_item[method]
+                }
+    return operations
+
+def _schemas(spec: dict) -> Dict[str, Any]:
+    components = spec.get("components")
+    schemas = components.get("schemas") if isinstance(components, dict) else None
+    return schemas if isinstance(schemas, dict) else {}
+
+def _diff_maps(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    return {
+        "added": sorted(new.keys() - old.keys(), key=str),
+        "removed": sorted(old.keys() - new.keys(), key=str),
+        "changed": sorted((key for key in old.keys() & new.keys() if _fingerprint(old[key]) != _fingerprint(new[key])),
+                          key=str)
+    }
+
+def diff_specs(old: dict, new: dict) -> Dict[str, Any]:
+    """Structural diff of two parsed specs: operations, schemas, and anything else that changed."""
+    operations = _diff_maps(_operations(old), _operations(new))
+    schemas = _diff_maps(_schemas(old), _schemas(new))
+
+    # Everything outside operations and schemas, e.g. servers, security, other component sections
+    def rest(spec: dict) -> Dict[str, Any]:
+        sections = {key: value for key, value in spec.items() if key not in ("paths", "components")}
+        components = spec.get("components")
+        if isinstance(components, dict):
+            sections.update({f"components.{key}": value for key, value in components.items() if key != "schemas"})
+        return sections
+
+    other = _diff_maps(rest(old), rest(new))
+    return {
+        "operations": operations,
+        "schemas": schemas,
+        "other": sorted(other["added"] + other["removed"] + other["changed"], key=str),
+        "changed": any(operations.values()) or any(schemas.values()) or bool(other["changed"] or other["added"] or other["removed"])
+    }
+
+def _audiences(operation: Any) -> set:
+    audiences = operation.get("x-fern-audiences") if isinstance(operation, dict) else None
+    return set(audiences) if isinstance(audiences, list) else set()
+
+def groups_to_regenerate(generators_yml: str, old: dict, new: dict, diff: Dict[str, Any]) -> List[str]:
+    """SDK groups in generators.yml whose output a spec change can affect.
+
+    Groups that filter by audience only see operations tagged with one of
+    their audiences (x-fern-audiences), so they are skipped when only other
+    operations changed. Schema and top-level changes can reach any group.
+    """
+    config = yaml.safe_load(generators_yml) or {}
+    groups = config.get("groups") if isinstance(config.get("groups"), dict) else {}
+    if not diff["changed"]:
+        return []
+    if diff["other"] or any(diff["schemas"].values()):
+        return list(groups)
+
+    old_operations, new_operations = _operations(old), _operations(new)
+    touched = set()
+    for key in diff["operations"]["added"] + diff["operations"]["removed"] + diff["operations"]["changed"]:
+        for operations in (old_operations, new_operations):
+            if key in operations:
+                touched |= _audiences(operations[key]["operation"])
+
+    affected = []
+    for name, group in groups.items():
+        audiences = group.get("audiences") if isinstance(group, dict) else None
+        if not audiences or touched & set(audiences):
+            affected.append(name)
+    return affected
@@ -0,0 +1,122 @@
+import json
+from typing import Any, Dict, Optional
+from config import PROVISIONING_COMMIT_MODE, LARGE_SPEC_GENERATION_SECONDS
+from models import SpecProfile
+from spec_refs import RefIndex
+from spec_validator import HTTP_METHODS
+
+# GitHub requests one provisioning run makes per commit mode, not counting
+# readiness polls or the copy of the spec as uploaded (see create_repo_from_template)
+PROVISIONING_API_CALLS = {"git-data": 13, "contents": 12}
+
+# Rough per-SDK `fern generate` cost model (seconds); tune against observed generation times
+GENERATION_BASE_SECONDS = 45.0
+GENERATION_SECONDS_PER_OPERATION = 0.15
+GENERATION_SECONDS_PER_SCHEMA = 0.05
+GENERATION_SECONDS_PER_MB = 6.0
+SDK_LANGUAGES = 2
+
+def _json_size(node: Any) -> int:
+    return len(json.dumps(node, separators=(",", ":"), default=str).encode("utf-8"))
+
+def _max_ref_depth(refs: RefIndex) -> int:
+    """Longest chain of components reached from a ref outside components.
+
+    Refs back into a component already on the chain (recursive schemas) end it,
+    so the result is finite for any spec.
+    """
+    depth: Dict[str, int] = {}
+    on_chain = set()
+    longest = 0
+    for root in sorted(refs.edges.get(None, ())):
+        # Iterative post-order DFS, so long chains don't hit the recursion limit
+        work = [(root, iter(sorted(refs.edges.get(root, ()))))]
+        on_chain.add(root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in depth and successor not in on_chain:
+                    on_chain.add(successor)
+                    work.append((successor, iter(sorted(refs.edges.get(successor, ())))))
+                    break
+            else:
+                work.pop()
+                on_chain.discard(node)
+                depth[node] = 1 + max(
+                    (depth[successor] for successor in refs.edges.get(node, ()) if successor in depth),
+                    default=0
+                )
+        longest = max(longest, depth[root])
+    return longest
+
+def _section_bytes(spec: dict) -> Dict[str, int]:
+    sizes = {}
+    for key, value in spec.items():
+        if key == "components" and isinstance(value, dict):
+            for section, entries in value.items():
+                sizes[f"components.{section}"] = _json_size(entries)
+        else:
+            sizes[key] = _json_size(value)
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+def _operations(spec: dict) -> int:
+    count = 0
+    for section in ("paths", "webhooks"):
+        path_items = spec.get(section)
+        if isinstance(path_items, dict):
+            for path_item in path_items.values():
+                if isinstance(path_item, dict):
+                    count += sum(1 for method in HTTP_METHODS if method in path_item)
+    return count
+
+def profile_spec(spec: dict, spec_bytes: Optional[int] = None, commit_mode: str = PROVISIONING_COMMIT_MODE) -> SpecProfile:
+    """Measure how heavy a parsed, validated spec is and estimate what provisioning it costs.
+
+    spec_bytes is the size of the uploaded file, if known; otherwise the size
+    of the spec serialized as compact JSON is used.
+    """
+    refs = RefIndex(spec)
+    components = spec.get("components") if isinstance(spec.get("components"), dict) else {}
+    schemas = components.get("schemas") if isinstance(components.get("schemas"), dict) else {}
+
+    # Fan-out: distinct components a schema refers to
+    largest_fanout: Optional[str] = None
+    largest_fanout_refs = 0
+    for component, targets in refs.edges.items():
+        if component is not None and component.startswith("#/components/schemas/") and len(targets) > largest_fanout_refs:
+            largest_fanout, largest_fanout_refs = component.rsplit("/", 1)[1], len(targets)
+
+    section_bytes = _section_bytes(spec)
+    total_bytes = spec_bytes if spec_bytes is not None else sum(section_bytes.values())
+    operations = _operations(spec)
+    per_sdk_seconds = (
+        GENERATION_BASE_SECONDS
+        + operations * GENERATION_SECONDS_PER_OPERATION
+        + len(schemas) * GENERATION_SECONDS_PER_SCHEMA
+        + total_bytes / (1024 * 1024) * GENERATION_SECONDS_PER_MB
+    )
+    # SDKs are generated in parallel, so the slowest one bounds the run
+    estimated_seconds = round(per_sdk_seconds, 1)
+
+    return SpecProfile(
+        openapi=str(spec.get("openapi")),
+        operations=operations,
+        paths=len(spec.get("paths") or {}),
+        schemas=len(schemas),
+        components=sum(len(entries) for entries in components.values() if isinstance(entries, dict)),
+        refs=len(refs.refs),
+        max_ref_depth=_max_ref_depth(refs),
+        recursive_schemas=sorted(
+            component.rsplit("/", 1)[1] for component in refs.recursive_components()
+            if component.startswith("#/components/schemas/")
+        ),
+        largest_fanout_schema=largest_fanout,
+        largest_fanout_refs=largest_fanout_refs,
+        total_bytes=total_bytes,
+        section_bytes=section_bytes,
+        estimated_generation_seconds=estimated_seconds,
+        estimated_github_api_calls=PROVISIONING_API_CALLS.get(commit_mode, PROVISIONING_API_CALLS["git-data"]),
+        estimated_github_upload_bytes=4 * ((total_bytes + 2) // 3),
+        sdk_languages=SDK_LANGUAGES,
+        queue="large" if estimated_seconds >= LARGE_SPEC_GENERATION_SECONDS else "standard"
+    )
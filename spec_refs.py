@@ -0,0 +1,161 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+# Value returned by RefIndex.resolve for refs that point nowhere
+MISSING = object()
+
+def escape_pointer_token(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def component_of(pointer: str) -> Optional[str]:
+    """The "#/components/<section>/<name>" a pointer lies in, if any."""
+    parts = pointer.split("/")
+    if len(parts) >= 4 and parts[1] == "components":
+        return "/".join(parts[:4])
+    return None
+
+class RefIndex:
+    """Every local $ref in a spec, resolved once, with the graph between components.
+
+    Built in a single pass over the document. Besides resolving refs it finds
+    dangling refs, alias cycles (refs that only point at other refs and never
+    reach a definition) and recursive components, all in time linear in the
+    size of the spec.
+    """
+
+    def __init__(self, spec: Any):
+        self.spec = spec
+        # (pointer of the object holding the $ref, ref value) in document order
+        self.refs: List[Tuple[str, str]] = []
+        self.external_refs: List[Tuple[str, str]] = []
+        self._resolved: Dict[str, Any] = {}
+        # Component -> components its subtree refers to (by $ref or discriminator
+        # mapping); None collects references from outside components
+        self.edges: Dict[Optional[str], Set[str]] = {}
+
+        stack = [("#", spec)]
+        while stack:
+            pointer, node = stack.pop()
+            if isinstance(node, dict):
+                ref = node.get("$ref")
+                if isinstance(ref, str):
+                    if ref.startswith("#"):
+                        self.refs.append((pointer, ref))
+                        target = component_of(ref)
+                        if target is not None:
+                            self.edges.setdefault(component_of(pointer), set()).add(target)
+                    else:
+                        self.external_refs.append((pointer, ref))
+                discriminator = node.get("discriminator")
+                if isinstance(discriminator, dict) and isinstance(discriminator.get("mapping"), dict):
+                    # Mapping values name schemas without a $ref, by ref or by bare name
+                    for value in discriminator["mapping"].values():
+                        if isinstance(value, str):
+                            target = component_of(value) if value.startswith("#") else f"#/components/schemas/{escape_pointer_token(value)}"
+                            if target is not None:
+                                self.edges.setdefault(component_of(pointer), set()).add(target)
+                children = node.items()
+            elif isinstance(node, list):
+                children = enumerate(node)
+            else:
+                continue
+            for key, child in children:
+                if isinstance(child, (dict, list)):
+                    stack.append((f"{pointer}/{escape_pointer_token(key)}", child))
+        self.refs.reverse()
+        self.external_refs.reverse()
+
+    def resolve(self, ref: str) -> Any:
+        """The node a local ref points at, or MISSING."""
+        if ref in self._resolved:
+            return self._resolved[ref]
+        node = self.spec
+        for token in unquote(ref[1:]).split("/")[1:]:
+            token = token.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, dict) and token in node:
+                node = node[token]
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                node = MISSING
+                break
+        self._resolved[ref] = node
+        return node
+
+    def dangling_refs(self) -> List[Tuple[str, str]]:
+        """(location, ref) of every local ref whose target does not exist."""
+        return [(pointer, ref) for pointer, ref in self.refs if self.resolve(ref) is MISSING]
+
+    def alias_cycles(self) -> List[List[str]]:
+        """Chains of refs that lead back to themselves without reaching a definition."""
+        aliases: Dict[str, str] = {}
+        for pointer, ref in self.refs:
+            if pointer != "#":
+                aliases[pointer] = unquote(ref)
+
+        cycles = []
+        state: Dict[str, int] = {}  # 1 = on the current chain, 2 = done
+        for start in aliases:
+            chain = []
+            pointer = start
+            while pointer in aliases and pointer not in state:
+                state[pointer] = 1
+                chain.append(pointer)
+                target = self.resolve(aliases[pointer])
+                pointer = aliases[pointer] if isinstance(target, dict) and "$ref" in target else None
+            if pointer in state and state[pointer] == 1:
+                cycles.append(chain[chain.index(pointer):])
+            for visited in chain:
+                state[visited] = 2
+        return cycles
+
+    def recursive_components(self) -> Set[str]:
+        """Components that refer back to themselves, directly or through others (Tarjan's SCC)."""
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        recursive: Set[str] = set()
+        counter = 0
+
+        nodes = [node for node in self.edges if node is not None]
+        for root in nodes:
+            if root in index:
+                continue
+            # Iterative DFS: (node, iterator over its successors)
+            work = [(root, iter(sorted(self.edges.get(root, ()))))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                advanced = False
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(sorted(self.edges.get(successor, ())))))
+                        advanced = True
+                        break
+                    if successor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.edges.get(node, ()):
+                        recursive.update(component)
+        return recursive
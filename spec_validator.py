@@ -0,0 +1,261 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from spec_refs import RefIndex, MISSING, escape_pointer_token
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PARAMETER_LOCATIONS = ("query", "header", "path", "cookie")
+COMPONENT_NAME = re.compile(r"^[a-zA-Z0-9._-]+$")
+PATH_TEMPLATE = re.compile(r"{([^}]+)}")
+OPENAPI_VERSION = re.compile(r"^3\.([01])\.\d+")
+
+# Problems listed in the error message; the rest are only counted
+MAX_REPORTED_ISSUES = 10
+
+# Expected type of the fields each OpenAPI object is checked for; "!" marks a
+# required field. Fields not listed (including x- extensions) are not checked.
+OBJECT_FIELDS: Dict[str, Dict[str, Any]] = {
+    "document": {
+        "openapi!": str, "info!": dict, "paths!": dict, "components": dict, "servers": list,
+        "security": list, "tags": list, "externalDocs": dict
+    },
+    "info": {"title!": str, "version!": (str, int, float), "description": str, "contact": dict, "license": dict},
+    "server": {"url!": str, "description": str, "variables": dict},
+    "tag": {"name!": str, "description": str},
+    "path_item": {"summary": str, "description": str, "parameters": list, "servers": list},
+    "operation": {
+        "responses!": dict, "operationId": str, "parameters": list, "requestBody": dict, "tags": list,
+        "summary": str, "description": str, "callbacks": dict, "deprecated": bool, "security": list,
+        "servers": list
+    },
+    "parameter": {
+        "name!": str, "in!": str, "required": bool, "schema": dict, "content": dict,
+        "description": str, "deprecated": bool, "allowEmptyValue": bool
+    },
+    "request_body": {"content!": dict, "required": bool, "description": str},
+    "response": {"description": str, "content": dict, "headers": dict, "links": dict},
+    "components": {
+        section: dict for section in (
+            "schemas", "responses", "parameters", "examples", "requestBodies",
+            "headers", "securitySchemes", "links", "callbacks", "pathItems"
+        )
+    }
+}
+
+# Changes from OpenAPI 3.0 per minor version
+VERSION_FIELDS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "3.1": {
+        # A 3.1 document may have only components or webhooks, and responses became optional
+        "document": {"paths": dict, "webhooks": dict, "jsonSchemaDialect": str},
+        "info": {"summary": str},
+        "operation": {"responses": dict}
+    }
+}
+
+class SpecValidationError(ValueError):
+    """Raised when a parsed spec is not a structurally valid OpenAPI 3.x document."""
+
+    def __init__(self, issues: List[str]):
+        self.issues = issues
+        listed = "; ".join(issues[:MAX_REPORTED_ISSUES])
+        more = f" (and {len(issues) - MAX_REPORTED_ISSUES} more)" if len(issues) > MAX_REPORTED_ISSUES else ""
+        super().__init__(f"Invalid OpenAPI spec, {len(issues)} problem(s): {listed}{more}")
+
+    def __reduce__(self):
+        # Rebuild from the issues when sent back from a spec worker process
+        return (SpecValidationError, (self.issues,))
+
+@lru_cache(maxsize=None)
+def compile_rules(version: str) -> Dict[str, Tuple[Tuple[Tuple[str, Any], ...], Dict[str, Any]]]:
+    """Per-object (required fields, field types) for an OpenAPI minor version, built once."""
+    compiled = {}
+    for name, fields in OBJECT_FIELDS.items():
+        merged = {field.rstrip("!"): (field.endswith("!"), types) for field, types in fields.items()}
+        for field, types in VERSION_FIELDS.get(version, {}).get(name, {}).items():
+            merged[field.rstrip("!")] = (field.endswith("!"), types)
+        required = tuple((field, types) for field, (is_required, types) in merged.items() if is_required)
+        compiled[name] = (required, {field: types for field, (_, types) in merged.items()})
+    return compiled
+
+def _is_type(value: Any, types: Any) -> bool:
+    types = types if isinstance(types, tuple) else (types,)
+    # bool is an int subclass, so only accept it where booleans are expected
+    if isinstance(value, bool):
+        return bool in types
+    return isinstance(value, types)
+
+def _type_name(types: Any) -> str:
+    types = types if isinstance(types, tuple) else (types,)
+    names = {dict: "an object", list: "a list", str: "a string", bool: "a boolean", int: "a number", float: "a number"}
+    return " or ".join(dict.fromkeys(names[t] for t in types))
+
+class _Validator:
+    def __init__(self, spec: dict, version: str):
+        self.spec = spec
+        self.rules = compile_rules(version)
+        self.version = version
+        self.refs = RefIndex(spec)
+        self.issues: List[str] = []
+        self.operation_ids: Dict[str, str] = {}
+
+    def problem(self, pointer: str, message: str):
+        self.issues.append(f"{pointer}: {message}")
+
+    def deref(self, node: Any) -> Any:
+        """Follow a Reference Object to what it points at (MISSING if it dangles)."""
+        seen = 0
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str) and node["$ref"].startswith("#"):
+            node = self.refs.resolve(node["$ref"])
+            seen += 1
+            if seen > 32:
+                return MISSING
+        return node
+
+    def check_object(self, kind: str, node: Any, pointer: str) -> bool:
+        """Check a node's field types; returns False if it is not an object at all."""
+        if isinstance(node, dict) and "$ref" in node:
+            # Reference Objects are checked through the ref index
+            return False
+        if not isinstance(node, dict):
+            self.problem(pointer, "must be an object")
+            return False
+        required, types = self.rules[kind]
+        for field, _ in required:
+            if field not in node:
+                self.problem(pointer, f"missing required field '{field}'")
+        for field, value in node.items():
+            expected = types.get(field)
+            if expected is not None and not _is_type(value, expected):
+                self.problem(f"{pointer}/{escape_pointer_token(field)}", f"must be {_type_name(expected)}")
+        return True
+
+    def check_list_of(self, kind: str, node: Any, pointer: str):
+        if isinstance(node, list):
+            for position, item in enumerate(node):
+                self.check_object(kind, item, f"{pointer}/{position}")
+
+    def check_parameter(self, parameter: Any, pointer: str):
+        if not self.check_object("parameter", parameter, pointer):
+            return
+        location = parameter.get("in")
+        if isinstance(location, str) and location not in PARAMETER_LOCATIONS:
+            self.problem(f"{pointer}/in", f"must be one of {', '.join(PARAMETER_LOCATIONS)}")
+        if location == "path" and parameter.get("required") is not True:
+            self.problem(pointer, "path parameters must be required")
+        if "schema" not in parameter and "content" not in parameter:
+            self.problem(pointer, "needs a 'schema' or 'content'")
+
+    def check_operation(self, path: str, method: str, operation: Any, path_parameters: list, pointer: str):
+        if not self.check_object("operation", operation, pointer):
+            return
+        operation_id = operation.get("operationId")
+        if isinstance(operation_id, str):
+            if operation_id in self.operation_ids:
+                self.problem(f"{pointer}/operationId",
+                             f"'{operation_id}' is also used by {self.operation_ids[operation_id]}")
+            else:
+                self.operation_ids[operation_id] = pointer
+
+        parameters = operation.get("parameters", [])
+        if isinstance(parameters, list):
+            for position, parameter in enumerate(parameters):
+                self.check_parameter(parameter, f"{pointer}/parameters/{position}")
+        else:
+            parameters = []
+        if "requestBody" in operation:
+            self.check_object("request_body", operation["requestBody"], f"{pointer}/requestBody")
+        responses = operation.get("responses")
+        if isinstance(responses, dict):
+            if not responses and self.version == "3.0":
+                self.problem(f"{pointer}/responses", "must define at least one response")
+            for code, response in responses.items():
+                self.check_object("response", response, f"{pointer}/responses/{escape_pointer_token(code)}")
+
+        # Every {name} in the path must be declared as a path parameter
+        declared = set()
+        for parameter in path_parameters + parameters:
+            parameter = self.deref(parameter)
+            if parameter is MISSING or not isinstance(parameter, dict):
+                # A dangling ref is reported on its own; don't guess what it declared
+                return
+            if parameter.get("in") == "path":
+                declared.add(parameter.get("name"))
+        for name in PATH_TEMPLATE.findall(path):
+            if name not in declared:
+                self.problem(pointer, f"path parameter '{name}' is not declared")
+
+    def check_paths(self, paths: dict):
+        for path, path_item in paths.items():
+            pointer = f"#/paths/{escape_pointer_token(path)}"
+            if not str(path).startswith("/"):
+                self.problem(pointer, "path must start with '/'")
+            if not self.check_object("path_item", path_item, pointer):
+                continue
+            path_parameters = path_item.get("parameters", [])
+            if isinstance(path_parameters, list):
+                for position, parameter in enumerate(path_parameters):
+                    self.check_parameter(parameter, f"{pointer}/parameters/{position}")
+            else:
+                path_parameters = []
+            for method in HTTP_METHODS:
+                if method in path_item:
+                    self.check_operation(path, method, path_item[method], path_parameters, f"{pointer}/{method}")
+
+    def check_components(self, components: dict):
+        for section, entries in components.items():
+            if not isinstance(entries, dict) or section.startswith("x-"):
+                continue
+            for name in entries:
+                if not COMPONENT_NAME.match(str(name)):
+                    self.problem(f"#/components/{section}/{escape_pointer_token(name)}",
+                                 "component names may only contain letters, digits, '.', '_' and '-'")
+            if section == "parameters":
+                for name, parameter in entries.items():
+                    self.check_parameter(parameter, f"#/components/parameters/{escape_pointer_token(name)}")
+            elif section == "responses":
+                for name, response in entries.items():
+                    self.check_object("response", response, f"#/components/responses/{escape_pointer_token(name)}")
+            elif section == "requestBodies":
+                for name, body in entries.items():
+                    self.check_object("request_body", body, f"#/components/requestBodies/{escape_pointer_token(name)}")
+
+    def check_refs(self):
+        for pointer, ref in self.refs.dangling_refs():
+            self.problem(pointer, f"$ref '{ref}' does not resolve")
+        for cycle in self.refs.alias_cycles():
+            self.problem(cycle[0], f"$ref cycle never reaches a definition: {' -> '.join(cycle)}")
+        for pointer, ref in self.refs.external_refs:
+            if not ref.startswith(("http://", "https://")):
+                self.problem(pointer, f"$ref '{ref}' points at another file, which a single uploaded spec can't include")
+
+    def run(self) -> List[str]:
+        self.check_object("document", self.spec, "#")
+        if self.version == "3.1" and not any(key in self.spec for key in ("paths", "components", "webhooks")):
+            self.problem("#", "needs at least one of 'paths', 'components' or 'webhooks'")
+        if isinstance(self.spec.get("info"), dict):
+            self.check_object("info", self.spec["info"], "#/info")
+        self.check_list_of("server", self.spec.get("servers"), "#/servers")
+        self.check_list_of("tag", self.spec.get("tags"), "#/tags")
+        if isinstance(self.spec.get("paths"), dict):
+            self.check_paths(self.spec["paths"])
+        if isinstance(self.spec.get("components"), dict):
+            self.check_object("components", self.spec["components"], "#/components")
+            self.check_components(self.spec["components"])
+        self.check_refs()
+        return self.issues
+
+def validate_spec(spec: Any) -> List[str]:
+    """Check that a parsed spec is a structurally valid OpenAPI 3.0/3.1 document.
+
+    Returns the problems found, each as "<JSON pointer>: <message>"; an empty
+    list means the spec is valid.
+    """
+    if not isinstance(spec, dict):
+        return ["#: an OpenAPI document must be an object"]
+    if "swagger" in spec and "openapi" not in spec:
+        return ["#/swagger: Swagger 2.0 specs are not supported, convert the spec to OpenAPI 3.x"]
+    version = spec.get("openapi")
+    match = OPENAPI_VERSION.match(version) if isinstance(version, str) else None
+    if match is None:
+        return [f"#/openapi: must be an OpenAPI 3.0.x or 3.1.x version string, got {version!r}"]
+    return _Validator(spec, f"3.{match.group(1)}").run()
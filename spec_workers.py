@@ -0,0 +1,98 @@
+import asyncio
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from config import SPEC_WORKERS, SPEC_TASK_TIMEOUT, SPEC_OFFLOAD_THRESHOLD
+
+# Process pool for CPU-heavy spec work, started on first use
+_executor: Optional[ProcessPoolExecutor] = None
+
+offload_stats: Dict[str, int] = {"inline": 0, "offloaded": 0, "timeouts": 0, "crashes": 0}
+
+# Extra time a worker gets to report its own timeout before the pool is given up on (seconds)
+TIMEOUT_GRACE = 5.0
+
+class SpecTaskTimeout(BaseException):
+    """Raised inside a worker when its task runs past its deadline.
+
+    A BaseException, so the task's own error handling cannot mistake it for a bad spec.
+    """
+
+def _expire(signum, frame):
+    raise SpecTaskTimeout()
+
+def _run_with_deadline(timeout: float, func: Callable[..., Any], *args: Any) -> Any:
+    """Run func(*args) in a worker, interrupting it with SpecTaskTimeout after timeout seconds.
+
+    Pool workers run tasks on their main thread, so a timer signal can stop a
+    runaway parse and leave the worker free for the next task.
+    """
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def get_executor() -> ProcessPoolExecutor:
+    """Get the shared spec worker pool.
+
+    Workers come from a fork server rather than being forked from the app
+    process, which by then has threads (the log writer, to_thread workers)
+    whose locks a forked child could inherit mid-acquire.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=SPEC_WORKERS,
+                                        mp_context=multiprocessing.get_context("forkserver"))
+    return _executor
+
+def _discard_executor(executor: Optional[ProcessPoolExecutor]):
+    """Stop sharing a worker pool and shut it down without waiting for running tasks."""
+    global _executor
+    if executor is None:
+        return
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_executor():
+    """Stop the spec worker pool."""
+    _discard_executor(_executor)
+
+async def run_spec_task(func: Callable[..., Any], *args: Any, size: int,
+                        timeout: float = SPEC_TASK_TIMEOUT) -> Any:
+    """Run func(*args) for a spec of size bytes, in the worker pool if the spec is large.
+
+    Specs below SPEC_OFFLOAD_THRESHOLD, or every spec when SPEC_WORKERS is 0,
+    are handled inline since shipping them to a process costs more than the
+    work. func and args must be picklable. Raises ValueError if the task runs
+    past timeout or crashes its worker (e.g. a stack overflow on absurdly
+    nested YAML). A task is timed out inside its worker, which stays in the
+    pool; only a worker that does not answer within TIMEOUT_GRACE after that,
+    or that crashed, gets its pool replaced, which also fails any other task
+    that was running in it at the time.
+    """
+    if SPEC_WORKERS <= 0 or size < SPEC_OFFLOAD_THRESHOLD:
+        offload_stats["inline"] += 1
+        return func(*args)
+
+    offload_stats["offloaded"] += 1
+    executor = get_executor()
+    future = asyncio.get_running_loop().run_in_executor(executor, _run_with_deadline, timeout, func, *args)
+    try:
+        return await asyncio.wait_for(future, timeout + TIMEOUT_GRACE)
+    except SpecTaskTimeout:
+        offload_stats["timeouts"] += 1
+        raise ValueError(f"Processing the spec took longer than {timeout:g} seconds")
+    except asyncio.TimeoutError:
+        offload_stats["timeouts"] += 1
+        _discard_executor(executor)
+        raise ValueError(f"Processing the spec took longer than {timeout:g} seconds")
+    except BrokenProcessPool:
+        offload_stats["crashes"] += 1
+        _discard_executor(executor)
+        raise ValueError("The spec could not be processed")
@@ -0,0 +1,523 @@
+// Results of the latest search, fetched from the server a page at a time
+let userRepositories = [];
+let selectedRepositories = [];
+let repositoriesLoaded = false;
+let isLoadingRepositories = false;
+let repositoryCount = 0;
+let searchTimer = null;
+// Term and page of the latest search, for "show more"
+let lastSearch = null;
+let searchController = null;
+const SEARCH_PAGE_SIZE = 20;
+
+// Initialize everything when DOM is ready
+document.addEventListener('DOMContentLoaded', function() {
+    initializeRepositorySearch();
+    initializeUsernameParser();
+});
+
+// Also ensure repositories are loaded when page becomes visible
+document.addEventListener('visibilitychange', function() {
+    if (!document.hidden && !repositoriesLoaded && !isLoadingRepositories) {
+        console.log('Page became visible, loading repositories...');
+        loadUserRepositories();
+    }
+});
+
+// Force refresh on window focus as well
+window.addEventListener('focus', function() {
+    if (!repositoriesLoaded && !isLoadingRepositories) {
+        console.log('Window focused, loading repositories...');
+        loadUserRepositories();
+    }
+});
+
+let usernamePills = [];
+
+function initializeUsernameParser() {
+    const usernameInput = document.getElementById('github_usernames');
+    const container = document.getElementById('username_input_container');
+
+    if (!usernameInput || !container) return;
+
+    // Handle input events
+    usernameInput.addEventListener('keydown', handleUsernameKeydown);
+    usernameInput.addEventListener('input', handleUsernameInput);
+    usernameInput.addEventListener('paste', handleUsernamePaste);
+
+    // Make container clickable to focus input
+    container.addEventListener('click', function(e) {
+        if (!e.target.closest('.username-pill')) {
+            usernameInput.focus();
+        }
+    });
+
+    // Initialize display
+    updateInputDisplay();
+}
+
+function handleUsernameKeydown(e) {
+    const input = e.target;
+    const cursorPos = input.selectionStart;
+    const value = input.value;
+
+    // Handle space, comma, semicolon, or enter to create pill
+    if ((e.key === ' ' || e.key === ',' || e.key === ';' || e.key === 'Enter')) {
+        const beforeCursor = value.substring(0, cursorPos);
+        const afterCursor = value.substring(cursorPos);
+
+        // Find the current word being typed
+        const wordStart = Math.max(0, beforeCursor.lastIndexOf(' ') + 1);
+        const currentWord = beforeCursor.substring(wordStart).trim();
+
+        if (currentWord) {
+            e.preventDefault();
+            addUsernamePill(currentWord);
+
+            // Update input value
+            const newValue = value.substring(0, wordStart) + value.substring(cursorPos);
+            input.value = newValue.trim();
+            updateInputDisplay();
+            return;
+        }
+    }
+
+    // Handle backspace to remove last pill when at start or after space
+    if (e.key === 'Backspace' && cursorPos === 0 && usernamePills.length > 0) {
+        e.preventDefault();
+        removeUsernamePill(usernamePills.length - 1);
+        return;
+    }
+}
+
+function handleUsernameInput(e) {
+    updateInputDisplay();
+}
+
+function handleUsernamePaste(e) {
+    setTimeout(() => {
+        const input = e.target;
+        const value = input.value;
+        const tokens = value.split(/[\s,;\n\r\t]+/).filter(t => t.trim());
+
+        if (tokens.length > 1) {
+            e.preventDefault();
+            // Add all tokens as pills
+            tokens.forEach(token => {
+                if (token.trim()) {
+                    addUsernamePill(token.trim());
+                }
+            });
+            input.value = '';
+            updateInputDisplay();
+        }
+    }, 10);
+}
+
+function addUsernamePill(input) {
+    const trimmedInput = input.trim();
+    if (!trimmedInput) return;
+
+    // Extract username from email if it's an email
+    let username = trimmedInput;
+    let isEmail = false;
+
+    if (trimmedInput.includes('@')) {
+        username = trimmedInput.split('@')[0];
+        isEmail = true;
+    }
+
+    // Validate GitHub username
+    if (!isValidGitHubUsername(username)) {
+        console.log('Invalid GitHub username:', username);
+        return;
+    }
+
+    // Check for duplicates
+    if (usernamePills.some(pill => pill.username.toLowerCase() === username.toLowerCase())) {
+        console.log('Duplicate username:', username);
+        return;
+    }
+
+    // Add to pills array
+    const pill = {
+        original: trimmedInput,
+        username: username,
+        isEmail: isEmail
+    };
+
+    usernamePills.push(pill);
+    updateInputDisplay();
+}
+
+function removeUsernamePill(index) {
+    if (index >= 0 && index < usernamePills.length) {
+        usernamePills.splice(index, 1);
+        updateInputDisplay();
+    }
+}
+
+function updateInputDisplay() {
+    const pillsContainer = document.getElementById('username_pills_container');
+    const input = document.getElementById('github_usernames');
+
+    if (!pillsContainer || !input) return;
+
+    // Clear existing pills
+    pillsContainer.innerHTML = '';
+
+    // Create and insert pills
+    usernamePills.forEach((pill, index) => {
+        const displayText = pill.isEmail ? `${pill.username}` : pill.username;
+        const emailClass = pill.isEmail ? ' email' : '';
+        const tooltip = pill.isEmail ? `Extracted from email: ${pill.original}` : `GitHub username: ${pill.username}`;
+
+        const pillElement = document.createElement('span');
+        pillElement.className = `username-pill${emailClass}`;
+        pillElement.title = tooltip;
+        pillElement.innerHTML = `
+            <span class="pill-text">${displayText}</span>
+            <button class="remove-btn" onclick="removeUsernamePill(${index})" type="button">×</button>
+        `;
+
+        pillsContainer.appendChild(pillElement);
+    });
+
+    // Update placeholder
+    input.placeholder = usernamePills.length > 0 
+        ? 'Add more users...' 
+        : 'Type usernames or emails and press space...';
+}
+
+function isValidGitHubUsername(username) {
+    // GitHub username rules:
+    // - May only contain alphanumeric characters or single hyphens
+    // - Cannot begin or end with a hyphen
+    // - Maximum 39 characters
+    const githubUsernameRegex = /^[a-zA-Z0-9]([a-zA-Z0-9-]{0,37}[a-zA-Z0-9])?$/;
+    return githubUsernameRegex.test(username);
+}
+
+function getUsernamesForSubmission() {
+    return usernamePills.map(pill => pill.username);
+}
+
+async function initializeRepositorySearch() {
+    const searchInput = document.getElementById('repository_search');
+    if (!searchInput) return;
+
+    // Set up search input event listener
+    searchInput.addEventListener('input', handleRepositorySearch);
+
+    // Add focus event to load repositories if not already loaded
+    searchInput.addEventListener('focus', function() {
+        console.log('Search input focused, checking repositories...');
+        if (!repositoriesLoaded && !isLoadingRepositories) {
+            loadUserRepositories();
+        }
+    });
+
+    // Load repositories immediately
+    await loadUserRepositories();
+}
+
+async function loadUserRepositories(retryCount = 3, refresh = false) {
+    if (isLoadingRepositories) {
+        console.log('Already loading repositories, skipping...');
+        return;
+    }
+
+    isLoadingRepositories = true;
+    const searchInput = document.getElementById('repository_search');
+
+    // Show loading state; searches made meanwhile wait for the server to finish listing
+    if (searchInput) {
+        searchInput.placeholder = 'Loading repositories...';
+    }
+
+    for (let attempt = 1; attempt <= retryCount; attempt++) {
+        try {
+            console.log(`Loading repositories... (attempt ${attempt}/${retryCount})`);
+            repositoryCount = await countRepositories(refresh);
+            repositoriesLoaded = true;
+            console.log('Successfully loaded repositories:', repositoryCount);
+
+            // Update UI to ready state
+            if (searchInput) {
+                searchInput.disabled = false;
+                if (repositoryCount === 0) {
+                    searchInput.placeholder = 'No repositories found with admin access';
+                } else {
+                    searchInput.placeholder = `Search ${repositoryCount} repositories...`;
+                }
+            }
+
+            isLoadingRepositories = false;
+            refreshRepositorySearch();
+            return; // Success, exit retry loop
+
+        } catch (error) {
+            console.error(`Failed to load repositories (attempt ${attempt}):`, error);
+
+            if (attempt === retryCount) {
+                // Final attempt failed
+                if (searchInput) {
+                    searchInput.placeholder = 'Error loading repositories - click to retry';
+                    searchInput.disabled = false;
+                    searchInput.style.cursor = 'pointer';
+
+                    // Add click handler to retry
+                    const retryHandler = function() {
+                        console.log('Retrying repository load...');
+                        searchInput.removeEventListener('click', retryHandler);
+                        searchInput.style.cursor = '';
+                        repositoriesLoaded = false;
+                        isLoadingRepositories = false;
+                        loadUserRepositories();
+                    };
+                    searchInput.addEventListener('click', retryHandler);
+                }
+            } else {
+                // Wait before retry (exponential backoff)
+                await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+            }
+        }
+    }
+
+    isLoadingRepositories = false;
+}
+
+// Ask the server for the size of the listing; this also fills its cache and
+// search index, so the first search doesn't wait on GitHub
+async function countRepositories(refresh) {
+    const response = await fetch(`/api/repositories/search?per_page=0${refresh ? '&refresh=true' : ''}`, {
+        method: 'GET',
+        headers: {
+            'Cache-Control': 'no-cache'
+        }
+    });
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    return data.total;
+}
+
+function refreshRepositories() {
+    console.log('Manually refreshing repositories...');
+    repositoriesLoaded = false;
+    isLoadingRepositories = false;
+    userRepositories = [];
+
+    // Clear search and dropdown
+    const searchInput = document.getElementById('repository_search');
+    const dropdown = document.getElementById('repository_dropdown');
+
+    if (searchInput) {
+        searchInput.value = '';
+    }
+    if (dropdown) {
+        dropdown.style.display = 'none';
+    }
+
+    // Reload repositories, revalidating the server-side cache
+    loadUserRepositories(3, true);
+}
+
+function refreshRepositorySearch() {
+    const searchInput = document.getElementById('repository_search');
+    if (searchInput && searchInput.value) {
+        handleRepositorySearch({ target: searchInput });
+    }
+}
+
+function handleRepositorySearch(e) {
+    const searchTerm = e.target.value.trim();
+    const dropdown = document.getElementById('repository_dropdown');
+
+    if (searchTerm.length === 0) {
+        if (searchController) searchController.abort();
+        dropdown.style.display = 'none';
+        return;
+    }
+
+    // Wait for a pause in typing before asking the server
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => searchRepositories(searchTerm), 150);
+}
+
+async function searchRepositories(searchTerm, page = 1) {
+    const dropdown = document.getElementById('repository_dropdown');
+
+    // Only the latest search matters
+    if (searchController) searchController.abort();
+    searchController = new AbortController();
+
+    let data;
+    try {
+        const response = await fetch(
+            `/api/repositories/search?q=${encodeURIComponent(searchTerm)}&page=${page}&per_page=${SEARCH_PAGE_SIZE}`,
+            { signal: searchController.signal }
+        );
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        data = await response.json();
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Repository search failed:', error);
+        dropdown.innerHTML = '<div class="repo-item" style="color: #6b7280; font-style: italic;">Search failed - try again</div>';
+        dropdown.style.display = 'block';
+        return;
+    }
+
+    // Keep the shown results so they can be selected; later pages add to the earlier ones
+    lastSearch = { term: searchTerm, page: page };
+    userRepositories = page === 1 ? data.results : userRepositories.concat(data.results);
+    const filteredRepos = userRepositories.filter(repo => 
+        !selectedRepositories.some(selected => selected.id === repo.id)
+    );
+
+    if (filteredRepos.length === 0 && data.total <= userRepositories.length) {
+        const message = repositoriesLoaded && repositoryCount === 0 
+            ? 'No repositories available' 
+            : 'No matching repositories found';
+        dropdown.innerHTML = `<div class="repo-item" style="color: #6b7280; font-style: italic;">${message}</div>`;
+        dropdown.style.display = 'block';
+        return;
+    }
+
+    const moreMatches = data.total > userRepositories.length
+        ? `<div class="repo-item" style="color: #4f46e5; font-style: italic;" onclick="showMoreRepositories()">Showing ${userRepositories.length} of ${data.total} matches - show more</div>`
+        : '';
+
+    dropdown.innerHTML = filteredRepos.map(repo => 
+        `<div class="repo-item" onclick="selectRepository(${repo.id})" data-repo-id="${repo.id}">
+            <strong>${repo.name}</strong>
+            <div style="font-size: 0.875rem; color: #6b7280;">${repo.description || 'No description'}</div>
+        </div>`
+    ).join('') + moreMatches;
+
+    dropdown.style.display = 'block';
+}
+
+function showMoreRepositories() {
+    if (lastSearch) {
+        searchRepositories(lastSearch.term, lastSearch.page + 1);
+    }
+}
+
+function selectRepository(repoId) {
+    console.log('Selecting repository:', repoId);
+    const repo = userRepositories.find(r => r.id === repoId);
+    if (repo && !selectedRepositories.some(selected => selected.id === repoId)) {
+        selectedRepositories.push(repo);
+        updateSelectedReposDisplay();
+        document.getElementById('repository_search').value = '';
+        document.getElementById('repository_dropdown').style.display = 'none';
+        console.log('Selected repositories:', selectedRepositories);
+    } else {
+        console.log('Repository not found or already selected');
+    }
+}
+
+function removeRepository(repoId) {
+    console.log('Removing repository:', repoId);
+    selectedRepositories = selectedRepositories.filter(repo => repo.id !== repoId);
+    updateSelectedReposDisplay();
+}
+
+function updateSelectedReposDisplay() {
+    const container = document.getElementById('selected_repos');
+    container.innerHTML = selectedRepositories.map(repo => 
+        `<span class="repo-tag">
+            ${repo.name}
+            <button onclick="removeRepository(${repo.id})" type="button">×</button>
+        </span>`
+    ).join('');
+
+    console.log('Updated selected repos display:', selectedRepositories.length);
+}
+
+document.addEventListener('click', function(e) {
+    if (!e.target.closest('#repository_search') && !e.target.closest('#repository_dropdown')) {
+        document.getElementById('repository_dropdown').style.display = 'none';
+    }
+});
+
+async function addRepoAccess() {
+    const resultsDiv = document.getElementById('accessResults');
+
+    if (selectedRepositories.length === 0) {
+        resultsDiv.innerHTML = '<div style="color: #dc2626; background: #fef2f2; padding: 1rem; border-radius: 8px; border: 1px solid #fecaca;">Please select at least one repository.</div>';
+        return;
+    }
+
+    // Get usernames from pills
+    const usernames = getUsernamesForSubmission();
+
+    if (usernames.length === 0) {
+        resultsDiv.innerHTML = '<div style="color: #dc2626; background: #fef2f2; padding: 1rem; border-radius: 8px; border: 1px solid #fecaca;">Please add at least one GitHub username or email.</div>';
+        return;
+    }
+
+    console.log('Adding repo access:', selectedRepositories.length, 'repos for users:', usernames);
+
+    resultsDiv.innerHTML = '<div style="color: #2563eb; background: #eff6ff; padding: 1rem; border-radius: 8px; border: 1px solid #bfdbfe;">Processing...</div>';
+
+    try {
+        const response = await fetch('/api/add-repo-access', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                repositories: selectedRepositories.map(repo => repo.full_name),
+                usernames: usernames
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const result = await response.json();
+        displayAccessResults(result);
+    } catch (error) {
+        console.error('Error adding repo access:', error);
+        resultsDiv.innerHTML = '<div style="color: #dc2626; background: #fef2f2; padding: 1rem; border-radius: 8px; border: 1px solid #fecaca;">An error occurred. Please try again. Check console for details.</div>';
+    }
+}
+
+function displayAccessResults(results) {
+    const resultsDiv = document.getElementById('accessResults');
+    let html = '<div style="margin-top: 1rem;">';
+
+    results.forEach(result => {
+        const isSuccess = result.success;
+        const bgColor = isSuccess ? '#f0fdf4' : '#fef2f2';
+        const borderColor = isSuccess ? '#86efac' : '#fecaca';
+        const textColor = isSuccess ? '#15803d' : '#dc2626';
+        const icon = isSuccess ? '✓' : '✗';
+
+        html += `<div style="background: ${bgColor}; border: 1px solid ${borderColor}; color: ${textColor}; padding: 0.75rem; border-radius: 6px; margin-bottom: 0.5rem;">
+            <strong>${icon} ${result.repository}</strong> - ${result.username}: ${result.message}
+        </div>`;
+    });
+
+    html += '</div>';
+    resultsDiv.innerHTML = html;
+
+    if (results.some(r => r.success)) {
+        setTimeout(() => {
+            // Clear username pills
+            usernamePills = [];
+            document.getElementById('github_usernames').value = '';
+            updateInputDisplay();
+
+            // Clear selected repositories
+            selectedRepositories = [];
+            updateSelectedReposDisplay();
+        }, 3000);
+    }
+}
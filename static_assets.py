@@ -0,0 +1,93 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
+from compression import CompressedVariants, record_compression
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+MEDIA_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+}
+
+# Asset URLs carry a hash of their content, so a URL's content never changes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class StaticAsset:
+    """A static file held in memory under a content-hashed file name, with its compressed variants."""
+
+    __slots__ = ("name", "filename", "content", "media_type", "etag", "variants")
+
+    def __init__(self, name: str, content: bytes, media_type: str):
+        digest = hashlib.sha256(content).hexdigest()
+        stem, _, suffix = name.rpartition(".")
+        self.name = name
+        self.filename = f"{stem}.{digest[:12]}.{suffix}"
+        self.content = content
+        self.media_type = media_type
+        self.etag = f'"{digest[:32]}"'
+        self.variants = CompressedVariants(content, best=True)
+
+    @property
+    def url(self) -> str:
+        return f"/static/{self.filename}"
+
+def load_assets(directory: Path) -> Dict[str, StaticAsset]:
+    """Every servable file in directory, by its plain file name."""
+    assets = {}
+    for path in sorted(directory.iterdir()):
+        if path.suffix in MEDIA_TYPES:
+            asset = StaticAsset(path.name, path.read_bytes(), MEDIA_TYPES[path.suffix])
+            asset.variants.prepare()
+            assets[path.name] = asset
+    return assets
+
+assets = load_assets(STATIC_DIR)
+_assets_by_filename = {asset.filename: asset for asset in assets.values()}
+
+def asset_url(name: str) -> str:
+    """Versioned URL of a file in STATIC_DIR, e.g. asset_url("main.css")."""
+    return assets[name].url
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names etag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+def conditional_response(request: Request, content: bytes, media_type: str, etag: str, cache_control: str,
+                         variants: Optional[CompressedVariants] = None) -> Response:
+    """A 200 with content, or an empty 304 if the client already has this etag.
+
+    With variants, a stored compressed copy is sent when the client accepts
+    one, under an ETag of its own.
+    """
+    headers = {"Cache-Control": cache_control}
+    encoding, body = None, content
+    if variants is not None:
+        encoding, body = variants.select(request.headers.get("accept-encoding", ""))
+        headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            etag = f'{etag[:-1]}-{encoding}"'
+            headers["Content-Encoding"] = encoding
+    headers["ETag"] = etag
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        record_compression(encoding, len(content), len(body), precompressed=True)
+    return Response(body, media_type=media_type, headers=headers)
+
+router = APIRouter()
+
+@router.get("/static/{filename}")
+async def static_asset(request: Request, filename: str):
+    """Serve a static asset by its hashed file name."""
+    asset = _assets_by_filename.get(filename)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return conditional_response(request, asset.content, asset.media_type, asset.etag, IMMUTABLE_CACHE_CONTROL,
+                                asset.variants)
@@ -0,0 +1,22 @@
+import os
+import sys
+import httpx
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def github_api(monkeypatch):
+    """Send the app's GitHub API calls to a handler instead: github_api(handler).
+
+    The handler takes an httpx.Request and returns an httpx.Response, or a
+    coroutine resolving to one.
+    """
+    import github_client
+
+    def install(handler):
+        client = httpx.AsyncClient(base_url=github_client.GITHUB_API_URL, transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(github_client, "_http_client", client)
+
+    return install
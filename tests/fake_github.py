@@ -0,0 +1,235 @@
+import base64
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+import httpx
+
+TEMPLATE = "cdonel707/sdk-starter"
+
+GENERATORS_YML = """default-group: local
+api:
+  specs:
+    - openapi: openapi.yaml
+groups:
+  python-sdk:
+    generators:
+      - name: fernapi/fern-python-sdk
+        config:
+          pypi-package-name: startersdk
+          # github:
+          #   repository: fern-demo/starter-python-sdk
+  ts-sdk:
+    generators:
+      - name: fernapi/fern-typescript-sdk
+        config:
+          npm-package-name: startersdk
+          # github:
+          #   repository: fern-demo/starter-typescript-sdk
+"""
+
+TEMPLATE_FILES = {
+    "fern/openapi.yaml": b"openapi: 3.0.0\n",
+    "fern/generators.yml": GENERATORS_YML.encode("utf-8"),
+    "fern/fern.config.json": b'{"organization": "starter", "version": "0.1.0"}',
+}
+
+def blob_sha(content: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+class FakeGitHub:
+    """Just enough of the GitHub API, in memory, to run provisioning and listings against.
+
+    Pass handler to the github_api fixture. Every request is logged in
+    calls as (method, path). A path matching a regex in failures gets that
+    status instead of being handled; not_ready_polls makes a new
+    repository's branch 409 ("still empty") for that many reads.
+    """
+
+    def __init__(self, login: str = "me"):
+        self.login = login
+        self.calls: List[Tuple[str, str]] = []
+        self.failures: Dict[str, int] = {}
+        self.not_ready_polls = 0
+        self.repos: Dict[str, dict] = {}
+        # Commit sha -> files, and tree sha -> files
+        self.commits: Dict[str, Dict[str, bytes]] = {}
+        self.trees: Dict[str, Dict[str, bytes]] = {}
+        self.blobs: Dict[str, bytes] = {}
+        self.collaborators: List[Tuple[str, str, str]] = []
+        self.add_repo(TEMPLATE, dict(TEMPLATE_FILES), is_template=True)
+
+    def add_repo(self, full_name: str, files: Optional[Dict[str, bytes]] = None, admin: bool = True,
+                 is_template: bool = False, description: Optional[str] = None) -> dict:
+        head = self._commit(dict(files or {}))
+        self.repos[full_name] = {
+            "id": len(self.repos) + 1,
+            "name": full_name.split("/")[1],
+            "full_name": full_name,
+            "description": description,
+            "private": True,
+            "is_template": is_template,
+            "default_branch": "main",
+            "html_url": f"https://github.com/{full_name}",
+            "permissions": {"admin": admin, "maintain": admin, "push": True, "pull": True},
+            "_head": head,
+            "_unready": self.not_ready_polls,
+        }
+        return self.repos[full_name]
+
+    def files(self, full_name: str) -> Dict[str, bytes]:
+        return self.commits[self.repos[full_name]["_head"]]
+
+    def commit_count(self, full_name: str) -> int:
+        """Commits created in the repository through the Git Data API."""
+        return sum(1 for method, path in self.calls if method == "POST" and path == f"/repos/{full_name}/git/commits")
+
+    def _commit(self, files: Dict[str, bytes]) -> str:
+        sha = f"c{len(self.commits)}"
+        self.commits[sha] = files
+        return sha
+
+    @staticmethod
+    def _public(repo: dict) -> dict:
+        return {key: value for key, value in repo.items() if not key.startswith("_")}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        method, path = request.method, request.url.path
+        self.calls.append((method, path))
+        for pattern, status in self.failures.items():
+            if re.search(pattern, f"{method} {path}"):
+                return httpx.Response(status, json={"message": "Injected failure"})
+        body = json.loads(await request.aread() or b"{}")
+        return self._handle(request, method, path, body)
+
+    def _handle(self, request: httpx.Request, method: str, path: str, body: dict) -> httpx.Response:
+        not_found = httpx.Response(404, json={"message": "Not Found"})
+        if path == "/user":
+            return httpx.Response(200, json={"login": self.login, "avatar_url": None})
+        if path == "/user/repos" and method == "GET":
+            return self._list_repos(request)
+        if path == "/user/repos" and method == "POST":
+            full_name = f"{self.login}/{body['name']}"
+            if full_name in self.repos:
+                return httpx.Response(422, json={"message": "name already exists on this account"})
+            return httpx.Response(201, json=self._public(self.add_repo(full_name, {"README.md": b"# SDK\n"},
+                                                                       description=body.get("description"))))
+        if path == "/graphql":
+            return self._graphql(body)
+
+        match = re.match(r"^/repos/([^/]+/[^/]+)(/.*)?$", path)
+        if not match:
+            return not_found
+        full_name, rest = match.group(1), match.group(2) or ""
+        repo = self.repos.get(full_name)
+        if repo is None and rest != "/generate":
+            return not_found
+        if rest == "":
+            return httpx.Response(200, json=self._public(repo))
+        if rest == "/generate":
+            new_name = f"{body['owner']}/{body['name']}"
+            if new_name in self.repos:
+                return httpx.Response(422, json={"message": "name already exists on this account"})
+            template = self.repos[full_name]
+            created = self.add_repo(new_name, dict(self.files(template["full_name"])), description=body.get("description"))
+            return httpx.Response(201, json=self._public(created))
+        if rest.startswith("/collaborators/"):
+            self.collaborators.append((full_name, rest.split("/")[-1], body.get("permission")))
+            return httpx.Response(201, json={"id": len(self.collaborators)})
+        if rest.startswith("/contents/"):
+            return self._contents(repo, method, rest[len("/contents/"):], body)
+        if rest.startswith("/git/"):
+            return self._git(repo, method, rest[len("/git/"):], body)
+        return not_found
+
+    def _list_repos(self, request: httpx.Request) -> httpx.Response:
+        repositories = [self._public(repo) for repo in self.repos.values()]
+        per_page = int(request.url.params.get("per_page", 30))
+        page = int(request.url.params.get("page", 1))
+        last = max(1, -(-len(repositories) // per_page))
+        items = repositories[(page - 1) * per_page:page * per_page]
+        etag = '"' + hashlib.sha1(json.dumps(items).encode("utf-8")).hexdigest() + '"'
+        headers = {"ETag": etag}
+        if page < last:
+            base = f"https://api.github.com/user/repos?per_page={per_page}"
+            headers["Link"] = f'<{base}&page={page + 1}>; rel="next", <{base}&page={last}>; rel="last"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json=items, headers=headers)
+
+    def _graphql(self, body: dict) -> httpx.Response:
+        repositories = list(self.repos.values())
+        start = int(body["variables"].get("cursor") or 0)
+        nodes = [{
+            "databaseId": repo["id"], "name": repo["name"], "nameWithOwner": repo["full_name"],
+            "description": repo["description"], "isPrivate": repo["private"],
+            "viewerPermission": "ADMIN" if repo["permissions"]["admin"] else "WRITE"
+        } for repo in repositories[start:start + 100]]
+        page_info = {"hasNextPage": start + 100 < len(repositories), "endCursor": str(start + 100)}
+        return httpx.Response(200, json={"data": {"viewer": {"repositories": {"pageInfo": page_info, "nodes": nodes}}}})
+
+    def _contents(self, repo: dict, method: str, path: str, body: dict) -> httpx.Response:
+        files = dict(self.files(repo["full_name"]))
+        if method == "GET":
+            if path not in files:
+                return httpx.Response(404, json={"message": "Not Found"})
+            sha = blob_sha(files[path])
+            return httpx.Response(200, json={"path": path, "sha": sha,
+                                             "content": base64.b64encode(files[path]).decode("ascii")},
+                                  headers={"ETag": f'"{sha}"'})
+        if method == "PUT":
+            files[path] = base64.b64decode(body["content"])
+        elif method == "DELETE":
+            files.pop(path, None)
+        repo["_head"] = self._commit(files)
+        return httpx.Response(200 if method != "PUT" else 201, json={"content": {"path": path}})
+
+    def _git(self, repo: dict, method: str, rest: str, body: dict) -> httpx.Response:
+        if rest.startswith(("ref/heads/", "refs/heads/")):
+            if method == "GET":
+                if repo["_unready"] > 0:
+                    repo["_unready"] -= 1
+                    return httpx.Response(409, json={"message": "Git Repository is empty."})
+                return httpx.Response(200, json={"object": {"sha": repo["_head"]}})
+            repo["_head"] = body["sha"]
+            return httpx.Response(200, json={"object": {"sha": body["sha"]}})
+        if rest.startswith("commits/"):
+            sha = rest[len("commits/"):]
+            self.trees.setdefault(f"t-{sha}", self.commits[sha])
+            return httpx.Response(200, json={"sha": sha, "tree": {"sha": f"t-{sha}"}})
+        if rest == "commits":
+            sha = self._commit(self.trees[body["tree"]])
+            return httpx.Response(201, json={"sha": sha})
+        if rest.startswith("trees/"):
+            files = self.trees[rest[len("trees/"):]]
+            return httpx.Response(200, json={"tree": [
+                {"path": path, "mode": "100644", "type": "blob", "sha": blob_sha(content)}
+                for path, content in files.items()
+            ]})
+        if rest == "trees":
+            files = dict(self.trees[body["base_tree"]]) if body.get("base_tree") else {}
+            for entry in body["tree"]:
+                if "content" in entry:
+                    files[entry["path"]] = entry["content"].encode("utf-8")
+                elif entry["sha"] is None:
+                    files.pop(entry["path"], None)
+                else:
+                    files[entry["path"]] = self.blobs[entry["sha"]]
+            sha = f"t{len(self.trees)}"
+            self.trees[sha] = files
+            return httpx.Response(201, json={"sha": sha})
+        if rest.startswith("blobs/"):
+            sha = rest[len("blobs/"):]
+            for files in self.commits.values():
+                for content in files.values():
+                    if blob_sha(content) == sha:
+                        self.blobs[sha] = content
+            if sha not in self.blobs:
+                return httpx.Response(404, json={"message": "Not Found"})
+            return httpx.Response(200, json={"sha": sha, "encoding": "base64",
+                                             "content": base64.b64encode(self.blobs[sha]).decode("ascii")})
+        if rest == "blobs":
+            content = base64.b64decode(body["content"])
+            self.blobs[blob_sha(content)] = content
+            return httpx.Response(201, json={"sha": blob_sha(content)})
+        return httpx.Response(404, json={"message": "Not Found"})
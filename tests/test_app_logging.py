@@ -0,0 +1,85 @@
+import io
+import json
+import logging
+import queue
+import sys
+import pytest
+import app_logging
+from app_logging import JsonFormatter, _AsyncQueueHandler, log_user, logging_stats
+from tracing import span, start_trace
+
+@pytest.fixture
+def records():
+    """A logger whose records go through the queue handler into a queue the test reads."""
+    captured = queue.Queue(maxsize=2)
+    logger = logging.getLogger("tests.app_logging")
+    handler = _AsyncQueueHandler(captured, debug_sample_rate=0.0)
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    yield logger, captured
+    logger.removeHandler(handler)
+    logger.propagate = True
+
+def test_records_capture_the_request_context_when_logged(records):
+    logger, captured = records
+
+    with start_trace("POST /submit", trace_id="req-1"), log_user("octocat"), span("config_files", "step"):
+        logger.info("Committed %s", "fern/openapi.yaml", extra={"repo": "me/acme-config"})
+    logger.info("Outside a request", extra={"user": "explicit"})
+
+    first, second = captured.get_nowait(), captured.get_nowait()
+    assert (first.request_id, first.user, first.step) == ("req-1", "octocat", "config_files")
+    assert first.msg == "Committed fern/openapi.yaml" and first.args is None
+    assert (second.request_id, second.user, second.step) == (None, "explicit", None)
+
+def test_a_full_queue_drops_records_instead_of_blocking(records):
+    logger, captured = records
+    dropped = logging_stats["dropped"]
+
+    for i in range(3):
+        logger.warning("Record %d", i)
+
+    assert captured.qsize() == 2
+    assert logging_stats["dropped"] == dropped + 1
+
+def test_debug_records_are_sampled(records):
+    logger, captured = records
+    sampled_out = logging_stats["sampled_out"]
+
+    logger.debug("Noisy detail")
+
+    assert captured.empty()
+    assert logging_stats["sampled_out"] == sampled_out + 1
+
+def test_json_lines_carry_extra_fields_and_tracebacks(records):
+    logger, captured = records
+    try:
+        raise ValueError("bad spec")
+    except ValueError:
+        logger.exception("Parse failed", extra={"path": "fern/openapi.yaml", "bytes": 12})
+
+    entry = json.loads(JsonFormatter().format(captured.get_nowait()))
+
+    assert entry["level"] == "ERROR" and entry["logger"] == "tests.app_logging"
+    assert entry["message"] == "Parse failed"
+    assert (entry["path"], entry["bytes"]) == ("fern/openapi.yaml", 12)
+    assert "ValueError: bad spec" in entry["exception"]
+    assert entry["time"].endswith("Z")
+
+def test_stopping_writes_out_queued_records(monkeypatch):
+    output = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", output)
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    monkeypatch.setattr(app_logging, "_listener", None)
+    try:
+        app_logging.configure_logging("INFO")
+        logging.getLogger("tests.log_output").info("Queued", extra={"job": "abc"})
+        app_logging.stop_logging()
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [(line["message"], line["job"]) for line in lines] == [("Queued", "abc")]
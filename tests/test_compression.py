@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+import zlib
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+import compression
+from compression import CompressedVariants, CompressionMiddleware, compression_stats, negotiate
+
+BIG = {"repositories": [{"name": f"repo-{i}", "description": "An SDK configuration repository"} for i in range(200)]}
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse(BIG, headers={"ETag": '"listing"'})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(50):
+                yield json.dumps({"line": i}).encode("utf-8") + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(iter([b"data: 1\n\n"] * 200), media_type="text/event-stream")
+
+    @app.get("/precompressed")
+    async def precompressed():
+        return Response(compression.compress(json.dumps(BIG).encode("utf-8"), "gzip"), media_type="application/json",
+                        headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+def test_large_json_is_compressed_with_a_weak_etag(client):
+    responses_before = compression_stats["gzip"]["responses"]
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"listing"'
+    assert int(response.headers["content-length"]) < len(json.dumps(BIG))
+    assert response.json() == BIG
+    assert compression_stats["gzip"]["responses"] == responses_before + 1
+
+def test_responses_pass_through_when_compression_does_not_apply(client):
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in client.get("/events", headers={"Accept-Encoding": "gzip"}).headers
+    # Already compressed by the handler, so not compressed twice
+    precompressed = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+    assert precompressed.json() == BIG
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk(client):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        decompressor = zlib.decompressobj(31)
+        chunks = [decompressor.decompress(chunk) for chunk in response.iter_raw()]
+
+    # Every chunk is flushed, so each decodes on arrival
+    assert all(chunks)
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line)["line"] for line in lines] == list(range(50))
+
+def test_negotiation_honours_quality_values():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("*") in compression.ENCODINGS
+    assert negotiate("identity") is None
+
+def test_variants_are_made_once_and_skipped_when_they_do_not_help():
+    content = json.dumps(BIG).encode("utf-8")
+    variants = CompressedVariants(content)
+
+    encoding, body = asyncio.run(variants.select_async("gzip"))
+    assert encoding == "gzip" and zlib.decompress(body, 31) == content
+    assert variants.select("gzip")[1] is body
+    assert variants.select("identity") == (None, content)
+
+    incompressible = CompressedVariants(os.urandom(4096))
+    assert incompressible.select("gzip")[0] is None
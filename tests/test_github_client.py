@@ -0,0 +1,92 @@
+import asyncio
+import base64
+import io
+import json
+import httpx
+import pytest
+from github_client import GitHubAPIError, GitHubClient
+
+def test_requests_carry_the_token_and_errors_raise(github_api):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.url.path == "/repos/me/missing":
+            return httpx.Response(404, json={"message": "Not Found"})
+        return httpx.Response(200, json={"login": "me"})
+
+    github_api(handler)
+    client = GitHubClient("secret-token")
+
+    async def scenario():
+        assert (await client.get_user())["login"] == "me"
+        with pytest.raises(GitHubAPIError) as error:
+            await client.get_repo("me/missing")
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert seen[0].headers["Authorization"] == "token secret-token"
+    assert error.status == 404 and error.data == {"message": "Not Found"}
+    assert not error.is_rate_limited
+
+def test_rate_limit_errors_say_how_long_to_wait():
+    assert GitHubAPIError(429, {}, httpx.Headers({"Retry-After": "7"})).retry_after == 7.0
+    secondary = GitHubAPIError(403, {"message": "You have exceeded a secondary rate limit"})
+    assert secondary.is_rate_limited and secondary.retry_after is None
+    assert not GitHubAPIError(403, {"message": "Resource not accessible"}).is_rate_limited
+
+def test_paginate_follows_next_links(github_api):
+    pages = {
+        "1": ([{"id": 1}, {"id": 2}], '<https://api.github.com/user/repos?per_page=2&page=2>; rel="next"'),
+        "2": ([{"id": 3}], None),
+    }
+
+    def handler(request):
+        items, link = pages[request.url.params.get("page", "1")]
+        return httpx.Response(200, json=items, headers={"Link": link} if link else {})
+
+    github_api(handler)
+
+    async def scenario():
+        return [repo["id"] async for repo in GitHubClient("token").paginate("/user/repos", {"per_page": 2})]
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+
+def test_file_blobs_are_streamed_as_base64_with_an_exact_length(github_api):
+    received = {}
+
+    async def handler(request):
+        body = b"".join([chunk async for chunk in request.stream])
+        received["length"] = int(request.headers["Content-Length"])
+        received["body"] = json.loads(body)
+        received["size"] = len(body)
+        return httpx.Response(201, json={"sha": "abc"})
+
+    github_api(handler)
+    # Larger than one base64 chunk and not a multiple of 3
+    content = bytes(range(256)) * 1000 + b"x"
+
+    asyncio.run(GitHubClient("token").create_blob("me/repo", io.BytesIO(content)))
+    assert received["length"] == received["size"]
+    assert received["body"]["encoding"] == "base64"
+    assert base64.b64decode(received["body"]["content"]) == content
+
+def test_conditional_get_remembers_etags(github_api):
+    def handler(request):
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404, json={"message": "Not Found"})
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"sha": "v1"}, headers={"ETag": '"v1"'})
+
+    github_api(handler)
+    client = GitHubClient("token")
+
+    async def scenario():
+        return [
+            await client.conditional_get("/repos/me/repo/git/ref/heads/main"),
+            await client.conditional_get("/repos/me/repo/git/ref/heads/main"),
+            await client.conditional_get("/repos/me/missing"),
+        ]
+
+    assert asyncio.run(scenario()) == [(200, {"sha": "v1"}), (304, None), (404, None)]
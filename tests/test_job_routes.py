@@ -0,0 +1,71 @@
+import json
+import re
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import auth
+import jobs
+import routes
+from fake_github import FakeGitHub
+from session_store import SessionStore
+
+SPEC = b"openapi: 3.0.0\ninfo:\n  title: Acme\n  version: 1.0.0\npaths: {}\n"
+
+class AcceptAllTokens:
+    async def is_valid(self, access_token):
+        return True
+
+    def forget(self, access_token):
+        pass
+
+@pytest.fixture
+def client(github_api, monkeypatch):
+    """The web routes with job workers running, in-memory jobs and a signed-in "me"."""
+    github_api(FakeGitHub().handler)
+    sessions = SessionStore(validation=AcceptAllTokens())
+    monkeypatch.setattr(auth, "session_store", sessions)
+    monkeypatch.setattr(jobs, "job_store", jobs.MemoryJobStore())
+
+    app = FastAPI()
+    app.include_router(routes.router)
+    app.add_event_handler("startup", jobs.start_workers)
+    app.add_event_handler("shutdown", jobs.stop_workers)
+    with TestClient(app) as client:
+        client.cookies.set("session_id", sessions.create({"login": "me"}, "route-token"))
+        client.sessions = sessions
+        yield client
+
+def events(body):
+    """(event, data) pairs of a Server-Sent Events stream."""
+    parsed = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines() if not line.startswith(":"))
+        if fields:
+            parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+def submit(client):
+    response = client.post("/submit", data={"company_name": "acme"},
+                           files={"openapi_spec": ("openapi.yaml", SPEC, "application/yaml")})
+    assert response.status_code == 202
+    return re.search(r"/jobs/([^/']+)/events", response.text).group(1)
+
+def test_submission_runs_as_a_job_and_streams_its_progress(client):
+    job_id = submit(client)
+
+    stream = events(client.get(f"/jobs/{job_id}/events").text)
+
+    steps = [data["step"] for event, data in stream if event == "progress"]
+    assert steps[0] == "template_created"
+    assert "spec_committed" in steps and steps[-1] == "installation_url_ready"
+    assert stream[-1] == ("done", {"status": "succeeded"})
+    page = client.get(f"/jobs/{job_id}")
+    assert "https://github.com/me/acme-config" in page.text
+
+def test_jobs_are_only_visible_to_their_owner(client):
+    job_id = submit(client)
+    client.get(f"/jobs/{job_id}/events")
+
+    client.cookies.set("session_id", client.sessions.create({"login": "someone-else"}, "other-token"))
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert client.get(f"/jobs/{job_id}/events").status_code == 404
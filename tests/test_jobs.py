@@ -0,0 +1,83 @@
+import asyncio
+import jobs
+from jobs import FileJobStore, Job, MemoryJobStore, get_job, wait_for_job_change
+
+def test_file_store_shows_a_job_to_other_processes(tmp_path):
+    running = FileJobStore(str(tmp_path), poll_interval=0.01)
+    # Another server process reads the same directory through its own store
+    other = FileJobStore(str(tmp_path), poll_interval=0.01)
+
+    async def provision(progress):
+        progress("repo_created", "Created acme-config")
+        return {"repo_url": "https://github.com/me/acme-config"}
+
+    async def scenario():
+        job = Job("me", "acme", provision, running)
+        job.save()
+        queued = jobs.JobRecord(other.load(job.id))
+        assert queued.status == "queued" and not queued.finished
+
+        waiter = asyncio.ensure_future(other.wait_for_change(job.id, queued.version, timeout=5))
+        await job.execute()
+        assert await waiter is True
+
+        finished = jobs.JobRecord(other.load(job.id))
+        assert finished.status == "succeeded"
+        assert [event["step"] for event in finished.events] == ["repo_created"]
+        assert finished.result == {"repo_url": "https://github.com/me/acme-config"}
+        assert await other.wait_for_change(job.id, finished.version, timeout=0.05) is False
+
+    asyncio.run(scenario())
+
+def test_failed_job_records_its_error(tmp_path):
+    store = FileJobStore(str(tmp_path))
+
+    async def provision(progress):
+        raise ValueError("No repository named 'acme-config' was found to update.")
+
+    job = Job("me", "acme", provision, store)
+    asyncio.run(job.execute())
+    record = store.load(job.id)
+    assert record["status"] == "failed"
+    assert record["error"] == "No repository named 'acme-config' was found to update."
+
+def test_only_the_owner_can_read_a_job(tmp_path, monkeypatch):
+    store = FileJobStore(str(tmp_path))
+    monkeypatch.setattr(jobs, "job_store", store)
+    job = Job("me", "acme", None, store)
+    job.save()
+    assert get_job(job.id, "me").title == "acme"
+    assert get_job(job.id, "someone-else") is None
+    assert get_job("../" + job.id, "me") is None
+    assert get_job("missing", "me") is None
+
+def test_finished_jobs_past_retention_are_evicted_oldest_first(tmp_path):
+    for store in (MemoryJobStore(retention=2), FileJobStore(str(tmp_path), retention=2)):
+        running = Job("me", "running", None, store)
+        running.save()
+        finished = []
+        for title in ("first", "second", "third"):
+            job = Job("me", title, None, store)
+            job.status = "succeeded"
+            job.save()
+            finished.append(job)
+        assert store.load(running.id) is not None
+        assert store.load(finished[0].id) is None
+        assert store.load(finished[1].id) is None
+        assert store.load(finished[2].id) is not None
+
+def test_memory_store_wakes_waiters_on_save(monkeypatch):
+    store = MemoryJobStore()
+    monkeypatch.setattr(jobs, "job_store", store)
+
+    async def scenario():
+        job = Job("me", "acme", None, store)
+        job.save()
+        record = get_job(job.id, "me")
+        waiter = asyncio.ensure_future(wait_for_job_change(record, timeout=5))
+        await asyncio.sleep(0)
+        job.report("repo_created", "Created acme-config")
+        assert await waiter is True
+        assert await wait_for_job_change(get_job(job.id, "me"), timeout=0.01) is False
+
+    asyncio.run(scenario())
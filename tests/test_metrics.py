@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import auth
+import internal
+import metrics
+from metrics import Gauge, Histogram, MetricsMiddleware
+
+def sample(text, line_start):
+    """The value of the exposition line starting with line_start."""
+    return next(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(line_start + " "))
+
+def test_histogram_buckets_are_cumulative_with_inclusive_bounds():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/say/"hi"')
+
+    text = "\n".join(histogram.render())
+
+    assert "# TYPE latency_seconds histogram" in text
+    labels = 'route="/say/\\"hi\\""'
+    assert sample(text, f'latency_seconds_bucket{{{labels},le="0.1"}}') == 2
+    assert sample(text, f'latency_seconds_bucket{{{labels},le="1"}}') == 3
+    assert sample(text, f'latency_seconds_bucket{{{labels},le="+Inf"}}') == 4
+    assert sample(text, f"latency_seconds_sum{{{labels}}}") == pytest.approx(3.65)
+    assert sample(text, f"latency_seconds_count{{{labels}}}") == 4
+
+def test_gauge_goes_up_and_down():
+    gauge = Gauge("in_flight", "In flight.", ("method",))
+    gauge.inc("GET")
+    gauge.inc("GET")
+    gauge.dec("GET")
+    assert gauge.render()[-1] == 'in_flight{method="GET"} 1'
+
+@pytest.fixture
+def app(monkeypatch):
+    for metric in ("http_request_duration", "http_requests_in_flight"):
+        original = getattr(metrics, metric)
+        monkeypatch.setattr(metrics, metric, type(original)(original.name, original.help, original.labelnames))
+    monkeypatch.setattr(metrics, "METRICS", [metrics.http_request_duration, metrics.http_requests_in_flight])
+    monkeypatch.setattr(auth, "INTERNAL_API_TOKEN", "internal-token")
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(internal.metrics_router)
+
+    @app.get("/jobs/{job_id}")
+    async def job(job_id: str):
+        return {"id": job_id}
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    return app
+
+def test_requests_are_labelled_by_route_template(app):
+    client = TestClient(app, raise_server_exceptions=False)
+    client.get("/jobs/a")
+    client.get("/jobs/b")
+    client.get("/wp-login.php")
+    client.get("/broken")
+
+    text = client.get("/metrics", headers={"Authorization": "Bearer internal-token"}).text
+
+    assert sample(text, 'http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}",status="200"}') == 2
+    assert sample(text, 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}') == 1
+    assert sample(text, 'http_request_duration_seconds_count{method="GET",route="/broken",status="500"}') == 1
+    assert sample(text, 'http_requests_in_flight{method="GET",route="/jobs/{job_id}"}') == 0
+    # The scrape itself is in flight while it renders
+    assert sample(text, 'http_requests_in_flight{method="GET",route="/metrics"}') == 1
+
+def test_metrics_need_the_internal_token(app):
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
@@ -0,0 +1,51 @@
+import io
+import json
+import pytest
+import utils
+from utils import content_sha256, parse_cache_stats, validate_openapi
+
+SPEC = {"openapi": "3.0.0", "info": {"title": "Acme", "version": "1.0.0"}, "paths": {}}
+
+@pytest.fixture(autouse=True)
+def empty_parse_cache(monkeypatch):
+    monkeypatch.setattr(utils, "_parse_cache", utils.OrderedDict())
+
+def yaml_spec(title="Acme"):
+    return f"openapi: 3.0.0\ninfo:\n  title: {title}\n  version: 1.0.0\npaths: {{}}\n".encode("utf-8")
+
+def test_repeated_uploads_are_served_from_the_cache():
+    hits, misses = parse_cache_stats["hits"], parse_cache_stats["misses"]
+
+    first = validate_openapi(yaml_spec(), ".yaml")
+    second = validate_openapi(io.BytesIO(yaml_spec()), ".yaml", sha256=content_sha256(yaml_spec()))
+
+    assert first == SPEC
+    assert second is first
+    assert (parse_cache_stats["hits"] - hits, parse_cache_stats["misses"] - misses) == (1, 1)
+
+def test_json_files_parse_to_the_same_spec():
+    assert validate_openapi(io.BytesIO(json.dumps(SPEC).encode("utf-8")), ".json") == SPEC
+
+def test_the_extension_is_part_of_the_key():
+    content = json.dumps(SPEC).encode("utf-8")
+    as_json = validate_openapi(content, ".json")
+    # JSON is also valid YAML, but it is parsed again rather than shared
+    assert validate_openapi(content, ".yaml") is not as_json
+
+def test_invalid_specs_are_not_cached():
+    with pytest.raises(ValueError, match="Invalid YAML"):
+        validate_openapi(b"openapi: [", ".yaml")
+    with pytest.raises(ValueError):
+        validate_openapi(b"openapi: 3.0.0\n", ".yaml")
+    assert len(utils._parse_cache) == 0
+
+def test_least_recently_used_specs_are_evicted(monkeypatch):
+    monkeypatch.setattr(utils, "SPEC_PARSE_CACHE_SIZE", 2)
+    first = validate_openapi(yaml_spec("First"), ".yaml")
+    validate_openapi(yaml_spec("Second"), ".yaml")
+    validate_openapi(yaml_spec("First"), ".yaml")
+    validate_openapi(yaml_spec("Third"), ".yaml")
+
+    assert utils.parse_cache_snapshot()["entries"] == 2
+    assert (content_sha256(yaml_spec("Second")), ".yaml") not in utils._parse_cache
+    assert validate_openapi(yaml_spec("First"), ".yaml") is first
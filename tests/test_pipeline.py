@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from pipeline import Step, StepSkipped, run_steps
+
+def test_independent_steps_run_concurrently():
+    running = []
+    peak = 0
+
+    async def work(name):
+        nonlocal peak
+        running.append(name)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(name)
+        return name
+
+    steps = [Step(name, lambda name=name: work(name)) for name in ("a", "b", "c")]
+    results, errors = asyncio.run(run_steps(steps))
+
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert errors == {}
+    assert peak == 3
+
+def test_dependency_results_are_passed_in_order():
+    async def value(v):
+        return v
+
+    async def combine(first, second):
+        return f"{first}+{second}"
+
+    results, _ = asyncio.run(run_steps([
+        Step("slow", lambda: asyncio.sleep(0.01, result="slow")),
+        Step("fast", lambda: value("fast")),
+        Step("combined", combine, depends_on=["fast", "slow"]),
+    ]))
+
+    assert results["combined"] == "fast+slow"
+
+def test_failure_skips_dependents_but_not_independent_steps():
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def ok(*args):
+        return "ok"
+
+    results, errors = asyncio.run(run_steps([
+        Step("broken", fail),
+        Step("independent", ok),
+        Step("child", ok, depends_on=["broken"]),
+        Step("grandchild", ok, depends_on=["child", "independent"]),
+    ]))
+
+    assert results == {"independent": "ok"}
+    assert isinstance(errors["broken"], RuntimeError)
+    assert isinstance(errors["child"], StepSkipped)
+    assert "broken" in str(errors["child"])
+    assert isinstance(errors["grandchild"], StepSkipped)
+    assert "child" in str(errors["grandchild"])
+
+def test_unknown_dependencies_are_rejected():
+    async def ok():
+        return "ok"
+
+    with pytest.raises(ValueError, match="missing"):
+        asyncio.run(run_steps([Step("a", ok, depends_on=["missing"])]))
@@ -0,0 +1,72 @@
+import asyncio
+import io
+import json
+import pytest
+import yaml
+import github_operations
+from fake_github import FakeGitHub
+
+SPEC = b"openapi: 3.0.0\ninfo:\n  title: Acme\n  version: 1.0.0\npaths: {}\n"
+
+def provision(fake, company_name="acme", progress=None):
+    return asyncio.run(github_operations.create_repo_from_template(
+        "provisioning-token", company_name, "openapi.yaml", io.BytesIO(SPEC), progress=progress
+    ))
+
+def test_git_data_mode_configures_the_repository_in_one_commit(github_api, monkeypatch):
+    monkeypatch.setattr(github_operations, "PROVISIONING_COMMIT_MODE", "git-data")
+    fake = FakeGitHub()
+    github_api(fake.handler)
+
+    html_url, _, full_name, installation_url = provision(fake)
+
+    assert full_name == "me/acme-config"
+    assert html_url == "https://github.com/me/acme-config"
+    assert fake.commit_count(full_name) == 1
+    assert fake.calls.count(("PATCH", f"/repos/{full_name}/git/refs/heads/main")) == 1
+    assert not any(method in ("PUT", "DELETE") for method, _ in fake.calls)
+
+    files = fake.files(full_name)
+    assert files["fern/openapi.yaml"] == SPEC
+    generators = yaml.safe_load(files["fern/generators.yml"])
+    assert generators["api"]["specs"][0]["openapi"] == "openapi.yaml"
+    assert "me/acme-python-sdk" in files["fern/generators.yml"].decode("utf-8")
+    assert json.loads(files["fern/fern.config.json"])["organization"].startswith("acme")
+
+    ids = [str(fake.repos[name]["id"]) for name in ("me/acme-config", "me/acme-python-sdk", "me/acme-typescript-sdk")]
+    assert installation_url.endswith("repository_ids=" + ",".join(ids))
+
+def test_contents_mode_writes_the_same_files(github_api, monkeypatch):
+    monkeypatch.setattr(github_operations, "PROVISIONING_COMMIT_MODE", "contents")
+    fake = FakeGitHub()
+    github_api(fake.handler)
+
+    _, _, full_name, _ = provision(fake)
+
+    files = fake.files(full_name)
+    assert files["fern/openapi.yaml"] == SPEC
+    assert "me/acme-typescript-sdk" in files["fern/generators.yml"].decode("utf-8")
+    assert fake.commit_count(full_name) == 0
+
+def test_sdk_repository_failure_keeps_the_config_repository(github_api):
+    fake = FakeGitHub()
+    fake.failures[r"^POST /user/repos$"] = 500
+    github_api(fake.handler)
+    steps = []
+
+    html_url, _, full_name, installation_url = provision(fake, progress=lambda step, message: steps.append(step))
+
+    assert full_name == "me/acme-config"
+    assert installation_url is None
+    assert "sdk_repos_failed" in steps
+    assert "installation_url_ready" not in steps
+    assert fake.files(full_name)["fern/openapi.yaml"] == SPEC
+
+def test_config_repository_failure_is_reported(github_api):
+    fake = FakeGitHub()
+    fake.add_repo("me/acme-config")
+    github_api(fake.handler)
+
+    with pytest.raises(ValueError, match="already exists"):
+        provision(fake)
+    assert ("POST", "/user/repos") not in fake.calls
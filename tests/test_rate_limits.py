@@ -0,0 +1,55 @@
+import time
+import httpx
+import pytest
+from rate_limits import RateLimitExceeded, RateLimitTracker, token_fingerprint
+
+def headers(remaining, limit=5000, reset_in=3600, resource="core"):
+    return httpx.Headers({"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(remaining),
+                          "X-RateLimit-Reset": str(int(time.time() + reset_in)), "X-RateLimit-Resource": resource})
+
+def test_budgets_are_tracked_per_token_and_resource():
+    tracker = RateLimitTracker()
+    tracker.record("token", headers(4000))
+    tracker.record("token", headers(900, limit=1000, resource="graphql"))
+    tracker.record("token", httpx.Headers({"X-RateLimit-Remaining": "not a number"}))
+
+    assert tracker.budget("token").remaining == 4000
+    assert tracker.budget("token", "graphql").remaining == 900
+    assert tracker.budget("other").updated_at == 0
+    assert all("token" not in entry["token"] for entry in tracker.snapshot())
+    assert tracker.snapshot()[0]["token"] == token_fingerprint("other")
+
+def test_reservations_hold_budget_until_released():
+    tracker = RateLimitTracker()
+    tracker.record("token", headers(100))
+
+    with tracker.reserve("token", 60) as first:
+        assert tracker.budget("token").available() == 40
+        with pytest.raises(RateLimitExceeded, match="60 requests needed, 40 available"):
+            tracker.reserve("token", 60)
+        first.consume(50)
+        # Requests already made show up in the next response's remaining count
+        tracker.record("token", headers(50))
+        assert tracker.budget("token").available() == 40
+        assert tracker.budget("token").available(excluding=first) == 50
+    assert tracker.budget("token").available() == 50
+    tracker.reserve("token", 50).release()
+
+def test_short_budgets_are_granted_when_the_reset_is_close():
+    tracker = RateLimitTracker()
+    tracker.record("token", headers(0, reset_in=5))
+    tracker.reserve("token", 10, max_wait=10).release()
+    with pytest.raises(RateLimitExceeded):
+        tracker.reserve("token", 10, max_wait=1)
+
+def test_unknown_and_reset_budgets_are_not_limited():
+    tracker = RateLimitTracker()
+    tracker.reserve("new-token", 10000).release()
+    tracker.record("token", headers(0, reset_in=-1))
+    assert tracker.budget("token").available() == 5000
+
+def test_least_recently_used_tokens_are_dropped():
+    tracker = RateLimitTracker(max_tokens=2)
+    for token in ("a", "b", "c"):
+        tracker.record(token, headers(10))
+    assert [entry["token"] for entry in tracker.snapshot()] == [token_fingerprint("c"), token_fingerprint("b")]
@@ -0,0 +1,44 @@
+import asyncio
+import io
+import pytest
+import github_operations
+from fake_github import FakeGitHub
+from readiness import ReadinessTimeout, readiness_stats, wait_until_ready
+
+def test_polls_until_the_probe_returns_a_value():
+    answers = [None, None, "ready"]
+
+    async def probe():
+        return answers.pop(0)
+
+    polls_before = readiness_stats["polls"]
+    value, waited = asyncio.run(wait_until_ready(probe, "test resource", deadline=5, initial_delay=0.01, max_delay=0.02))
+
+    assert value == "ready"
+    assert waited < 1
+    assert readiness_stats["polls"] - polls_before == 3
+
+def test_gives_up_at_the_deadline():
+    async def probe():
+        return None
+
+    timeouts_before = readiness_stats["timeouts"]
+    with pytest.raises(ReadinessTimeout) as raised:
+        asyncio.run(wait_until_ready(probe, "never ready", deadline=0.1, initial_delay=0.01, max_delay=0.02))
+
+    assert raised.value.polls > 1
+    assert 0.1 <= raised.value.waited < 1
+    assert readiness_stats["timeouts"] == timeouts_before + 1
+
+def test_provisioning_waits_for_the_template_copy(github_api):
+    fake = FakeGitHub()
+    fake.not_ready_polls = 2
+    github_api(fake.handler)
+
+    asyncio.run(github_operations.create_repo_from_template(
+        "readiness-token", "acme", "openapi.yaml", io.BytesIO(b"openapi: 3.0.0\n")
+    ))
+
+    ref_polls = [call for call in fake.calls if call == ("GET", "/repos/me/acme-config/git/ref/heads/main")]
+    assert len(ref_polls) == 3
+    assert fake.files("me/acme-config")["fern/openapi.yaml"] == b"openapi: 3.0.0\n"
@@ -0,0 +1,108 @@
+import asyncio
+import httpx
+from repo_cache import RepositoryCache
+
+def repo(id, name, admin=True):
+    return {"id": id, "name": name, "full_name": f"me/{name}", "description": None, "private": False,
+            "permissions": {"admin": admin, "maintain": admin, "push": True, "pull": True}}
+
+class FakeListing:
+    """/user/repos with ETags, answering 304 when the client's ETag is current."""
+
+    def __init__(self, repositories):
+        self.repositories = repositories
+        self.version = 1
+        self.requests = []
+        # Cleared to hold responses until a test lets them through
+        self.released = asyncio.Event()
+        self.released.set()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        # Answer with the listing as it was when the request arrived
+        etag, repositories = f'"v{self.version}"', self.repositories
+        await self.released.wait()
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=repositories, headers={"ETag": etag})
+
+    def add(self, repository):
+        self.repositories = self.repositories + [repository]
+        self.version += 1
+
+def names(entry):
+    return [repository.name for repository in entry.repositories]
+
+def test_expired_entries_are_revalidated_with_etags(github_api):
+    listing = FakeListing([repo(1, "acme-config"), repo(2, "not-mine", admin=False)])
+    github_api(listing.handler)
+    cache = RepositoryCache(ttl=0)
+
+    async def scenario():
+        first = await cache.get("me", "token")
+        assert names(first) == ["acme-config"]
+        # Unchanged: a 304, and the cached serialization is kept
+        second = await cache.get("me", "token")
+        assert second is first
+        assert listing.requests[1].headers["If-None-Match"] == '"v1"'
+        listing.add(repo(3, "acme-python-sdk"))
+        third = await cache.get("me", "token")
+        assert names(third) == ["acme-config", "acme-python-sdk"]
+
+    asyncio.run(scenario())
+    assert (cache.misses, cache.revalidations) == (1, 2)
+
+def test_fresh_entries_are_served_without_asking_github(github_api):
+    listing = FakeListing([repo(1, "acme-config")])
+    github_api(listing.handler)
+    cache = RepositoryCache(ttl=60)
+
+    async def scenario():
+        first = await cache.get("me", "token")
+        assert await cache.get("me", "token") is first
+        refreshed = await cache.get("me", "token", refresh=True)
+        assert refreshed is first
+
+    asyncio.run(scenario())
+    assert len(listing.requests) == 2
+    assert cache.hits == 1
+
+def test_refresh_running_across_an_invalidate_is_not_cached(github_api):
+    listing = FakeListing([repo(1, "acme-config")])
+    github_api(listing.handler)
+    cache = RepositoryCache(ttl=60)
+
+    async def scenario():
+        listing.released.clear()
+        refresh = asyncio.ensure_future(cache.get("me", "token"))
+        while not listing.requests:
+            await asyncio.sleep(0)
+        # /submit creates a repository and invalidates while the listing is in flight
+        listing.add(repo(2, "acme-python-sdk"))
+        cache.invalidate("me")
+        listing.released.set()
+        stale = await refresh
+        assert names(stale) == ["acme-config"]
+        assert cache.snapshot()["entries"] == 0
+
+        current = await cache.get("me", "token")
+        assert names(current) == ["acme-config", "acme-python-sdk"]
+        assert await cache.get("me", "token") is current
+
+    asyncio.run(scenario())
+    assert cache._refreshing == {}
+
+def test_invalidated_and_evicted_users_leave_nothing_behind(github_api):
+    listing = FakeListing([repo(1, "acme-config")])
+    github_api(listing.handler)
+    cache = RepositoryCache(ttl=60, max_entries=2)
+
+    async def scenario():
+        for login in ("a", "b", "c", "d"):
+            await cache.get(login, "token")
+            cache.invalidate("a")
+
+    asyncio.run(scenario())
+    assert cache.snapshot()["entries"] == 2
+    assert sorted(cache._locks) == ["c", "d"]
+    assert cache._refreshing == {}
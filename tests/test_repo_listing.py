@@ -0,0 +1,75 @@
+import asyncio
+import repo_cache
+from fake_github import FakeGitHub
+from github_client import GitHubClient
+from repo_cache import fetch_repositories, listing_stats
+
+def fake_with_repositories(count):
+    """The template plus count repositories, every third one without admin rights."""
+    fake = FakeGitHub()
+    for i in range(count):
+        fake.add_repo(f"me/repo-{i}", admin=i % 3 != 0)
+    return fake
+
+def admin_names(fake):
+    return [repo["full_name"] for repo in fake.repos.values() if repo["permissions"]["admin"]]
+
+def test_graphql_backend_follows_cursors_and_keeps_admin_repositories(github_api):
+    fake = fake_with_repositories(249)
+    github_api(fake.handler)
+    fetches_before = listing_stats["graphql"]["fetches"]
+
+    listing = asyncio.run(fetch_repositories(GitHubClient("listing-graphql"), backend="graphql"))
+
+    assert [repo.full_name for repo in listing.repositories] == admin_names(fake)
+    assert [page["number"] for page in listing.pages] == [1, 2, 3]
+    assert fake.calls.count(("POST", "/graphql")) == 3
+    assert listing_stats["graphql"]["fetches"] == fetches_before + 1
+    assert listing_stats["graphql"]["bytes"] > 0
+
+def test_graphql_and_rest_backends_list_the_same_repositories(github_api):
+    fake = fake_with_repositories(120)
+    github_api(fake.handler)
+    client = GitHubClient("listing-compare")
+
+    rest = asyncio.run(fetch_repositories(client, backend="rest"))
+    graphql = asyncio.run(fetch_repositories(client, backend="graphql"))
+
+    assert [repo.dict() for repo in graphql.repositories] == [repo.dict() for repo in rest.repositories]
+
+def test_rest_pages_after_the_first_are_fetched_concurrently(github_api, monkeypatch):
+    monkeypatch.setattr(repo_cache, "REPO_LISTING_CONCURRENCY", 3)
+    fake = fake_with_repositories(599)
+    in_flight, peak = 0, 0
+
+    async def slow_handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await fake.handler(request)
+
+    github_api(slow_handler)
+
+    listing = asyncio.run(fetch_repositories(GitHubClient("listing-parallel"), backend="rest"))
+
+    assert [page["number"] for page in listing.pages] == [1, 2, 3, 4, 5, 6]
+    assert [repo.full_name for repo in listing.repositories] == admin_names(fake)
+    assert peak == 3
+
+def test_unchanged_rest_pages_are_revalidated_and_reused(github_api):
+    fake = fake_with_repositories(199)
+    github_api(fake.handler)
+    client = GitHubClient("listing-etags")
+    first = asyncio.run(fetch_repositories(client, backend="rest"))
+
+    fake.add_repo("me/repo-new")
+    fake.calls.clear()
+    second = asyncio.run(fetch_repositories(client, previous=first, backend="rest"))
+
+    # Both full pages answer 304, and the first one's Link header reveals the new third page
+    assert second.pages[0]["repositories"] is first.pages[0]["repositories"]
+    assert second.pages[1]["repositories"] is first.pages[1]["repositories"]
+    assert [repo.full_name for repo in second.pages[2]["repositories"]] == ["me/repo-new"]
+    assert len(fake.calls) == 3
@@ -0,0 +1,114 @@
+import asyncio
+import time
+import httpx
+import github_operations
+from fake_github import FakeGitHub
+from github_client import GitHubAPIError, GitHubClient
+from rate_limits import RateLimitExceeded, rate_limit_tracker
+from scheduler import RateLimitedScheduler
+
+def budget_headers(remaining, reset_in=3600):
+    return httpx.Headers({"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": str(remaining),
+                          "X-RateLimit-Reset": str(int(time.time() + reset_in)), "X-RateLimit-Resource": "core"})
+
+class Calls:
+    """Calls that record how many of them run at once."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    def make(self, value, failures=()):
+        failures = list(failures)
+
+        async def call():
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                await asyncio.sleep(0.01)
+                if failures:
+                    raise failures.pop(0)
+                return value
+            finally:
+                self.running -= 1
+        return call
+
+def test_runs_calls_with_bounded_concurrency_in_input_order():
+    calls = Calls()
+    scheduler = RateLimitedScheduler(GitHubClient("scheduler-bounded"), max_concurrency=3)
+
+    results = asyncio.run(scheduler.run([calls.make(i) for i in range(10)]))
+
+    assert results == list(range(10))
+    assert calls.peak == 3
+
+def test_concurrency_shrinks_as_the_budget_runs_low():
+    rate_limit_tracker.record("scheduler-low", budget_headers(remaining=25))
+    calls = Calls()
+    scheduler = RateLimitedScheduler(GitHubClient("scheduler-low"), max_concurrency=8)
+
+    asyncio.run(scheduler.run([calls.make(i) for i in range(6)]))
+
+    assert calls.peak == 2
+
+def test_rate_limited_calls_are_retried_after_retry_after():
+    limited = GitHubAPIError(429, {"message": "secondary rate limit"}, httpx.Headers({"Retry-After": "0"}))
+    calls = Calls()
+    scheduler = RateLimitedScheduler(GitHubClient("scheduler-retry"), max_retries=1)
+
+    recovered, exhausted = asyncio.run(scheduler.run([
+        calls.make("added", failures=[limited]),
+        calls.make("never", failures=[limited, limited]),
+    ]))
+
+    assert recovered == "added"
+    assert exhausted is limited
+
+def test_other_errors_are_returned_without_retrying():
+    missing = GitHubAPIError(404, {"message": "Not Found"})
+    scheduler = RateLimitedScheduler(GitHubClient("scheduler-errors"))
+
+    results = asyncio.run(scheduler.run([Calls().make("unused", failures=[missing]), Calls().make("ok")]))
+
+    assert results == [missing, "ok"]
+
+def test_calls_fail_fast_when_the_budget_resets_too_late():
+    rate_limit_tracker.record("scheduler-empty", budget_headers(remaining=0))
+    scheduler = RateLimitedScheduler(GitHubClient("scheduler-empty"))
+
+    results = asyncio.run(scheduler.run([Calls().make("unused")]))
+
+    assert isinstance(results[0], RateLimitExceeded)
+
+def test_adding_users_reports_each_repository_and_user(github_api):
+    fake = FakeGitHub()
+    fake.add_repo("me/acme-config")
+    fake.add_repo("me/acme-python-sdk")
+    fake.failures[r"/collaborators/ghost$"] = 404
+    github_api(fake.handler)
+
+    results = asyncio.run(github_operations.add_users_to_repositories(
+        "scheduler-add-users", ["me/acme-config", "me/acme-python-sdk"], ["octocat", "ghost"]
+    ))
+
+    assert [(r.repository, r.username, r.success) for r in results] == [
+        ("me/acme-config", "octocat", True),
+        ("me/acme-config", "ghost", False),
+        ("me/acme-python-sdk", "octocat", True),
+        ("me/acme-python-sdk", "ghost", False),
+    ]
+    assert sorted(fake.collaborators) == [("me/acme-config", "octocat", "maintain"),
+                                          ("me/acme-python-sdk", "octocat", "maintain")]
+
+def test_adding_users_fails_every_pair_without_budget(github_api):
+    rate_limit_tracker.record("scheduler-no-budget", budget_headers(remaining=1))
+    fake = FakeGitHub()
+    github_api(fake.handler)
+
+    results = asyncio.run(github_operations.add_users_to_repositories(
+        "scheduler-no-budget", ["me/a", "me/b"], ["octocat"]
+    ))
+
+    assert not any(r.success for r in results)
+    assert "rate limit" in results[0].message
+    assert fake.calls == []
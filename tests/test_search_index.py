@@ -0,0 +1,49 @@
+from models import RepositoryInfo
+from search_index import RepositorySearchIndex
+
+PERMISSIONS = {"admin": True, "maintain": True, "push": True, "pull": True}
+
+def repository(id, name, description=None, owner="acme"):
+    return RepositoryInfo(id=id, name=name, full_name=f"{owner}/{name}", description=description,
+                          private=False, permissions=PERMISSIONS)
+
+REPOSITORIES = [
+    repository(1, "acme-python-sdk", "Python SDK"),
+    repository(2, "acme-config", "Fern configuration"),
+    repository(3, "widgets", "Storefront"),
+    repository(4, "sdk", None),
+    repository(5, "tools", "Internal scripts", owner="zeta"),
+]
+
+def names(results):
+    return [repo.name for repo in results]
+
+def test_one_and_two_character_queries_match_anywhere():
+    index = RepositorySearchIndex(REPOSITORIES)
+    total, results = index.search("e")
+    # Every repository with an "e" in its name, full name or description
+    assert total == 5
+    assert names(results)[:2] == ["acme-config", "acme-python-sdk"]
+    total, results = index.search("dg")
+    assert (total, names(results)) == (1, ["widgets"])
+    total, results = index.search("z")
+    assert (total, names(results)) == (1, ["tools"])
+
+def test_ranks_exact_then_prefix_then_word_prefix_then_substring():
+    index = RepositorySearchIndex(REPOSITORIES)
+    total, results = index.search("SDK ")
+    assert total == 2
+    assert names(results) == ["sdk", "acme-python-sdk"]
+    total, results = index.search("python-s")
+    assert names(results) == ["acme-python-sdk"]
+    total, results = index.search("storefront")
+    assert names(results) == ["widgets"]
+    assert index.search("nothing-like-this") == (0, [])
+
+def test_empty_query_pages_through_everything():
+    index = RepositorySearchIndex(REPOSITORIES)
+    total, first = index.search("", page=1, per_page=2)
+    _, last = index.search("", page=3, per_page=2)
+    assert total == 5
+    assert names(first) == ["acme-python-sdk", "acme-config"]
+    assert names(last) == ["tools"]
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import httpx
+from session_store import CookieSessionStore, SessionStore, TokenValidationCache
+
+USER = {"login": "octocat", "avatar_url": "https://avatars.example/octocat"}
+
+class AcceptAllTokens:
+    async def is_valid(self, access_token):
+        return True
+
+    def forget(self, access_token):
+        pass
+
+def cookie_store(keys, **options):
+    return CookieSessionStore(keys, validation=AcceptAllTokens(), **options)
+
+def read(store, cookie):
+    return asyncio.run(store.get(cookie))
+
+def test_cookie_session_round_trip():
+    store = cookie_store(["secret"])
+    cookie = store.create(USER, "token")
+    assert "token" not in cookie
+    assert read(store, cookie) == {**USER, "access_token": "token"}
+
+def test_rotated_keys_still_read_old_cookies_until_the_old_key_is_dropped():
+    old_cookie = cookie_store(["old"]).create(USER, "token")
+    rotated = cookie_store(["new", "old"])
+    assert read(rotated, old_cookie)["login"] == "octocat"
+    # New cookies are encrypted with the first key only
+    new_cookie = rotated.create(USER, "token")
+    assert read(cookie_store(["new"]), new_cookie)["login"] == "octocat"
+    assert read(cookie_store(["new"]), old_cookie) is None
+
+def test_expired_and_tampered_cookies_are_rejected(monkeypatch):
+    store = cookie_store(["secret"], absolute_ttl=60)
+    cookie = store.create(USER, "token")
+    assert read(store, cookie) is not None
+    assert read(store, cookie[:-4] + "AAAA") is None
+    assert read(store, "not-a-cookie") is None
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert read(store, cookie) is None
+
+def test_memory_sessions_expire_after_idle_ttl(monkeypatch):
+    store = SessionStore(idle_ttl=60, absolute_ttl=3600, validation=AcceptAllTokens())
+    session_id = store.create(USER, "token")
+    assert read(store, session_id)["login"] == "octocat"
+    later = time.monotonic() + 61
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert read(store, session_id) is None
+    assert len(store) == 0
+
+def test_memory_sessions_past_the_size_cap_evict_the_least_recently_used():
+    store = SessionStore(max_entries=2, validation=AcceptAllTokens())
+    first = store.create(USER, "token-1")
+    second = store.create(USER, "token-2")
+    read(store, first)
+    store.create(USER, "token-3")
+    assert len(store) == 2
+    assert read(store, first) is not None
+    assert read(store, second) is None
+
+def test_token_checks_are_cached_and_only_401_ends_a_session(github_api):
+    statuses = {"good": 200, "revoked": 401, "outage": 502}
+    checks = []
+
+    def handler(request):
+        token = request.headers["Authorization"].split()[-1]
+        checks.append(token)
+        return httpx.Response(statuses[token], json={"login": "octocat"})
+
+    github_api(handler)
+    store = SessionStore(validation=TokenValidationCache(revalidate_interval=60))
+    sessions = {token: store.create(USER, token) for token in statuses}
+
+    assert read(store, sessions["good"])["login"] == "octocat"
+    assert read(store, sessions["good"])["login"] == "octocat"
+    assert read(store, sessions["outage"])["login"] == "octocat"
+    assert read(store, sessions["revoked"]) is None
+    assert checks == ["good", "outage", "revoked"]
+    assert store.validation.revalidations == 3
+    assert len(store) == 2
@@ -0,0 +1,41 @@
+import yaml
+from spec_bundler import bundle_spec
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets": {"get": {"responses": {"200": {
+            "description": "The pets",
+            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}
+        }}}}
+    },
+    "components": {"schemas": {"Pet": {"type": "object"}}}
+}
+
+def test_unreachable_components_are_dropped():
+    spec = {**SPEC, "components": {"schemas": {
+        "Pet": {"type": "object"},
+        **{f"Unused{i}": {"type": "object", "properties": {"name": {"type": "string"}}} for i in range(20)}
+    }}}
+    original = yaml.dump(spec).encode("utf-8")
+    content, stats = bundle_spec(spec, ".yaml", len(original))
+    assert stats["minimized"] is True
+    assert stats["removed_components"] == {"schemas": 20}
+    assert stats["bundled_bytes"] == len(content) < len(original)
+    assert list(yaml.safe_load(content)["components"]["schemas"]) == ["Pet"]
+
+def test_spec_that_would_grow_is_left_as_uploaded():
+    # Compact flow-style YAML grows when re-serialized in block style
+    original = (
+        b"openapi: 3.0.3\n"
+        b"info: {title: Pets, version: '1'}\n"
+        b"paths: {/pets: {get: {responses: {'200': {description: The pets, content: {application/json: "
+        b"{schema: {$ref: '#/components/schemas/Pet'}}}}}}}}\n"
+        b"components: {schemas: {Pet: {type: object}}}\n"
+    )
+    content, stats = bundle_spec(yaml.safe_load(original), ".yaml", len(original))
+    assert content is None
+    assert stats["minimized"] is False
+    assert stats["bundled_bytes"] >= stats["original_bytes"]
+    assert stats["estimated_seconds_saved"] == 0.0
@@ -0,0 +1,112 @@
+import yaml
+from spec_diff import diff_specs, groups_to_regenerate
+
+SPEC = """
+openapi: 3.0.3
+info:
+  title: Pets
+  version: "1"
+paths:
+  /pets:
+    get:
+      x-fern-audiences: [public]
+      responses:
+        200:
+          description: The pets
+          content:
+            application/json:
+              schema:
+                $ref: "#/components/schemas/Pet"
+        default:
+          description: An error
+  /admin/pets:
+    delete:
+      x-fern-audiences: [internal]
+      responses:
+        204:
+          description: Deleted
+        default:
+          description: An error
+components:
+  schemas:
+    Pet:
+      type: object
+      properties:
+        name:
+          type: string
+"""
+
+GENERATORS_YML = """
+groups:
+  public-sdk:
+    audiences: [public]
+    generators: []
+  internal-sdk:
+    audiences: [internal]
+    generators: []
+  everything:
+    generators: []
+"""
+
+def load(text: str) -> dict:
+    return yaml.safe_load(text)
+
+def test_identical_specs_with_integer_response_codes_are_unchanged():
+    # YAML reads 200: as an int and default: as a str; hashing must not try to order them
+    diff = diff_specs(load(SPEC), load(SPEC))
+    assert diff["changed"] is False
+    assert diff["operations"] == {"added": [], "removed": [], "changed": []}
+
+def test_changed_response_with_integer_code_is_reported():
+    new = load(SPEC)
+    new["paths"]["/pets"]["get"]["responses"][200]["description"] = "All the pets"
+    diff = diff_specs(load(SPEC), new)
+    assert diff["operations"]["changed"] == ["GET /pets"]
+    assert diff["schemas"] == {"added": [], "removed": [], "changed": []}
+    assert diff["other"] == []
+
+def test_key_order_and_formatting_do_not_count_as_changes():
+    old = load(SPEC)
+    new = load(yaml.dump(old, sort_keys=True))
+    assert diff_specs(old, new)["changed"] is False
+
+def test_added_removed_and_changed_schemas_and_operations():
+    old, new = load(SPEC), load(SPEC)
+    del new["paths"]["/admin/pets"]
+    new["paths"]["/pets"]["post"] = {"responses": {201: {"description": "Created"}}}
+    new["components"]["schemas"]["Pet"]["properties"]["age"] = {"type": "integer"}
+    new["components"]["schemas"]["Owner"] = {"type": "object"}
+    diff = diff_specs(old, new)
+    assert diff["operations"] == {"added": ["POST /pets"], "removed": ["DELETE /admin/pets"], "changed": []}
+    assert diff["schemas"] == {"added": ["Owner"], "removed": [], "changed": ["Pet"]}
+    assert diff["changed"] is True
+
+def test_top_level_and_other_component_changes_go_to_other():
+    new = load(SPEC)
+    new["servers"] = [{"url": "https://api.example.com"}]
+    new["components"]["securitySchemes"] = {"token": {"type": "http", "scheme": "bearer"}}
+    diff = diff_specs(load(SPEC), new)
+    assert diff["other"] == ["components.securitySchemes", "servers"]
+    assert diff["changed"] is True
+
+def test_nothing_to_regenerate_when_unchanged():
+    old = load(SPEC)
+    assert groups_to_regenerate(GENERATORS_YML, old, old, diff_specs(old, old)) == []
+
+def test_operation_change_regenerates_only_groups_with_its_audience():
+    old, new = load(SPEC), load(SPEC)
+    new["paths"]["/admin/pets"]["delete"]["responses"][204]["description"] = "Gone"
+    groups = groups_to_regenerate(GENERATORS_YML, old, new, diff_specs(old, new))
+    assert groups == ["internal-sdk", "everything"]
+
+def test_removed_operation_uses_the_audiences_it_had():
+    old, new = load(SPEC), load(SPEC)
+    del new["paths"]["/pets"]
+    groups = groups_to_regenerate(GENERATORS_YML, old, new, diff_specs(old, new))
+    assert groups == ["public-sdk", "everything"]
+
+def test_schema_change_regenerates_every_group():
+    old, new = load(SPEC), load(SPEC)
+    new["components"]["schemas"]["Pet"]["required"] = ["name"]
+    groups = groups_to_regenerate(GENERATORS_YML, old, new, diff_specs(old, new))
+    assert groups == ["public-sdk", "internal-sdk", "everything"]
@@ -0,0 +1,81 @@
+import asyncio
+import io
+import pytest
+import github_operations
+from fake_github import FakeGitHub
+from spec_profiler import profile_spec
+
+def schema_ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets": {
+            "get": {"responses": {"200": {"description": "Pets", "content": {
+                "application/json": {"schema": {"type": "array", "items": schema_ref("Pet")}}
+            }}}},
+            "post": {"responses": {"201": {"description": "Created"}}},
+        },
+        "/owners/{id}": {
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "get": {"responses": {"200": {"description": "An owner", "content": {
+                "application/json": {"schema": schema_ref("Owner")}
+            }}}},
+        },
+    },
+    "components": {"schemas": {
+        "Pet": {"type": "object", "properties": {"owner": schema_ref("Owner"), "tag": schema_ref("Tag")}},
+        "Owner": {"type": "object", "properties": {"address": schema_ref("Address")}},
+        "Address": {"type": "object", "properties": {"city": {"type": "string"}}},
+        "Tag": {"type": "string"},
+        "Node": {"type": "object", "properties": {"children": {"type": "array", "items": schema_ref("Node")}}},
+    }},
+}
+
+def test_profile_counts_and_ref_structure():
+    profile = profile_spec(SPEC, spec_bytes=4096)
+
+    assert (profile.operations, profile.paths, profile.schemas, profile.components) == (3, 2, 5, 5)
+    assert profile.refs == 6
+    # /pets -> Pet -> Owner -> Address
+    assert profile.max_ref_depth == 3
+    assert profile.recursive_schemas == ["Node"]
+    assert (profile.largest_fanout_schema, profile.largest_fanout_refs) == ("Pet", 2)
+    assert profile.total_bytes == 4096
+    assert list(profile.section_bytes)[0] == "paths"
+    assert profile.queue == "standard"
+
+def test_long_and_recursive_ref_chains_are_measured_without_recursing():
+    schemas = {f"S{i}": {"type": "object", "properties": {"next": schema_ref(f"S{i + 1}")}} for i in range(5000)}
+    schemas["S5000"] = {"type": "object", "properties": {"first": schema_ref("S0")}}
+    spec = {**SPEC, "paths": {"/chain": {"get": {"responses": {"200": {"description": "Chain", "content": {
+        "application/json": {"schema": schema_ref("S0")}
+    }}}}}}, "components": {"schemas": schemas}}
+
+    profile = profile_spec(spec)
+
+    assert profile.max_ref_depth == 5001
+    assert len(profile.recursive_schemas) == 5001
+
+def test_unknown_size_uses_the_compact_json_size():
+    profile = profile_spec(SPEC)
+    assert profile.total_bytes == sum(profile.section_bytes.values())
+    assert profile.estimated_github_upload_bytes >= profile.total_bytes * 4 // 3
+
+@pytest.mark.parametrize("mode", ["git-data", "contents"])
+def test_api_call_estimate_matches_a_provisioning_run(github_api, monkeypatch, mode):
+    monkeypatch.setattr(github_operations, "PROVISIONING_COMMIT_MODE", mode)
+    fake = FakeGitHub()
+    github_api(fake.handler)
+
+    asyncio.run(github_operations.create_repo_from_template(
+        f"profiler-{mode}", "acme", "openapi.yaml", io.BytesIO(b"openapi: 3.0.0\n")
+    ))
+
+    polls = fake.calls.count(("GET", "/repos/me/acme-config/git/ref/heads/main"))
+    if mode == "contents":
+        # The check that the deleted default spec is gone
+        polls += 1
+    assert profile_spec(SPEC, commit_mode=mode).estimated_github_api_calls == len(fake.calls) - polls
@@ -0,0 +1,71 @@
+from spec_refs import MISSING, RefIndex, component_of, escape_pointer_token
+
+def test_escape_pointer_token():
+    assert escape_pointer_token("/pets/{id}") == "~1pets~1{id}"
+    assert escape_pointer_token("a~b") == "a~0b"
+    assert escape_pointer_token(200) == "200"
+
+def test_component_of():
+    assert component_of("#/components/schemas/Pet/properties/id") == "#/components/schemas/Pet"
+    assert component_of("#/components/schemas") is None
+    assert component_of("#/paths/~1pets/get") is None
+
+def test_resolve_follows_escaped_and_list_tokens():
+    spec = {
+        "paths": {"/pets": {"get": {"parameters": [{"name": "limit"}]}}},
+        "components": {"schemas": {"a~b": {"type": "string"}}}
+    }
+    index = RefIndex(spec)
+    assert index.resolve("#/paths/~1pets/get/parameters/0") == {"name": "limit"}
+    assert index.resolve("#/components/schemas/a~0b") == {"type": "string"}
+    assert index.resolve("#/components/schemas/a%7E0b") == {"type": "string"}
+    assert index.resolve("#/paths/~1pets/get/parameters/1") is MISSING
+    assert index.resolve("#/components/schemas/Pet") is MISSING
+
+def test_collects_local_and_external_refs_in_document_order():
+    spec = {"components": {"schemas": {
+        "A": {"$ref": "#/components/schemas/B"},
+        "B": {"type": "object", "properties": {"c": {"$ref": "#/components/schemas/C"}}},
+        "D": {"$ref": "other.yaml#/D"}
+    }}}
+    index = RefIndex(spec)
+    assert index.refs == [
+        ("#/components/schemas/A", "#/components/schemas/B"),
+        ("#/components/schemas/B/properties/c", "#/components/schemas/C"),
+    ]
+    assert index.external_refs == [("#/components/schemas/D", "other.yaml#/D")]
+    assert index.dangling_refs() == [("#/components/schemas/B/properties/c", "#/components/schemas/C")]
+
+def test_alias_cycles_only_report_refs_that_never_reach_a_definition():
+    spec = {"components": {"schemas": {
+        "A": {"$ref": "#/components/schemas/B"},
+        "B": {"$ref": "#/components/schemas/A"},
+        "C": {"$ref": "#/components/schemas/A"},
+        "D": {"$ref": "#/components/schemas/E"},
+        "E": {"type": "string"}
+    }}}
+    cycles = RefIndex(spec).alias_cycles()
+    assert len(cycles) == 1
+    assert sorted(cycles[0]) == ["#/components/schemas/A", "#/components/schemas/B"]
+
+def test_recursive_components():
+    spec = {
+        "paths": {"/trees": {"get": {"responses": {"200": {"$ref": "#/components/responses/Tree"}}}}},
+        "components": {
+            "responses": {"Tree": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Tree"}}}}},
+            "schemas": {
+                # Self-recursive
+                "Tree": {"type": "object", "properties": {"children": {
+                    "type": "array", "items": {"$ref": "#/components/schemas/Tree"}}}},
+                # Mutually recursive, one edge only through a discriminator mapping
+                "Node": {"properties": {"edge": {"$ref": "#/components/schemas/Edge"}}},
+                "Edge": {"discriminator": {"propertyName": "kind", "mapping": {"node": "Node"}}},
+                # Refers to a recursive component without being part of the cycle
+                "Forest": {"items": {"$ref": "#/components/schemas/Tree"}},
+                "Leaf": {"type": "string"}
+            }
+        }
+    }
+    assert RefIndex(spec).recursive_components() == {
+        "#/components/schemas/Tree", "#/components/schemas/Node", "#/components/schemas/Edge"
+    }
@@ -0,0 +1,86 @@
+import copy
+import pickle
+import pytest
+from spec_validator import SpecValidationError, validate_spec, MAX_REPORTED_ISSUES
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets/{petId}": {
+            "parameters": [{"$ref": "#/components/parameters/PetId"}],
+            "get": {
+                "operationId": "getPet",
+                "responses": {"200": {
+                    "description": "A pet",
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}
+                }}
+            }
+        }
+    },
+    "components": {
+        "schemas": {"Pet": {"type": "object", "properties": {"id": {"type": "string"}}}},
+        "parameters": {"PetId": {"name": "petId", "in": "path", "required": True, "schema": {"type": "string"}}}
+    }
+}
+
+def spec_with(**changes):
+    spec = copy.deepcopy(SPEC)
+    spec.update(changes)
+    return spec
+
+def test_valid_spec_has_no_issues():
+    assert validate_spec(SPEC) == []
+
+def test_rejects_documents_that_are_not_openapi_3():
+    assert validate_spec([]) == ["#: an OpenAPI document must be an object"]
+    assert validate_spec({"swagger": "2.0"})[0].startswith("#/swagger:")
+    assert validate_spec(spec_with(openapi="2.0"))[0].startswith("#/openapi:")
+
+def test_reports_missing_fields_and_wrong_types_by_pointer():
+    spec = spec_with(info={"title": 3})
+    assert validate_spec(spec) == [
+        "#/info: missing required field 'version'",
+        "#/info/title: must be a string",
+    ]
+
+def test_path_parameters_must_be_declared():
+    spec = copy.deepcopy(SPEC)
+    del spec["paths"]["/pets/{petId}"]["parameters"]
+    assert validate_spec(spec) == ["#/paths/~1pets~1{petId}/get: path parameter 'petId' is not declared"]
+
+def test_duplicate_operation_ids():
+    spec = copy.deepcopy(SPEC)
+    spec["paths"]["/pets"] = {"get": {"operationId": "getPet", "responses": {"200": {"description": "Pets"}}}}
+    assert validate_spec(spec) == [
+        "#/paths/~1pets/get/operationId: 'getPet' is also used by #/paths/~1pets~1{petId}/get"
+    ]
+
+def test_responses_are_optional_only_in_3_1():
+    spec = copy.deepcopy(SPEC)
+    del spec["paths"]["/pets/{petId}"]["get"]["responses"]
+    assert validate_spec(spec) == ["#/paths/~1pets~1{petId}/get: missing required field 'responses'"]
+    spec["openapi"] = "3.1.0"
+    assert validate_spec(spec) == []
+
+def test_dangling_and_external_refs():
+    spec = copy.deepcopy(SPEC)
+    schema = spec["paths"]["/pets/{petId}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    schema["$ref"] = "#/components/schemas/Missing"
+    spec["components"]["schemas"]["Owner"] = {"$ref": "owner.yaml#/Owner"}
+    assert validate_spec(spec) == [
+        "#/paths/~1pets~1{petId}/get/responses/200/content/application~1json/schema: "
+        "$ref '#/components/schemas/Missing' does not resolve",
+        "#/components/schemas/Owner: $ref 'owner.yaml#/Owner' points at another file, "
+        "which a single uploaded spec can't include",
+    ]
+
+def test_validation_error_lists_the_first_issues_and_survives_pickling():
+    issues = [f"#/paths/{i}: problem" for i in range(MAX_REPORTED_ISSUES + 3)]
+    error = SpecValidationError(issues)
+    assert str(error).endswith("(and 3 more)")
+    copied = pickle.loads(pickle.dumps(error))
+    assert isinstance(copied, ValueError)
+    assert copied.issues == issues
+    with pytest.raises(ValueError, match="13 problem"):
+        raise copied
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+import pytest
+import spec_workers
+from spec_workers import offload_stats, run_spec_task
+
+LARGE = spec_workers.SPEC_OFFLOAD_THRESHOLD
+
+# Tasks are sent to the workers by name, so they live at module level
+def add(a, b):
+    return a + b
+
+def worker_pid():
+    return os.getpid()
+
+def spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+    return "finished"
+
+def crash():
+    os._exit(1)
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    """One pool for the module: starting a pool while another is still shutting down is slow and flaky."""
+    yield
+    spec_workers.shutdown_executor()
+
+def run(func, *args, size=LARGE, **options):
+    return asyncio.run(run_spec_task(func, *args, size=size, **options))
+
+def test_small_specs_are_handled_inline():
+    inline = offload_stats["inline"]
+    assert run(worker_pid, size=LARGE - 1) == os.getpid()
+    assert offload_stats["inline"] == inline + 1
+
+def test_large_specs_are_handled_in_the_pool():
+    offloaded = offload_stats["offloaded"]
+    assert run(add, 2, 3) == 5
+    assert run(worker_pid) != os.getpid()
+    assert offload_stats["offloaded"] == offloaded + 2
+
+def test_runaway_tasks_time_out_and_the_pool_is_kept():
+    run(add, 1, 1)
+    pool = spec_workers._executor
+    timeouts = offload_stats["timeouts"]
+
+    with pytest.raises(ValueError, match="longer than 0.2 seconds"):
+        run(spin, 30, timeout=0.2)
+
+    assert offload_stats["timeouts"] == timeouts + 1
+    assert spec_workers._executor is pool
+    assert run(add, 2, 2) == 4
+
+def test_crashed_workers_get_their_pool_discarded():
+    run(add, 1, 1)
+    crashes = offload_stats["crashes"]
+
+    with pytest.raises(ValueError, match="could not be processed"):
+        run(crash)
+
+    assert offload_stats["crashes"] == crashes + 1
+    # The next large spec starts a new pool
+    assert spec_workers._executor is None
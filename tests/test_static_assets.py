@@ -0,0 +1,64 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import routes
+import static_assets
+from static_assets import IMMUTABLE_CACHE_CONTROL, asset_url, assets
+from templates import get_main_template
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(routes.router)
+    app.include_router(static_assets.router)
+    return TestClient(app)
+
+def test_assets_are_served_under_content_hashed_names(client):
+    url = asset_url("main.js")
+    assert url.startswith("/static/main.") and url.endswith(".js") and url != "/static/main.js"
+
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.content == (static_assets.STATIC_DIR / "main.js").read_bytes()
+    assert response.headers["content-type"] == "application/javascript; charset=utf-8"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["etag"] == assets["main.js"].etag
+    assert client.get("/static/main.js").status_code == 404
+
+def test_revalidation_with_the_etag_gets_a_304(client):
+    url = asset_url("main.css")
+    etag = client.get(url, headers={"Accept-Encoding": "identity"}).headers["etag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+    assert client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": '"other"'}).status_code == 200
+
+def test_compressed_variants_have_their_own_etag(client):
+    url = asset_url("main.js")
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == assets["main.js"].etag[:-1] + '-gzip"'
+    assert response.content == assets["main.js"].content
+    assert len(assets["main.js"].variants.get("gzip")) < len(assets["main.js"].content)
+    cached = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    # The identity ETag doesn't validate the compressed copy
+    assert client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": assets["main.js"].etag}).status_code == 200
+
+def test_the_main_page_links_the_hashed_assets():
+    page = get_main_template("octocat", "https://avatars.example/octocat")
+    assert asset_url("main.css") in page
+    assert asset_url("main.js") in page
+
+def test_pages_are_revalidated_with_etags(client):
+    page = client.get("/", headers={"Accept-Encoding": "identity"})
+
+    assert page.headers["cache-control"] == "private, no-cache"
+    revalidated = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": page.headers["etag"]})
+    assert revalidated.status_code == 304
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import tracing
+from jobs import Job, MemoryJobStore
+from tracing import TracingMiddleware, recent_traces, span, start_trace
+
+@pytest.fixture(autouse=True)
+def empty_trace_buffer(monkeypatch):
+    monkeypatch.setattr(tracing, "completed_traces", tracing.deque(maxlen=10))
+
+def test_spans_nest_and_record_errors():
+    with start_trace("provision", trace_id="trace-1") as trace:
+        with span("create_repo", "step", repo="acme-config") as step:
+            with span("POST /user/repos", "github") as call:
+                call.status = "201"
+        with pytest.raises(ValueError):
+            with span("write_config", "step"):
+                raise ValueError("Template is missing fern/generators.yml")
+
+    spans = {s.name: s for s in trace.spans}
+    assert spans["POST /user/repos"].parent_id == step.span_id
+    assert spans["create_repo"].parent_id is None
+    assert spans["create_repo"].attributes == {"repo": "acme-config"}
+    assert (spans["POST /user/repos"].status, spans["create_repo"].status) == ("201", "ok")
+    assert spans["write_config"].status == "error"
+    assert spans["write_config"].attributes["error"] == "ValueError"
+    assert all(s.duration is not None for s in trace.spans)
+
+def test_spans_outside_a_trace_are_not_kept():
+    with span("orphan", "step"):
+        pass
+    assert recent_traces() == []
+
+def test_recent_traces_are_newest_first_and_filterable():
+    for trace_id in ("a", "b", "a"):
+        with start_trace("request", trace_id=trace_id):
+            pass
+    with start_trace("quiet", keep_empty=False):
+        pass
+
+    assert [t["trace_id"] for t in recent_traces()] == ["a", "b", "a"]
+    assert [t["trace_id"] for t in recent_traces(limit=1)] == ["a"]
+    assert len(recent_traces(trace_id="a")) == 2
+
+def test_requests_are_traced_under_their_request_id():
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/jobs/{job_id}")
+    async def job(job_id: str):
+        with span("load_job", "store"):
+            return {"id": job_id}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/jobs/1", headers={"X-Request-ID": "req-42"}).headers["x-trace-id"] == "req-42"
+    generated = client.get("/jobs/2", headers={"X-Request-ID": "not valid!"}).headers["x-trace-id"]
+    assert generated != "not valid!" and len(generated) == 32
+    client.get("/health")
+
+    traces = recent_traces()
+    assert [t["trace_id"] for t in traces] == [generated, "req-42"]
+    assert traces[1]["name"] == "GET /jobs/{job_id}"
+    assert traces[1]["spans"][0]["name"] == "load_job"
+
+def test_jobs_are_traced_under_the_submitting_request():
+    async def provision(progress):
+        with span("create_repo", "step"):
+            return {}
+
+    with start_trace("POST /submit", trace_id="req-7"):
+        job = Job("me", "acme", provision, MemoryJobStore())
+    asyncio.run(job.execute())
+
+    job_trace = recent_traces(trace_id="req-7")[0]
+    assert job_trace["name"] == "job acme"
+    assert [s["name"] for s in job_trace["spans"]] == ["create_repo"]
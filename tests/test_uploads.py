@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+import pytest
+import uploads
+from uploads import FORM_OVERHEAD, SpooledUpload, read_spec_form
+
+BOUNDARY = "spec-boundary"
+
+def multipart(fields, filename, content):
+    parts = [f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+             for name, value in fields.items()]
+    parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="openapi_spec"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode("utf-8") + content + b"\r\n")
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode("utf-8")
+
+class StreamedRequest:
+    """Just the parts of a Request read_spec_form uses, recording how much of the body was read."""
+
+    def __init__(self, body, chunk_size=1024, content_length=True):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if content_length:
+            self.headers["content-length"] = str(len(body))
+        self.body = body
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            chunk = self.body[start:start + self.chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+def read(request, **options):
+    return asyncio.run(read_spec_form(request, **options))
+
+def test_small_uploads_stay_in_memory_and_large_ones_spill_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_MEMORY", 10)
+    monkeypatch.setattr(uploads, "UPLOADS_DIR", str(tmp_path))
+    with SpooledUpload("small.yaml") as small:
+        small.write(b"0123456789")
+        small.finish()
+        assert small.path is None
+
+    with SpooledUpload("large.yaml") as large:
+        large.write(b"0123456789")
+        large.write(b"abc")
+        large.finish()
+        assert os.path.dirname(large.path) == str(tmp_path)
+        assert large.open().read() == b"0123456789abc"
+        assert large.size == 13
+        assert large.sha256 == hashlib.sha256(b"0123456789abc").hexdigest()
+        assert large.git_blob_sha() == hashlib.sha1(b"blob 13\0" + b"0123456789abc").hexdigest()
+    assert not os.path.exists(large.path)
+
+def test_spool_rejects_writes_past_the_size_limit():
+    with SpooledUpload("spec.yaml", max_size=10) as spool:
+        spool.write(b"0123456789")
+        with pytest.raises(ValueError, match="too large"):
+            spool.write(b"x")
+
+def test_form_fields_and_spec_are_read_from_the_stream():
+    request = StreamedRequest(multipart({"company_name": "acme", "minimize_spec": "on"}, "openapi.yaml", b"openapi: 3.0.0\n"),
+                              chunk_size=7)
+
+    fields, spool = read(request)
+
+    assert fields == {"company_name": "acme", "minimize_spec": "on"}
+    with spool:
+        assert spool.filename == "openapi.yaml"
+        assert spool.open().read() == b"openapi: 3.0.0\n"
+
+def test_oversized_content_length_is_rejected_before_reading():
+    request = StreamedRequest(multipart({}, "openapi.yaml", b"x" * (FORM_OVERHEAD + 2048)))
+
+    with pytest.raises(ValueError, match="too large"):
+        read(request, max_size=1024)
+    assert request.bytes_read == 0
+
+def test_oversized_stream_is_cut_off_once_the_spec_passes_the_limit():
+    request = StreamedRequest(multipart({}, "openapi.yaml", b"x" * 100_000), content_length=False)
+
+    with pytest.raises(ValueError, match="too large"):
+        read(request, max_size=10_000)
+    assert request.bytes_read <= 10_000 + 2 * request.chunk_size
+
+def test_oversized_form_fields_are_cut_off():
+    body = multipart({"company_name": "x" * (FORM_OVERHEAD + 10_000)}, "openapi.yaml", b"openapi: 3.0.0\n")
+    request = StreamedRequest(body, content_length=False)
+
+    with pytest.raises(ValueError, match="too large"):
+        read(request)
+    assert request.bytes_read < len(body)
+
+def test_unsupported_file_types_are_rejected_from_the_part_headers():
+    request = StreamedRequest(multipart({}, "spec.exe", b"x" * 100_000))
+
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        read(request)
+    assert request.bytes_read < 2 * request.chunk_size
@@ -0,0 +1,190 @@
+import json
+import queue
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import TRACE_BUFFER_SIZE, TRACE_EXPORT_PATH
+from metrics import route_template
+
+# Trace IDs accepted from an incoming X-Request-ID header
+TRACE_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+class Span:
+    """One timed unit of work within a trace: a pipeline step, a GitHub call, a wait."""
+
+    __slots__ = ("span_id", "parent_id", "name", "kind", "started_at", "duration", "status", "attempts",
+                 "attributes", "_started")
+
+    def __init__(self, name: str, kind: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        # Left None until the work ends unless set by the caller, e.g. to an HTTP status
+        self.status: Optional[str] = None
+        self.attempts = 1
+        self.attributes = attributes
+        self._started = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "status": self.status,
+            "attempts": self.attempts,
+            "attributes": self.attributes
+        }
+
+class Trace:
+    """The spans recorded while handling one request or running one job."""
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.spans: List[Span] = []
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self._started = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "status": self.status,
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# Completed traces, oldest first
+completed_traces: Deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+
+_export_queue: "Optional[queue.SimpleQueue[str]]" = None
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+def current_span_name() -> Optional[str]:
+    current = _current_span.get()
+    return current.name if current is not None else None
+
+def _export_worker(path: str, lines: "queue.SimpleQueue[str]"):
+    with open(path, "a", encoding="utf-8") as file:
+        while True:
+            file.write(lines.get())
+            file.flush()
+
+def _export(trace: Trace):
+    """Queue a trace for the export thread, which does the file I/O off the event loop."""
+    global _export_queue
+    if _export_queue is None:
+        _export_queue = queue.SimpleQueue()
+        threading.Thread(target=_export_worker, args=(TRACE_EXPORT_PATH, _export_queue),
+                         name="trace-export", daemon=True).start()
+    _export_queue.put(json.dumps(trace.to_dict(), default=str) + "\n")
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None, keep_empty: bool = True) -> Iterator[Trace]:
+    """Collect the spans of the enclosed work into a new trace.
+
+    When the work ends the trace goes into completed_traces (and to
+    TRACE_EXPORT_PATH if set), unless it has no spans and keep_empty is False.
+    """
+    trace = Trace(trace_id or new_trace_id(), name)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    except BaseException:
+        trace.status = "error"
+        raise
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        trace.duration = time.perf_counter() - trace._started
+        if trace.spans or keep_empty:
+            completed_traces.append(trace)
+            if TRACE_EXPORT_PATH:
+                _export(trace)
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[Span]:
+    """Time the enclosed work as a child of the current span.
+
+    Outside a trace the span is timed but not kept. An exception marks the
+    span "error" unless the caller already set its status.
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    current = Span(name, kind, parent.span_id if parent is not None else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        if current.status is None:
+            current.status = "error"
+        current.attributes.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.duration = time.perf_counter() - current._started
+        if current.status is None:
+            current.status = "ok"
+        if trace is not None:
+            trace.spans.append(current)
+
+def recent_traces(limit: int = 50, trace_id: Optional[str] = None) -> List[dict]:
+    """Completed traces, newest first, optionally only those with one trace ID."""
+    traces = []
+    for trace in reversed(completed_traces):
+        if trace_id is None or trace.trace_id == trace_id:
+            traces.append(trace.to_dict())
+            if len(traces) >= limit:
+                break
+    return traces
+
+class TracingMiddleware:
+    """Trace every HTTP request under its X-Request-ID, or a new ID, returned as X-Trace-ID.
+
+    Requests that record no spans (static files, health checks) are not kept.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested_id = Headers(scope=scope).get("x-request-id", "")
+        trace_id = requested_id if TRACE_ID_PATTERN.match(requested_id) else new_trace_id()
+
+        async def send_with_trace_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Trace-ID"] = trace_id
+            await send(message)
+
+        with start_trace(f"{scope['method']} {route_template(scope)}", trace_id, keep_empty=False):
+            await self.app(scope, receive, send_with_trace_id)
@@ -0,0 +1,199 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import BinaryIO, Dict, Optional, Tuple
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+from config import UPLOADS_DIR, MAX_SPEC_SIZE, UPLOAD_SPOOL_MEMORY, UPLOAD_CHUNK_SIZE
+from tracing import span
+from utils import get_file_extension, validate_openapi_async
+
+SPEC_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# Room for the other form fields and the multipart framing on top of the spec
+FORM_OVERHEAD = 64 * 1024
+
+def too_large_message(max_size: int) -> str:
+    return f"File is too large. The maximum size is {max_size // (1024 * 1024)} MB."
+
+class SpooledUpload:
+    """An uploaded file written chunk by chunk into a size-limited spool.
+
+    Small uploads stay in memory; past UPLOAD_SPOOL_MEMORY the spool moves to
+    a named temporary file in UPLOADS_DIR, whose path the spec worker pool
+    opens instead of being sent the content. The SHA-256 and size are
+    computed while writing. The spool outlives the request, so whoever ends
+    up owning it must close it.
+    """
+
+    def __init__(self, filename: str, max_size: int = MAX_SPEC_SIZE):
+        self.filename = filename
+        self.max_size = max_size
+        self.file: BinaryIO = io.BytesIO()
+        # Set once the spool is on disk
+        self.path: Optional[str] = None
+        self.size = 0
+        self.sha256 = ""
+        self._digest = hashlib.sha256()
+
+    def write(self, chunk: bytes):
+        """Append a chunk, raising ValueError once the upload exceeds max_size bytes."""
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise ValueError(too_large_message(self.max_size))
+        self._digest.update(chunk)
+        if self.path is None and self.size > UPLOAD_SPOOL_MEMORY:
+            spooled = tempfile.NamedTemporaryFile(dir=UPLOADS_DIR, prefix="spec-")
+            spooled.write(self.file.getvalue())
+            self.file, self.path = spooled, os.path.abspath(spooled.name)
+        self.file.write(chunk)
+
+    def finish(self):
+        """Mark the upload complete: fix its SHA-256 and make the spool readable from the start."""
+        self.sha256 = self._digest.hexdigest()
+        self.file.flush()
+        self.file.seek(0)
+
+    def open(self) -> BinaryIO:
+        """The spooled content, rewound to the start."""
+        self.file.seek(0)
+        return self.file
+
+    def git_blob_sha(self) -> str:
+        """The SHA-1 git gives this content as a blob, to compare with tree entries without downloading them."""
+        digest = hashlib.sha1(b"blob %d\0" % self.size)
+        file = self.open()
+        while chunk := file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+        file.seek(0)
+        return digest.hexdigest()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+async def read_spec_form(request: Request, file_field: str = "openapi_spec",
+                         max_size: int = MAX_SPEC_SIZE) -> Tuple[Dict[str, str], Optional[SpooledUpload]]:
+    """Stream a multipart form into its text fields and a spool for the spec file.
+
+    The body is parsed as it arrives rather than through FastAPI's form
+    parameters, which would receive the whole upload before any handler
+    runs. An oversized upload is rejected from its Content-Length before
+    anything is read, or as soon as the bytes received pass the limit; an
+    unsupported file type as soon as its part headers arrive. Returns the
+    text fields and the spool, or None if no file was sent in file_field.
+    """
+    limit = max_size + FORM_OVERHEAD
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise ValueError(too_large_message(max_size))
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise ValueError("Expected a multipart/form-data upload.")
+
+    fields: Dict[str, str] = {}
+    spool: Optional[SpooledUpload] = None
+    part: Dict[str, object] = {}
+    header_name, header_value = bytearray(), bytearray()
+    field_bytes = 0
+
+    def on_part_begin():
+        part.clear()
+        part.update(disposition=b"", data=bytearray(), target=None)
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_name.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        if bytes(header_name).lower() == b"content-disposition":
+            part["disposition"] = bytes(header_value)
+        header_name.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        nonlocal spool
+        _, options = parse_options_header(part["disposition"])
+        part["name"] = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            return
+        filename = options[b"filename"].decode("utf-8", "replace")
+        if part["name"] != file_field or spool is not None:
+            part["target"] = "discard"
+            return
+        if get_file_extension(filename) not in SPEC_EXTENSIONS:
+            raise ValueError("Unsupported file type. Please upload a JSON or YAML file.")
+        spool = SpooledUpload(filename, max_size)
+        part["target"] = spool
+
+    def on_part_data(data: bytes, start: int, end: int):
+        nonlocal field_bytes
+        target = part["target"]
+        if isinstance(target, SpooledUpload):
+            target.write(data[start:end])
+        elif target is None:
+            field_bytes += end - start
+            if field_bytes > FORM_OVERHEAD:
+                raise ValueError("The form fields are too large.")
+            part["data"].extend(data[start:end])
+
+    def on_part_end():
+        if part["target"] is None:
+            fields[part["name"]] = part["data"].decode("utf-8", "replace")
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise ValueError(too_large_message(max_size))
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        raise
+    if spool is not None:
+        spool.finish()
+    return fields, spool
+
+def form_flag(fields: Dict[str, str], name: str) -> bool:
+    """A checkbox form field, true for the values FastAPI accepts as true for bool parameters."""
+    return fields.get(name, "").strip().lower() in ("1", "true", "on", "yes")
+
+async def receive_spec(request: Request) -> Tuple[Dict[str, str], SpooledUpload, dict]:
+    """Stream an upload form's OpenAPI spec into a spool and validate it from the spool.
+
+    Returns the form's text fields, the spool, which the caller must close,
+    and the parsed spec. Raises ValueError for missing, unsupported,
+    oversized or invalid specs.
+    """
+    with span("receive_spec", "spec") as receive:
+        fields, spec = await read_spec_form(request)
+        if spec is None:
+            raise ValueError("Please upload an OpenAPI spec.")
+        receive.attributes["bytes"] = spec.size
+        try:
+            spec_data = await validate_openapi_async(spec.open(), get_file_extension(spec.filename), spec.size,
+                                                     sha256=spec.sha256, path=spec.path)
+        except BaseException:
+            spec.close()
+            raise
+    return fields, spec, spec_data
@@ -1,19 +1,125 @@
+import hashlib
 import json
 import yaml
+from collections import OrderedDict
 from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+from config import SPEC_PARSE_CACHE_SIZE, SPEC_OFFLOAD_THRESHOLD
+from spec_validator import validate_spec, SpecValidationError
+from spec_workers import run_spec_task
 
-def validate_openapi(content: bytes, file_extension: str) -> dict:
-    """Validate and parse OpenAPI content based on file extension."""
+# libyaml's C loader is many times faster than the pure-Python one; not every
+# PyYAML build has it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# orjson is optional; its decode errors subclass json.JSONDecodeError
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parsed specs by (SHA-256 of the content, file extension), least recently used first
+_parse_cache: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+
+parse_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+def content_sha256(content: Union[bytes, BinaryIO]) -> str:
+    """SHA-256 of bytes or of a binary file, read in chunks from the start."""
+    if isinstance(content, bytes):
+        return hashlib.sha256(content).hexdigest()
+    digest = hashlib.sha256()
+    content.seek(0)
+    while chunk := content.read(64 * 1024):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+def _parse(content: Union[bytes, BinaryIO], file_extension: str) -> dict:
+    """Parse spec content, raising ValueError for invalid or unsupported files."""
     try:
         if file_extension in ['.json']:
-            return json.loads(content)
+            if orjson is not None:
+                return orjson.loads(content if isinstance(content, bytes) else content.read())
+            return json.loads(content) if isinstance(content, bytes) else json.load(content)
         elif file_extension in ['.yaml', '.yml']:
-            return yaml.safe_load(content)
+            return yaml.load(content, Loader=YAML_LOADER)
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
     except (json.JSONDecodeError, yaml.YAMLError) as e:
         raise ValueError(f"Invalid {file_extension[1:].upper()} file: {str(e)}")
 
+def parse_spec(content: Union[bytes, BinaryIO], file_extension: str) -> dict:
+    """Parse spec content without validating it, e.g. a spec already committed to a repository."""
+    return _parse(content, file_extension)
+
+def _parse_and_validate(content: Union[bytes, BinaryIO], file_extension: str) -> dict:
+    """Parse spec content and check its OpenAPI structure, raising ValueError on either failure."""
+    parsed = _parse(content, file_extension)
+    issues = validate_spec(parsed)
+    if issues:
+        raise SpecValidationError(issues)
+    return parsed
+
+def parse_cache_snapshot() -> Dict[str, int]:
+    """parse_cache_stats with the number of specs currently cached."""
+    return {**parse_cache_stats, "entries": len(_parse_cache)}
+
+def _cached_spec(key: Tuple[str, str]) -> Optional[dict]:
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        _parse_cache.move_to_end(key)
+        parse_cache_stats["hits"] += 1
+    return cached
+
+def _cache_spec(key: Tuple[str, str], parsed: dict):
+    parse_cache_stats["misses"] += 1
+    _parse_cache[key] = parsed
+    while len(_parse_cache) > SPEC_PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+
+def validate_openapi(content: Union[bytes, BinaryIO], file_extension: str, sha256: Optional[str] = None) -> dict:
+    """Parse OpenAPI content based on file extension and validate its structure.
+
+    content may be bytes or a binary file, which is parsed without reading it
+    into a separate copy first. Raises ValueError (SpecValidationError for
+    structural problems) if the spec is invalid. Valid specs are cached by the
+    content's SHA-256 (pass it if already known), so re-uploading a spec skips
+    parsing and validation. The returned dict may be shared with other callers
+    and must not be modified.
+    """
+    key = (sha256 or content_sha256(content), file_extension)
+    parsed = _cached_spec(key)
+    if parsed is None:
+        parsed = _parse_and_validate(content, file_extension)
+        _cache_spec(key, parsed)
+    return parsed
+
+def _parse_and_validate_path(path: str, file_extension: str) -> dict:
+    """_parse_and_validate for a file on disk, so worker processes read it themselves."""
+    with open(path, "rb") as content:
+        return _parse_and_validate(content, file_extension)
+
+async def validate_openapi_async(content: Union[bytes, BinaryIO], file_extension: str, size: int,
+                                 sha256: Optional[str] = None, path: Optional[str] = None) -> dict:
+    """Like validate_openapi, but parse large specs (SPEC_OFFLOAD_THRESHOLD bytes or more) in the spec worker pool.
+
+    Keeps large specs from blocking the event loop while they parse. If the
+    content is also on disk at path, a worker reads it from there rather than
+    being sent a copy.
+    """
+    key = (sha256 or content_sha256(content), file_extension)
+    parsed = _cached_spec(key)
+    if parsed is None:
+        if size >= SPEC_OFFLOAD_THRESHOLD and path is not None:
+            parsed = await run_spec_task(_parse_and_validate_path, path, file_extension, size=size)
+        else:
+            if size >= SPEC_OFFLOAD_THRESHOLD and not isinstance(content, bytes):
+                # Files can't be sent to another process; without a path this one is small enough to hold
+                content = content.read()
+            parsed = await run_spec_task(_parse_and_validate, content, file_extension, size=size)
+        _cache_spec(key, parsed)
+    return parsed
+
 def get_file_extension(filename: str) -> str:
     """Get file extension from filename."""
     return Path(filename).suffix.lower()